@@ -0,0 +1,91 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from scripts import cpu_baker, main_pipeline
+
+
+def write_uv_sphere(path, rings, segments, bump=0.0):
+    """Writes a UV sphere OBJ (optionally with a bumpy surface) with spherical UVs and smooth normals."""
+    theta = np.linspace(0, np.pi, rings + 1)
+    phi = np.linspace(0, 2 * np.pi, segments + 1)
+    t, p = np.meshgrid(theta, phi, indexing='ij')
+    radius = 1.0 + bump * np.sin(7 * t) * np.cos(9 * p)
+    normals = np.stack([np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)], axis=-1).reshape(-1, 3)
+    positions = normals * radius.reshape(-1, 1)
+    uvs = np.stack([p / (2 * np.pi), 1.0 - t / np.pi], axis=-1).reshape(-1, 2)
+
+    idx = np.arange((rings + 1) * (segments + 1)).reshape(rings + 1, segments + 1) + 1
+    a, b = idx[:-1, :-1].ravel(), idx[:-1, 1:].ravel()
+    c, d = idx[1:, 1:].ravel(), idx[1:, :-1].ravel()
+    faces = np.concatenate([np.stack([a, d, c], axis=1), np.stack([a, c, b], axis=1)])
+
+    with open(path, 'w') as f:
+        f.writelines(f"v {x:.6f} {y:.6f} {z:.6f}\n" for x, y, z in positions)
+        f.writelines(f"vt {u:.6f} {v:.6f}\n" for u, v in uvs)
+        f.writelines(f"vn {x:.6f} {y:.6f} {z:.6f}\n" for x, y, z in normals)
+        f.writelines(f"f {i}/{i}/{i} {j}/{j}/{j} {k}/{k}/{k}\n" for i, j, k in faces)
+    return len(faces)
+
+
+def make_scene(folder, high_rings):
+    high_obj = os.path.join(folder, "bench_high.obj")
+    low_obj = os.path.join(folder, "bench_low_raw.obj")
+    high_tex = os.path.join(folder, "bench_high_diffuse.png")
+
+    high_tris = write_uv_sphere(high_obj, high_rings, high_rings * 2, bump=0.01)
+    low_tris = write_uv_sphere(low_obj, 48, 96)
+
+    y, x = np.mgrid[0:1024, 0:1024]
+    checker = ((x // 64 + y // 64) % 2).astype(np.uint8)
+    tex = np.stack([checker * 200 + 30, (x // 4) % 256, (y // 4) % 256], axis=-1).astype(np.uint8)
+    Image.fromarray(tex).save(high_tex)
+    return high_obj, low_obj, high_tex, high_tris, low_tris
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    ok = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed:.2f}s{'' if ok else ' (FAILED)'}")
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy CPU baker (and optionally Cycles on CPU)")
+    parser.add_argument("--res", type=int, default=1024)
+    parser.add_argument("--high-rings", type=int, default=300, help="High-poly sphere rings (tris = 4 * rings^2)")
+    parser.add_argument("--blender", help="Path to blender.exe to also time the Cycles bake backend")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        high_obj, low_obj, high_tex, high_tris, low_tris = make_scene(folder, args.high_rings)
+        print(f"Scene: {high_tris} high-poly tris, {low_tris} low-poly tris, {args.res}px")
+
+        # The synthetic low-poly already has UVs, so the baker can read it directly
+        out_png = os.path.join(folder, "bench_baked.png")
+        workers = os.cpu_count() or 1
+        t1 = timed("CPU baker, 1 worker", lambda: cpu_baker.bake_texture(high_obj, high_tex, low_obj, out_png, args.res, workers=1))
+        if workers > 1:
+            tn = timed(f"CPU baker, {workers} workers", lambda: cpu_baker.bake_texture(high_obj, high_tex, low_obj, out_png, args.res, workers=workers))
+            print(f"Process pool speedup: {t1 / tn:.2f}x")
+
+        if args.blender:
+            # Full unwrap + bake + export for both backends, so Blender start-up and scene setup are included
+            app_paths = main_pipeline.get_app_paths()
+            temp_base = os.path.join(folder, "bench")
+            results = {}
+            for backend in ("cycles", "cpu"):
+                out_glb = os.path.join(folder, f"bench_{backend}_unoptimized.glb")
+                results[backend] = timed(f"{backend} backend (unwrap + bake + export)", lambda: main_pipeline.unwrap_and_bake(
+                    args.blender, app_paths.scripts, "bench.glb", high_obj, low_obj, high_tex,
+                    temp_base, out_glb, args.res, 20000, "token_production", backend
+                ))
+            print(f"CPU backend vs Cycles: {results['cycles'] / results['cpu']:.2f}x")
+        else:
+            print("Pass --blender to compare against the Cycles bake backend.", file=sys.stderr)
@@ -0,0 +1,84 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from mock_meshy_server import start_server
+import scripts.meshy_feeder as feeder
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def make_portraits(folder, count, size=512):
+    """
+    Distinct JPEG portraits (smooth noise seeded by index), so none is deduped against another
+    and every one is a separate generation.
+    """
+    files = []
+    for i in range(count):
+        name = f"portrait_{i:03d}.jpg"
+        noise = np.random.default_rng(i).integers(0, 256, (8, 8, 3), dtype=np.uint8)
+        Image.fromarray(noise).resize((size, size), Image.BICUBIC).save(os.path.join(folder, name), quality=90)
+        files.append(name)
+    return files
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive meshy_feeder against the local mock Meshy API")
+    parser.add_argument("--portraits", type=int, default=50, help="Portraits to generate (10-500)")
+    parser.add_argument("--delay", type=float, default=5.0, help="Seconds each mock generation takes")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="Server-side API calls per second before 429s")
+    parser.add_argument("--glb-mb", type=float, default=4.0)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--rps", type=float, default=20, help="Client-side token bucket rate")
+    parser.add_argument("--fixed-poll", type=float, default=0, help="Poll every N seconds instead of the adaptive schedule, for comparison")
+    args = parser.parse_args()
+
+    server, api_base = start_server(delay=args.delay, failure_rate=args.failure_rate,
+                                    rate_limit=args.rate_limit, glb_size=int(args.glb_mb * 1024 * 1024))
+    with tempfile.TemporaryDirectory() as portraits, tempfile.TemporaryDirectory() as exports:
+        files = make_portraits(portraits, args.portraits)
+        feeder.configure({
+            "meshy_api_key": "mock",
+            "paths": {"source_dir": exports},
+            "meshy": {"api_base": api_base, "max_in_flight": args.max_in_flight,
+                      "requests_per_second": args.rps, "burst": args.rps},
+        })
+        feeder.INPUT_FOLDER = portraits
+        if args.fixed_poll:
+            feeder.POLL_MIN_DELAY = feeder.POLL_MAX_DELAY = args.fixed_poll
+
+        start = time.perf_counter()
+        downloaded, _ = feeder.generate_and_process(files, journal_path=os.path.join(portraits, "journal.jsonl"))
+        elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    mock = server.mock
+    latency = mock.added_latency()
+    print(f"\n{args.portraits} portraits, {args.delay}s generations, {args.max_in_flight} in flight, {args.glb_mb} MB models")
+    print(f"Downloaded: {downloaded} in {elapsed:.1f}s ({downloaded / elapsed:.2f} models/s)")
+    print(f"Added latency (ready -> download): mean {sum(latency) / max(len(latency), 1):.2f}s, p95 {percentile(latency, 0.95):.2f}s")
+    print(f"Requests: {mock.requests['create']} create, {mock.requests['poll']} poll, {mock.requests['download']} download, "
+          f"{mock.requests['rate_limited']} rate-limited; {mock.upload_bytes / 1024 / 1024:.1f} MB uploaded")
+    rss = peak_rss_mb()
+    print(f"Peak RSS: {rss:.0f} MB" if rss is not None else "Peak RSS: n/a on this platform")
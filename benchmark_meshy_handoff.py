@@ -0,0 +1,85 @@
+import argparse
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+from scripts import main_pipeline
+
+# The old handoff started a fresh interpreter for `main_pipeline.py --mode batch` (re-importing
+# every module and re-reading the config; the frozen exe also re-extracts its bundle). --mode
+# meshy now puts each downloaded model on a queue read by a pipeline worker in the same process.
+# Both paths below end at the same stubbed process_file, reached through consume_models.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CHILD_SCRIPT = (
+    "import time, benchmark_meshy_handoff as b; "
+    "b.main_pipeline.load_config(b.main_pipeline.get_app_paths().base); "
+    "b.run_stubbed_worker(['/exports/model_0.glb'], clock=time.time, "
+    "on_call=lambda t: print(f'HANDOFF {t!r}', flush=True))"
+)
+
+
+def run_stubbed_worker(paths, clock=time.perf_counter, on_call=None):
+    """
+    Feeds paths through consume_models with process_file stubbed out.
+    Returns the seconds (by clock) from queueing each path to process_file being called on it.
+    """
+    pipeline = main_pipeline.PipelineConfig(None, None, {}, '', '', '', '', '', '', '', '')
+    latencies = []
+    queued_at = {}
+
+    def process_file(f, *args, **kwargs):
+        called = clock()
+        latencies.append(called - queued_at[f])
+        if on_call:
+            on_call(called)
+
+    model_queue = queue.Queue()
+    with patch.object(main_pipeline, 'process_file', process_file):
+        worker = threading.Thread(target=main_pipeline.consume_models, args=(model_queue, pipeline, 'token_production', {}, 0, 0))
+        worker.start()
+        for path in paths:
+            queued_at[os.path.basename(path)] = clock()
+            model_queue.put(path)
+            time.sleep(0.001)
+        model_queue.put(None)
+        worker.join()
+    return latencies
+
+
+def subprocess_handoff(repeats):
+    """
+    Best wall time from spawning a fresh interpreter to its stubbed process_file being called:
+    interpreter start, imports and config load, then the same worker path as queue_handoff.
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.time()
+        result = subprocess.run([sys.executable, "-c", CHILD_SCRIPT], check=True, capture_output=True,
+                                cwd=ROOT, env={**os.environ, "PYTHONIOENCODING": "utf-8"}, encoding="utf-8")
+        called = next(float(line.split()[1]) for line in result.stdout.splitlines() if line.startswith("HANDOFF "))
+        elapsed = called - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def queue_handoff(models):
+    """Mean seconds from queueing a model path to the stubbed process_file being called in the worker."""
+    latencies = run_stubbed_worker([f"/exports/model_{i}.glb" for i in range(models)])
+    return sum(latencies) / len(latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the old subprocess batch handoff with the in-process model queue")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--models", type=int, default=100)
+    args = parser.parse_args()
+
+    print("Both times run from handoff until a stubbed process_file is called; the real processing is excluded.")
+    startup = subprocess_handoff(args.repeats)
+    print(f"Subprocess handoff (interpreter + imports + config + worker): {startup * 1000:.0f} ms per batch run")
+    handoff = queue_handoff(args.models)
+    print(f"In-process queue handoff (worker only): {handoff * 1e6:.0f} µs per model")
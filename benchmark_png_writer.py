@@ -0,0 +1,97 @@
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from scripts import png_writer
+
+# Times the image inside Blender: load, then save as PNG at the requested compression
+BLENDER_SCRIPT = """
+import sys, time, bpy
+src, dst, level = sys.argv[sys.argv.index("--") + 1:]
+scene = bpy.context.scene
+scene.render.image_settings.file_format = 'PNG'
+scene.render.image_settings.compression = int(level) * 100 // 9
+image = bpy.data.images.load(src)
+image.pixels[0]
+start = time.perf_counter()
+image.save_render(dst, scene=scene)
+print(f"BLENDER_SAVE_SECONDS={time.perf_counter() - start:.4f}")
+"""
+
+
+def make_texture(res):
+    """Baked-looking RGBA texture: smooth gradients, flat islands and a little noise."""
+    y, x = np.mgrid[0:res, 0:res] / res
+    rng = np.random.default_rng(0)
+    rgb = np.stack([
+        0.5 + 0.4 * np.sin(x * 17) * np.cos(y * 11),
+        np.floor(x * 8) / 8,
+        np.floor(y * 6) / 6,
+    ], axis=-1) + rng.normal(0, 0.01, (res, res, 3))
+    rgba = np.ones((res, res, 4))
+    rgba[..., :3] = np.clip(rgb, 0, 1)
+    return png_writer.to_uint8(rgba)
+
+
+def timed(label, func, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        size = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label}: {best:.3f}s, {size / 1024:.0f} KiB")
+    return best
+
+
+def pillow_encode(pixels, level):
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, 'RGBA').save(buffer, 'PNG', compress_level=level)
+    return buffer.tell()
+
+
+def blender_encode(blender, src, dst, level):
+    with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as script:
+        script.write(BLENDER_SCRIPT)
+    try:
+        out = subprocess.run([blender, "--background", "--python", script.name, "--", src, dst, str(level)],
+                             capture_output=True, text=True, check=True).stdout
+    finally:
+        os.remove(script.name)
+    seconds = float(out.split("BLENDER_SAVE_SECONDS=")[1].split()[0])
+    return seconds, os.path.getsize(dst)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the threaded PNG writer against Pillow (and optionally Blender)")
+    parser.add_argument("--res", type=int, default=2048)
+    parser.add_argument("--level", type=int, default=png_writer.DEFAULT_LEVEL)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--blender", help="Path to blender.exe to also time Blender's PNG encoder")
+    args = parser.parse_args()
+
+    pixels = make_texture(args.res)
+    workers = os.cpu_count() or 1
+    print(f"{args.res}px RGBA, zlib level {args.level}")
+
+    t1 = timed("png_writer, 1 thread", lambda: len(png_writer.encode_png(pixels, args.level, workers=1)), args.repeats)
+    if workers > 1:
+        tn = timed(f"png_writer, {workers} threads", lambda: len(png_writer.encode_png(pixels, args.level, workers=workers)), args.repeats)
+        print(f"Thread pool speedup: {t1 / tn:.2f}x")
+    tp = timed("Pillow", lambda: pillow_encode(pixels, args.level), args.repeats)
+
+    if args.blender:
+        with tempfile.TemporaryDirectory() as folder:
+            src = os.path.join(folder, "bench_src.png")
+            png_writer.write_png(src, pixels, 1)
+            seconds, size = blender_encode(args.blender, src, os.path.join(folder, "bench_blender.png"), args.level)
+            print(f"Blender: {seconds:.3f}s, {size / 1024:.0f} KiB")
+    else:
+        print("Pass --blender to compare against Blender's PNG encoder.", file=sys.stderr)
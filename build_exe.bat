@@ -55,7 +55,7 @@ if not exist "scripts\blender_unwrap_bake.py" (
 echo.
 echo Building chriseurolog3d.exe...
 :: Uses Windows backslashes for paths
-python -m PyInstaller --clean --onefile --name chriseurolog3d --add-data "scripts\blender_extract.py;." --add-data "scripts\blender_unwrap_bake.py;." --hidden-import scripts.meshy_feeder --hidden-import requests "scripts\main_pipeline.py"
+python -m PyInstaller --clean --onefile --name chriseurolog3d --add-data "scripts\blender_extract.py;." --add-data "scripts\blender_worker.py;." --add-data "scripts\blender_unwrap_bake.py;." --add-data "scripts\blender_bake_tile.py;." --add-data "scripts\mesh_bvh.py;." --add-data "scripts\occlusion_cull.py;." --add-data "scripts\uv_packer.py;." --add-data "scripts\texture_analysis.py;." --add-data "scripts\texture_resize.py;." --add-data "scripts\png_writer.py;." --add-data "scripts\texture_channels.py;." --add-data "scripts\texture_atlas.py;." --hidden-import scripts.meshy_feeder --hidden-import scripts.task_journal --hidden-import scripts.cpu_baker --hidden-import scripts.bake_tiles --hidden-import scripts.asset_report --hidden-import scripts.texture_analysis --hidden-import scripts.texture_resize --hidden-import scripts.png_writer --hidden-import scripts.glb_io --hidden-import scripts.quantize --hidden-import scripts.texture_dedupe --hidden-import scripts.tile_pack --hidden-import scripts.texture_variants --hidden-import scripts.texture_atlas --hidden-import scripts.uv_packer --hidden-import requests "scripts\main_pipeline.py"
 
 if %errorlevel% neq 0 (
     echo ❌ Build failed!
@@ -5,8 +5,8 @@ a = Analysis(
     ['scripts\\main_pipeline.py'],
     pathex=[],
     binaries=[],
-    datas=[('scripts\\blender_worker.py', '.'), ('scripts\\blender_extract.py', '.'), ('scripts\\blender_unwrap_bake.py', '.')],
-    hiddenimports=['scripts.meshy_feeder', 'requests'],
+    datas=[('scripts\\blender_worker.py', '.'), ('scripts\\blender_extract.py', '.'), ('scripts\\blender_unwrap_bake.py', '.'), ('scripts\\blender_bake_tile.py', '.'), ('scripts\\mesh_bvh.py', '.'), ('scripts\\occlusion_cull.py', '.'), ('scripts\\uv_packer.py', '.'), ('scripts\\texture_analysis.py', '.'), ('scripts\\texture_resize.py', '.'), ('scripts\\png_writer.py', '.'), ('scripts\\texture_channels.py', '.'), ('scripts\\texture_atlas.py', '.')],
+    hiddenimports=['scripts.meshy_feeder', 'scripts.task_journal', 'scripts.cpu_baker', 'scripts.bake_tiles', 'scripts.asset_report', 'scripts.texture_analysis', 'scripts.texture_resize', 'scripts.png_writer', 'scripts.glb_io', 'scripts.quantize', 'scripts.texture_dedupe', 'scripts.tile_pack', 'scripts.texture_variants', 'scripts.texture_atlas', 'scripts.uv_packer', 'requests'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
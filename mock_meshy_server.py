@@ -0,0 +1,207 @@
+import argparse
+import itertools
+import json
+import random
+import re
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for Meshy's image-to-3d endpoints, for load-testing scripts/meshy_feeder.py
+# without spending credits. Point the feeder at it with "meshy": {"api_base": "<url>/v1"}.
+#   POST /v1/image-to-3d          -> 202 {"result": task_id}
+#   GET  /v1/image-to-3d/<task>   -> IN_PROGRESS (with progress) until the delay passes, then
+#                                    SUCCEEDED with model_urls.glb, or FAILED at failure_rate
+#   GET  /models/<task>.glb       -> a valid GLB of glb_size bytes, streamed, Range-aware
+# API calls beyond rate_limit per second get 429 with Retry-After: 1.
+
+BLOCK = 64 * 1024
+
+
+class MockMeshy:
+    """Shared state and settings: task table, per-endpoint request counts and completion timings."""
+
+    def __init__(self, delay=5.0, jitter=0.5, failure_rate=0.0, rate_limit=0, glb_size=1024 * 1024, seed=0):
+        self.delay = delay
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit
+        self.glb_size = max(glb_size, 64)
+        self.random = random.Random(seed)
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.tasks = {}
+        self.requests = {'create': 0, 'poll': 0, 'download': 0, 'rate_limited': 0}
+        self.upload_bytes = 0
+        self.window = []
+
+    def throttled(self):
+        """True if this API call exceeds rate_limit within the last second."""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            self.window = [t for t in self.window if now - t < 1.0]
+            if len(self.window) >= self.rate_limit:
+                self.requests['rate_limited'] += 1
+                return True
+            self.window.append(now)
+        return False
+
+    def create(self, upload_bytes):
+        with self.lock:
+            task_id = f"mock-{next(self.ids)}"
+            duration = max(0.0, self.delay + self.random.uniform(-self.jitter, self.jitter))
+            self.tasks[task_id] = {
+                'created': time.monotonic(),
+                'ready_at': time.monotonic() + duration,
+                'failed': self.random.random() < self.failure_rate,
+                'downloaded_at': None,
+            }
+            self.requests['create'] += 1
+            self.upload_bytes += upload_bytes
+        return task_id
+
+    def status(self, task_id, model_url):
+        with self.lock:
+            self.requests['poll'] += 1
+            task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        now = time.monotonic()
+        if now < task['ready_at']:
+            total = task['ready_at'] - task['created']
+            progress = int(99 * (now - task['created']) / total) if total else 99
+            return {'id': task_id, 'status': 'IN_PROGRESS', 'progress': progress}
+        if task['failed']:
+            return {'id': task_id, 'status': 'FAILED', 'progress': 100}
+        return {'id': task_id, 'status': 'SUCCEEDED', 'progress': 100, 'model_urls': {'glb': model_url}}
+
+    def glb_header(self):
+        json_chunk = json.dumps({"asset": {"version": "2.0", "generator": "mock_meshy_server"}}).encode('utf-8')
+        json_chunk += b' ' * (-len(json_chunk) % 4)
+        bin_length = max(0, self.glb_size - 12 - 8 - len(json_chunk) - 8) // 4 * 4
+        total = 12 + 8 + len(json_chunk) + 8 + bin_length
+        return (b'glTF' + struct.pack('<II', 2, total) + struct.pack('<II', len(json_chunk), 0x4E4F534A) + json_chunk
+                + struct.pack('<II', bin_length, 0x004E4942)), total
+
+    def mark_downloaded(self, task_id):
+        with self.lock:
+            self.requests['download'] += 1
+            task = self.tasks.get(task_id)
+            if task is not None and task['downloaded_at'] is None:
+                task['downloaded_at'] = time.monotonic()
+        return task is not None
+
+    def added_latency(self):
+        """Seconds between each task becoming ready and its model first being requested."""
+        with self.lock:
+            return [t['downloaded_at'] - t['ready_at'] for t in self.tasks.values() if t['downloaded_at'] is not None]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=()):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def drain_body(self):
+        remaining = int(self.headers.get('Content-Length', 0))
+        size = remaining
+        while remaining > 0:
+            chunk = self.rfile.read(min(BLOCK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        return size
+
+    def do_POST(self):
+        mock = self.server.mock
+        size = self.drain_body()
+        if self.path.rstrip('/') != '/v1/image-to-3d':
+            return self.send_json(404, {'message': 'Not found'})
+        if mock.throttled():
+            return self.send_json(429, {'message': 'Too many requests'}, [('Retry-After', '1')])
+        self.send_json(202, {'result': mock.create(size)})
+
+    def do_GET(self):
+        mock = self.server.mock
+        match = re.fullmatch(r'/v1/image-to-3d/([\w-]+)', self.path)
+        if match:
+            if mock.throttled():
+                return self.send_json(429, {'message': 'Too many requests'}, [('Retry-After', '1')])
+            host, port = self.server.server_address[:2]
+            status = mock.status(match.group(1), f"http://{host}:{port}/models/{match.group(1)}.glb")
+            return self.send_json(200, status) if status else self.send_json(404, {'message': 'Unknown task'})
+
+        match = re.fullmatch(r'/models/([\w-]+)\.glb', self.path)
+        if not match or not mock.mark_downloaded(match.group(1)):
+            return self.send_json(404, {'message': 'Not found'})
+        self.send_glb()
+
+    def send_glb(self):
+        header, total = self.server.mock.glb_header()
+        start = 0
+        requested = re.fullmatch(r'bytes=(\d+)-', self.headers.get('Range', ''))
+        if requested:
+            start = int(requested.group(1))
+            if start >= total:
+                self.send_response(416)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{total - 1}/{total}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'model/gltf-binary')
+        self.send_header('Content-Length', str(total - start))
+        self.end_headers()
+
+        # Streamed so the server's memory stays flat however large the payload
+        if start < len(header):
+            self.wfile.write(header[start:])
+            start = len(header)
+        zeros = bytes(BLOCK)
+        while start < total:
+            size = min(BLOCK, total - start)
+            self.wfile.write(zeros[:size])
+            start += size
+
+
+def start_server(host="127.0.0.1", port=0, **settings):
+    """Starts the stand-in on a background thread. Returns (server, api_base); stop with server.shutdown()."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.mock = MockMeshy(**settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Meshy image-to-3d API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=5.0, help="Seconds each generation takes")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="API calls per second before 429s (0 = unlimited)")
+    parser.add_argument("--glb-mb", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server, api_base = start_server(port=args.port, delay=args.delay, failure_rate=args.failure_rate,
+                                    rate_limit=args.rate_limit, glb_size=int(args.glb_mb * 1024 * 1024))
+    print(f"Mock Meshy API on {api_base} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,35 @@
+import json
+import os
+import threading
+
+# Per-asset measurements collected across pipeline stages, kept in one JSON file next to the
+# optimized outputs: {"<asset>.glb": {"<section>": {...}, ...}, ...}
+
+REPORT_NAME = "asset_report.json"
+
+_LOCK = threading.Lock()
+
+
+def load_report(report_path):
+    if not os.path.exists(report_path):
+        return {}
+    try:
+        with open(report_path) as f:
+            report = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        print(f"⚠️ Warning: Could not read {report_path}. Starting a new report.")
+        return {}
+    return report if isinstance(report, dict) else {}
+
+
+def record_asset(report_path, asset, section, data):
+    """Stores `data` under report[asset][section], replacing the file atomically."""
+    with _LOCK:
+        report = load_report(report_path)
+        report.setdefault(asset, {})[section] = data
+
+        tmp_path = report_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, report_path)
+    return report
@@ -0,0 +1,161 @@
+import os
+import subprocess
+
+import numpy as np
+from PIL import Image
+
+try:
+    from scripts import cpu_baker, png_writer
+except ImportError:  # Frozen build / running from inside scripts/
+    import cpu_baker
+    import png_writer
+
+# UDIM-style split of the Cycles bake: the unwrapped low-poly is cut into K UV tiles, each tile is
+# baked by its own Blender process (blender_bake_tile.py) with a share of the CPU threads, and the
+# results are stitched into one texture with a single margin pass so seams match an unsplit bake.
+
+# High-poly chunks keep triangles within this fraction of the model size (plus the cage) of a tile's faces
+CHUNK_PADDING = 0.02
+
+
+def tile_grid(count):
+    """Splits UV space into `count` columns x rows cells, returned as (u0, v0, u1, v1)."""
+    cols = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / cols))
+    return [
+        (c / cols, r / rows, (c + 1) / cols, (r + 1) / rows)
+        for r in range(rows) for c in range(cols)
+    ][:count]
+
+
+def assign_faces_to_tiles(tri_uvs, count):
+    """Returns the tile index of every UV triangle, by the grid cell its UV centroid falls in."""
+    cols = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / cols))
+    centroid = np.clip(tri_uvs.mean(axis=1), 0.0, 1.0 - 1e-9)
+    tiles = np.floor(centroid[:, 1] * rows).astype(np.int64) * cols + np.floor(centroid[:, 0] * cols).astype(np.int64)
+    # A grid with unused trailing cells folds them into the last real tile
+    return np.minimum(tiles, count - 1)
+
+
+def write_obj(path, positions, uvs, normals, corners):
+    """Writes the triangles in `corners` (as returned by cpu_baker.load_obj), keeping only referenced elements."""
+    columns = []
+    with open(path, 'w') as f:
+        for k, (prefix, data) in enumerate((('v', positions), ('vt', uvs), ('vn', normals))):
+            index = corners[..., k].ravel()
+            if not len(data) or (index < 0).any():
+                columns.append(None)
+                continue
+            used, remapped = np.unique(index, return_inverse=True)
+            np.savetxt(f, data[used], fmt=f'{prefix} %.6f' + ' %.6f' * (data.shape[1] - 1))
+            columns.append(remapped.reshape(-1, 3) + 1)
+
+        v, vt, vn = columns
+        if vt is not None and vn is not None:
+            corner_fmt, parts = '%d/%d/%d', (v, vt, vn)
+        elif vt is not None:
+            corner_fmt, parts = '%d/%d', (v, vt)
+        elif vn is not None:
+            corner_fmt, parts = '%d//%d', (v, vn)
+        else:
+            corner_fmt, parts = '%d', (v,)
+        faces = np.stack(parts, axis=2).reshape(len(v), -1)
+        np.savetxt(f, faces, fmt='f ' + ' '.join([corner_fmt] * 3))
+
+
+def high_poly_chunk(high_tri_min, high_tri_max, tile_positions, padding):
+    """Mask of high-poly triangles whose bounds overlap the tile's low-poly faces grown by `padding`."""
+    lo = tile_positions.reshape(-1, 3).min(axis=0) - padding
+    hi = tile_positions.reshape(-1, 3).max(axis=0) + padding
+    return (high_tri_max >= lo).all(axis=1) & (high_tri_min <= hi).all(axis=1)
+
+
+def stitch_tiles(tile_pngs, output_png, margin=cpu_baker.DEFAULT_MARGIN, png_level=png_writer.DEFAULT_LEVEL):
+    """Combines the transparent tile bakes and grows one EXTEND margin over the stitched result."""
+    image = None
+    covered = None
+    for path in tile_pngs:
+        with Image.open(path) as img:
+            tile = np.asarray(img.convert('RGBA'), dtype=np.float32) / 255.0
+        if image is None:
+            image = np.zeros(tile.shape[:2] + (3,), dtype=np.float32)
+            covered = np.zeros(tile.shape[:2], dtype=bool)
+        baked = (tile[..., 3] > 0) & ~covered
+        image[baked] = tile[baked, :3]
+        covered |= baked
+
+    image, _ = cpu_baker.dilate(image, covered, margin)
+    rgba = np.ones(image.shape[:2] + (4,), dtype=np.float32)
+    rgba[..., :3] = image
+    png_writer.write_png(output_png, rgba, png_level)
+    return covered.mean()
+
+
+def bake_tiled(blender_exe, script_dir, high_obj, high_tex, low_uv_obj, baked_png, res, tile_count, chunk_high=False, threads=None, png_level=png_writer.DEFAULT_LEVEL):
+    """
+    Bakes low_uv_obj in `tile_count` concurrent Blender processes and stitches the tiles into baked_png.
+    Returns True on success.
+    """
+    tile_script = os.path.join(script_dir, "blender_bake_tile.py")
+    low_positions, low_uvs, low_normals, low_corners = cpu_baker.load_obj(low_uv_obj)
+    if not len(low_uvs) or (low_corners[..., 1] < 0).any():
+        print("❌ Tiled Bake Error: low-poly OBJ has no UVs.")
+        return False
+
+    # Every tile uses the whole model's cage, so tiles agree on ray lengths along their borders
+    extrusion = cpu_baker.cage_extrusion(low_positions)
+    tile_of_face = assign_faces_to_tiles(low_uvs[low_corners[..., 1]], tile_count)
+    tiles = [t for t in range(tile_count) if (tile_of_face == t).any()]
+
+    if chunk_high:
+        high_positions, high_uvs, high_normals, high_corners = cpu_baker.load_obj(high_obj)
+        high_tris = high_positions[high_corners[..., 0]]
+        high_tri_min, high_tri_max = high_tris.min(axis=1), high_tris.max(axis=1)
+        padding = 2 * extrusion + CHUNK_PADDING * float(np.ptp(low_positions, axis=0).max())
+
+    threads = threads or os.cpu_count() or 1
+    tile_threads = max(1, threads // len(tiles))
+    print(f"🔹 Splitting bake into {len(tiles)} UV tiles, {tile_threads} thread(s) each...")
+
+    temp_files = []
+    tile_pngs = []
+    processes = []
+    for t in tiles:
+        prefix = baked_png.replace('.png', f'_tile{t}')
+        low_tile = f"{prefix}_low.obj"
+        write_obj(low_tile, low_positions, low_uvs, low_normals, low_corners[tile_of_face == t])
+        temp_files.append(low_tile)
+
+        high_tile = high_obj
+        if chunk_high:
+            high_tile = f"{prefix}_high.obj"
+            tile_positions = low_positions[low_corners[tile_of_face == t][..., 0]]
+            mask = high_poly_chunk(high_tri_min, high_tri_max, tile_positions, padding)
+            write_obj(high_tile, high_positions, high_uvs, high_normals, high_corners[mask])
+            temp_files.append(high_tile)
+            print(f"  Tile {t}: {int((tile_of_face == t).sum())} low-poly faces, {int(mask.sum())} high-poly faces")
+
+        tile_png = f"{prefix}.png"
+        tile_pngs.append(tile_png)
+        temp_files.append(tile_png)
+
+        tile_cmd = [
+            blender_exe, "--background", "-t", str(tile_threads), "--python", tile_script, "--",
+            high_tile, high_tex or "", low_tile, tile_png, str(res), f"{extrusion:.6f}"
+        ]
+        processes.append((t, subprocess.Popen(tile_cmd)))
+
+    failed = [t for t, proc in processes if proc.wait() != 0]
+    try:
+        if failed:
+            print(f"❌ Tiled Bake Error: tile(s) {failed} failed.")
+            return False
+
+        coverage = stitch_tiles(tile_pngs, baked_png, png_level=png_level)
+        print(f"✅ Stitched {len(tiles)} tiles into {baked_png} ({coverage:.1%} of texels baked).")
+        return True
+    finally:
+        for path in temp_files:
+            if os.path.exists(path):
+                os.remove(path)
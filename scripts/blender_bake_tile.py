@@ -0,0 +1,69 @@
+import bpy
+import os
+import sys
+
+# Blender does not put the script's own folder on sys.path; reuse the bake setup from blender_unwrap_bake
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from blender_unwrap_bake import bake_with_cycles
+import png_writer
+
+# Bakes one UV tile of a split bake (see scripts/bake_tiles.py). The low-poly OBJ holds only the
+# faces assigned to this tile and the high-poly OBJ may be a spatial chunk; the output PNG is
+# full-size with transparent texels everywhere this tile did not bake.
+
+def import_meshes(filepath):
+    before = set(bpy.data.objects)
+    bpy.ops.wm.obj_import(filepath=filepath, forward_axis='Y', up_axis='Z')
+    return [obj for obj in bpy.data.objects if obj.type == 'MESH' and obj not in before]
+
+def process():
+    try:
+        idx = sys.argv.index("--")
+        argv = sys.argv[idx + 1:]
+    except ValueError:
+        argv = []
+
+    if len(argv) < 6:
+        print("Usage: blender --background [-t threads] --python blender_bake_tile.py -- <high_obj> <high_tex> <low_tile_obj> <output_png> <res> <cage_extrusion>")
+        sys.exit(1)
+
+    high_obj_path = argv[0]
+    high_tex = argv[1]
+    low_tile_obj = argv[2]
+    output_png = argv[3]
+    res = int(argv[4])
+    cage_extrusion = float(argv[5])
+
+    for path in (high_obj_path, low_tile_obj):
+        if not os.path.exists(path):
+            print(f"Error: Input file {path} does not exist.")
+            sys.exit(1)
+
+    bpy.ops.object.select_all(action='SELECT')
+    bpy.ops.object.delete()
+
+    high_poly_objs = import_meshes(high_obj_path)
+    low_objs = import_meshes(low_tile_obj)
+    if not high_poly_objs or not low_objs:
+        print("❌ No mesh objects found in tile OBJs.")
+        sys.exit(1)
+
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in low_objs:
+        obj.select_set(True)
+    bpy.context.view_layer.objects.active = low_objs[0]
+    if len(low_objs) > 1:
+        bpy.ops.object.join()
+    low_obj = bpy.context.view_layer.objects.active
+    bpy.ops.object.shade_smooth()
+
+    bake_with_cycles(high_poly_objs, low_obj, high_tex, res, output_png, margin=0, cage_extrusion=cage_extrusion, transparent=True, png_level=png_writer.INTERMEDIATE_LEVEL)
+    print(f"✅ Tile baked to {output_png}")
+
+    bpy.ops.wm.quit_blender()
+
+if __name__ == "__main__":
+    process()
@@ -5,6 +5,11 @@ import urllib.parse
 import json
 import struct
 
+# Blender does not put the script's own folder on sys.path; the NumPy helper modules live next to it
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
 # ==========================================
 # SECURITY & VALIDATION
 # ==========================================
@@ -78,6 +83,146 @@ def validate_gltf_path(filepath):
 
     return True
 
+# ==========================================
+# HIDDEN GEOMETRY CULLING
+# ==========================================
+def cull_hidden_faces(high_obj, cull_mode):
+    """
+    Deletes faces that can never be seen from outside the model: the internal walls
+    left behind by joining intersecting meshes, and (mode 'underside') faces that are
+    only visible from below the token base. They would otherwise bloat the Instant
+    Meshes input and the BVH Cycles builds for every bake.
+    """
+    import numpy as np
+    import occlusion_cull
+
+    mesh = high_obj.data
+    mesh.calc_loop_triangles()
+
+    vert_count = len(mesh.vertices)
+    tri_count = len(mesh.loop_triangles)
+    poly_count = len(mesh.polygons)
+
+    vertices = np.empty(vert_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', vertices)
+    loop_tris = np.empty(tri_count * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get('vertices', loop_tris)
+    tri_polys = np.empty(tri_count, dtype=np.int32)
+    mesh.loop_triangles.foreach_get('polygon_index', tri_polys)
+
+    print(f"🔹 Culling hidden geometry ({cull_mode}) across {poly_count} faces...")
+    hidden = occlusion_cull.find_hidden_polygons(vertices, loop_tris, tri_polys, poly_count, mode=cull_mode)
+
+    if not len(hidden):
+        print("🔹 No hidden faces found.")
+        return 0
+
+    import bmesh
+    bpy.ops.object.mode_set(mode='EDIT')
+    bm = bmesh.from_edit_mesh(mesh)
+    bm.faces.ensure_lookup_table()
+    bmesh.ops.delete(bm, geom=[bm.faces[i] for i in hidden], context='FACES')
+    bmesh.update_edit_mesh(mesh)
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    print(f"✅ Removed {len(hidden)} hidden faces ({len(hidden) / max(poly_count, 1):.1%} of the high-poly).")
+    return len(hidden)
+
+# ==========================================
+# BASE COLOUR ATLAS
+# ==========================================
+def material_base_color(mat):
+    """The image linked to a material's Principled Base Color, else its flat base colour (linear RGBA), else None."""
+    if not mat or not mat.use_nodes:
+        return None
+    mat_nodes = mat.node_tree.nodes
+    mat_bsdf = next((n for n in mat_nodes if n.type == 'BSDF_PRINCIPLED'), None) or mat_nodes.get("Principled BSDF")
+    if not mat_bsdf:
+        return None
+
+    base_color_input = mat_bsdf.inputs.get('Base Color')
+    if not base_color_input:
+        return None
+    if base_color_input.is_linked:
+        link = base_color_input.links[0]
+        if link.from_node.type == 'TEX_IMAGE' and link.from_node.image:
+            return link.from_node.image
+        return None
+    return tuple(base_color_input.default_value)
+
+def image_pixels(img):
+    """(H, W, C) float32 pixels of a Blender image, bottom row first."""
+    import numpy as np
+
+    width, height = img.size
+    pixels = np.zeros(width * height * img.channels, dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+    return pixels.reshape(height, width, img.channels)
+
+def export_base_color(high_obj, output_tex):
+    """
+    Writes the high-poly's base colour to output_tex. A single textured material is saved as-is;
+    several materials (or flat colours) are packed into one atlas (scripts/texture_atlas.py) and
+    the mesh's UVs are remapped into it. Returns False when no material has a base colour.
+    """
+    import numpy as np
+    import png_writer
+    import texture_atlas
+    import texture_resize
+
+    sources = [material_base_color(mat) for mat in high_obj.data.materials]
+    if not any(source is not None for source in sources):
+        return False
+
+    # One image and no flat colours: the UVs already address it. An intermediate the bake reads once, so favour speed
+    images = {source for source in sources if source is not None and not isinstance(source, tuple)}
+    if len(images) == 1 and not any(isinstance(source, tuple) for source in sources):
+        png_writer.save_image_png(images.pop(), output_tex, png_writer.INTERMEDIATE_LEVEL)
+        print(f"✅ Extracted diffuse texture to {output_tex}")
+        return True
+
+    # One atlas slot per distinct image or colour; materials without a base colour render white
+    tiles, material_slots, swatch_slots, seen = [], [], set(), {}
+    for source in sources:
+        key = source if source is not None else (1.0, 1.0, 1.0, 1.0)
+        if isinstance(key, tuple):
+            key = tuple(round(c, 4) for c in key)
+        if key not in seen:
+            seen[key] = len(tiles)
+            if isinstance(key, tuple):
+                tiles.append(texture_atlas.swatch(np.append(texture_resize.linear_to_srgb(key[:3]), key[3:4])))
+                swatch_slots.add(seen[key])
+            else:
+                tiles.append(png_writer.to_uint8(image_pixels(key)))
+        material_slots.append(seen[key])
+
+    atlas, slots = texture_atlas.build_atlas(tiles)
+
+    mesh = high_obj.data
+    loop_count = len(mesh.loops)
+    poly_count = len(mesh.polygons)
+    material_index = np.zeros(poly_count, dtype=np.int32)
+    mesh.polygons.foreach_get('material_index', material_index)
+    loop_totals = np.zeros(poly_count, dtype=np.int32)
+    mesh.polygons.foreach_get('loop_total', loop_totals)
+
+    uv_layer = mesh.uv_layers.active or mesh.uv_layers.new(name="Atlas")
+    loop_uvs = np.zeros(loop_count * 2, dtype=np.float32)
+    uv_layer.data.foreach_get('uv', loop_uvs)
+
+    material_slots = np.asarray(material_slots)
+    loop_slots = np.repeat(material_slots[np.clip(material_index, 0, len(material_slots) - 1)], loop_totals)
+    uvs = texture_atlas.wrap_face_uvs(loop_uvs, loop_totals)
+    # Flat colours sample the middle of their swatch
+    uvs[np.isin(loop_slots, list(swatch_slots))] = 0.5
+    atlas_uvs = texture_atlas.remap_uvs(uvs, loop_slots, slots, atlas.shape[:2])
+    uv_layer.data.foreach_set('uv', atlas_uvs.astype(np.float32).ravel())
+    mesh.update()
+
+    png_writer.write_png(output_tex, atlas[::-1], png_writer.INTERMEDIATE_LEVEL)
+    print(f"✅ Packed {len(sources)} materials ({len(tiles)} textures/colours) into a {atlas.shape[1]}x{atlas.shape[0]} diffuse atlas at {output_tex}")
+    return True
+
 def process():
     try:
         idx = sys.argv.index("--")
@@ -86,13 +231,16 @@ def process():
         argv = []
 
     if len(argv) < 2:
-        print("Usage: blender --background --python blender_extract.py -- <input_glb> <output_obj> [target_vertices]")
+        print("Usage: blender --background --python blender_extract.py -- <input_glb> <output_obj> [target_vertices] [cull_mode] [texture_budget]")
         sys.exit(1)
 
     input_glb = argv[0]
     output_obj = argv[1]
 
     target_verts = int(argv[2]) if len(argv) > 2 else 100000
+    cull_mode = argv[3] if len(argv) > 3 else "none"
+    # Longest side allowed for each source image before packing; 0 keeps them as imported
+    texture_budget = int(argv[4]) if len(argv) > 4 else 0
 
     # 1. CLEAN SCENE & VALIDATE
     bpy.ops.object.select_all(action='SELECT')
@@ -179,35 +327,20 @@ def process():
     # Force an update of the view layer to ensure transforms are locked
     bpy.context.view_layer.update()
 
+    # Remove internal volumes (and optionally the underside) before anything downstream sees them.
+    # Runs after welding so faces shared between joined meshes are tested once.
+    if cull_mode != "none":
+        cull_hidden_faces(high_obj, cull_mode)
+
     # 3. EXPORT TEXTURE
-    # Find the base color texture to extract
+    if texture_budget > 0:
+        # blender_worker only defines functions at import time, so its texture pass can be shared
+        from blender_worker import resize_textures
+        resize_textures(texture_budget, [high_obj])
+
+    # Every material's base colour goes into one texture so the bake stays a single pass
     output_tex = output_obj.replace(".obj", "_diffuse.png")
-    texture_exported = False
-
-    for mat in high_obj.data.materials:
-        if mat and mat.use_nodes:
-            mat_nodes = mat.node_tree.nodes
-            mat_bsdf = next((n for n in mat_nodes if n.type == 'BSDF_PRINCIPLED'), None) or mat_nodes.get("Principled BSDF")
-
-            if mat_bsdf:
-                base_color_input = mat_bsdf.inputs.get('Base Color')
-                if base_color_input and base_color_input.is_linked:
-                    link = base_color_input.links[0]
-                    if link.from_node.type == 'TEX_IMAGE' and link.from_node.image:
-                        img = link.from_node.image
-
-                        # Save the image to the specified path
-                        old_filepath = img.filepath_raw
-                        img.filepath_raw = output_tex
-                        img.file_format = 'PNG'
-                        img.save()
-
-                        img.filepath_raw = old_filepath # restore just in case
-                        texture_exported = True
-                        print(f"✅ Extracted diffuse texture to {output_tex}")
-                        break
-
-    if not texture_exported:
+    if not export_base_color(high_obj, output_tex):
         print("⚠️ No base color texture found in high-poly material.")
 
     # 4. EXPORT ORIGINAL HIGH POLY (FOR BAKING)
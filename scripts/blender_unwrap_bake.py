@@ -1,6 +1,193 @@
 import bpy
 import os
 import sys
+import json
+
+# Blender does not put the script's own folder on sys.path; the NumPy helper modules live next to it
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from png_writer import save_image_png
+
+# "full" bakes with Cycles in one go. "prepare" stops after unwrapping and hands the low-poly to an
+# external baker (scripts/cpu_baker.py); "finish" reopens that scene and applies <output>_baked.png.
+BAKE_STAGES = ("full", "prepare", "finish")
+LOW_POLY_NAME = "LowPoly_Unwrapped"
+
+# "blender" keeps smart_project's own packing, "skyline" repacks its islands with scripts/uv_packer.py
+UV_PACKERS = ("blender", "skyline")
+UV_MARGIN_PX = 4
+
+# zlib level for the baked PNG that gets packed into the GLB (see scripts/png_writer.py)
+DEFAULT_PNG_LEVEL = 6
+
+def prepared_paths(output_glb):
+    """Files shared between the prepare and finish stages (and the external baker in between)."""
+    return output_glb.replace('.glb', '_low_uv.obj'), output_glb.replace('.glb', '_prepared.blend')
+
+def export_prepared_scene(low_obj, high_poly_objs, low_uv_obj, prepared_blend):
+    print(f"🔹 Exporting unwrapped Low-Poly for external bake: {low_uv_obj}")
+    bpy.ops.object.select_all(action='DESELECT')
+    low_obj.select_set(True)
+    bpy.context.view_layer.objects.active = low_obj
+
+    bpy.ops.wm.obj_export(
+        filepath=low_uv_obj,
+        export_selected_objects=True,
+        export_materials=False,
+        apply_modifiers=True,
+        export_normals=True,
+        export_uv=True,
+        forward_axis='Y',
+        up_axis='Z'
+    )
+
+    # The external baker reads the high-poly OBJ directly; keep the saved scene small
+    for obj in high_poly_objs:
+        bpy.data.objects.remove(obj, do_unlink=True)
+
+    bpy.ops.wm.save_as_mainfile(filepath=prepared_blend)
+    print(f"✅ Prepared scene saved to {prepared_blend}")
+
+def load_prepared_scene(prepared_blend):
+    if not os.path.exists(prepared_blend):
+        print(f"Error: Prepared scene {prepared_blend} does not exist. Run the 'prepare' stage first.")
+        sys.exit(1)
+
+    bpy.ops.wm.open_mainfile(filepath=prepared_blend)
+
+    low_obj = bpy.data.objects.get(LOW_POLY_NAME)
+    if low_obj is None:
+        print(f"❌ {LOW_POLY_NAME} not found in {prepared_blend}.")
+        sys.exit(1)
+
+    bpy.ops.object.select_all(action='DESELECT')
+    low_obj.select_set(True)
+    bpy.context.view_layer.objects.active = low_obj
+    return low_obj
+
+def pack_and_measure_uvs(low_obj, uv_packer_mode, max_res, stats_path, texel_density=0.0):
+    """
+    Optionally repacks the UV islands and picks the bake resolution: the smallest power of two
+    reaching the profile's texel_density (px per unit), capped at max_res. Writes coverage,
+    texel density and the chosen res to stats_path and returns that res.
+    """
+    mesh = low_obj.data
+    loop_count = len(mesh.loops)
+    if not loop_count or not mesh.uv_layers.active:
+        return max_res
+
+    import numpy as np
+    import uv_packer
+
+    loop_verts = np.zeros(loop_count, dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', loop_verts)
+    loop_starts = np.zeros(len(mesh.polygons), dtype=np.int32)
+    loop_totals = np.zeros(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('loop_start', loop_starts)
+    mesh.polygons.foreach_get('loop_total', loop_totals)
+    co = np.zeros(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', co)
+    loop_positions = co.reshape(-1, 3)[loop_verts]
+
+    uv_data = mesh.uv_layers.active.data
+    source_uvs = np.zeros(loop_count * 2, dtype=np.float32)
+    uv_data.foreach_get('uv', source_uvs)
+    source_uvs = source_uvs.reshape(-1, 2)
+
+    def measure(res):
+        if uv_packer_mode == "skyline":
+            uvs, island_count = uv_packer.pack_islands(loop_verts, source_uvs, loop_totals, margin=UV_MARGIN_PX / res)
+        else:
+            uvs = source_uvs
+            _, island_count = uv_packer.find_islands(loop_verts, uvs, loop_totals)
+        return uvs, uv_packer.uv_stats(uvs, loop_positions, loop_starts, loop_totals, res, island_count)
+
+    if uv_packer_mode == "skyline":
+        print("🔹 Repacking UV islands (skyline)...")
+    res = max_res
+    uvs, stats = measure(res)
+
+    if texel_density > 0:
+        res = uv_packer.choose_resolution(stats.texel_density / max_res, texel_density, max_res)
+        if res != max_res:
+            # Repack so the island gap stays UV_MARGIN_PX at the smaller size
+            uvs, stats = measure(res)
+            if stats.texel_density < texel_density and res < max_res:
+                res = min(res * 2, max_res)
+                stats = uv_packer.uv_stats(uvs, loop_positions, loop_starts, loop_totals, res, stats.islands)
+        print(f"🔹 Target texel density {texel_density:.0f}px/unit -> baking at {res}px (cap {max_res}px)")
+
+    if uv_packer_mode == "skyline":
+        uv_data.foreach_set('uv', uvs.astype(np.float32).ravel())
+        mesh.update()
+
+    print(f"🔹 UV coverage {stats.coverage:.1%}, texel density {stats.texel_density:.0f}px/unit at {res}px ({stats.islands} islands)")
+
+    with open(stats_path, 'w') as f:
+        json.dump(dict(stats._asdict(), res=res, max_res=max_res, target_density=texel_density, packer=uv_packer_mode), f, indent=2)
+    return res
+
+def fit_baked_texture(actual_baked_png, max_error, stats_path, png_level=DEFAULT_PNG_LEVEL):
+    """
+    Downscales the baked texture (area average in linear light) to the smallest power-of-two
+    fraction whose round trip stays within max_error (1 - SSIM, see scripts/texture_analysis.py)
+    and writes the result to stats_path.
+    """
+    import numpy as np
+    import texture_analysis
+    import texture_resize
+
+    image = bpy.data.images.load(actual_baked_png)
+    width, height = image.size
+    pixels = np.zeros(width * height * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, 4)
+
+    analysis = texture_analysis.useful_resolution(pixels, max_error)
+    if analysis.res < analysis.size:
+        shape = texture_resize.fit_shape(pixels.shape, analysis.res)
+        small = texture_resize.resize(pixels, shape, filter="box")
+        image.scale(small.shape[1], small.shape[0])
+        image.pixels.foreach_set(small.astype(np.float32).ravel())
+        save_image_png(image, actual_baked_png, png_level)
+        print(f"🔹 Baked texture only needs {analysis.res}px (error {analysis.error:.4f}), downscaled from {analysis.size}px")
+    else:
+        print(f"🔹 Baked texture keeps {analysis.size}px (halving would exceed error {max_error})")
+    bpy.data.images.remove(image)
+
+    with open(stats_path, 'w') as f:
+        json.dump(dict(analysis._asdict(), max_error=max_error), f, indent=2)
+    return analysis
+
+def reduce_baked_channels(actual_baked_png, stats_path, png_level=DEFAULT_PNG_LEVEL):
+    """
+    Rewrites the baked PNG without redundant channels (see scripts/texture_channels.py) and writes the
+    channel counts and byte savings to stats_path. Alpha is kept only when some baked pixel is not
+    fully opaque; report.alpha says whether it was.
+    """
+    import numpy as np
+    import png_writer
+    import texture_channels
+
+    image = bpy.data.images.load(actual_baked_png)
+    width, height = image.size
+    channels = image.channels
+    pixels = np.zeros(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    bpy.data.images.remove(image)
+
+    bytes_in = os.path.getsize(actual_baked_png)
+    reduced, report = texture_channels.reduce_channels(pixels.reshape(height, width, channels)[::-1], keep_alpha=True)
+    bytes_out = bytes_in
+    if report.channels_out < report.channels_in:
+        bytes_out = png_writer.write_png(actual_baked_png, reduced, png_level)
+    print(f"🔹 Baked texture stored with {report.channels_out} of {report.channels_in} channels ({bytes_in - bytes_out} PNG bytes saved)")
+
+    with open(stats_path, 'w') as f:
+        json.dump(dict(report._asdict(), png_bytes_in=bytes_in, png_bytes_out=bytes_out), f, indent=2)
+    return report
 
 def process():
     try:
@@ -10,7 +197,7 @@ def process():
         argv = []
 
     if len(argv) < 4:
-        print("Usage: blender --background --python blender_unwrap_bake.py -- <high_obj> <low_raw> <high_tex> <output_glb> <max_res> <target_v> <token_type>")
+        print("Usage: blender --background --python blender_unwrap_bake.py -- <high_obj> <low_raw> <high_tex> <output_glb> <max_res> <target_v> <token_type> [bake_stage] [uv_packer] [texel_density] [texture_max_error] [png_level] [reduce_channels]")
         sys.exit(1)
 
     high_poly_obj = argv[0]
@@ -23,6 +210,62 @@ def process():
     # Catch the 7th argument (the profile choice from your main menu)
     token_type = str(argv[6]) if len(argv) > 6 else "1"
 
+    bake_stage = str(argv[7]) if len(argv) > 7 else "full"
+    if bake_stage not in BAKE_STAGES:
+        print(f"Error: Unknown bake stage '{bake_stage}'. Expected one of {BAKE_STAGES}.")
+        sys.exit(1)
+
+    uv_packer_mode = str(argv[8]) if len(argv) > 8 else "blender"
+    if uv_packer_mode not in UV_PACKERS:
+        print(f"Error: Unknown UV packer '{uv_packer_mode}'. Expected one of {UV_PACKERS}.")
+        sys.exit(1)
+
+    texel_density = float(argv[9]) if len(argv) > 9 else 0.0
+
+    # 0 keeps the baked texture at the bake resolution
+    texture_max_error = float(argv[10]) if len(argv) > 10 else 0.0
+
+    png_level = int(argv[11]) if len(argv) > 11 else DEFAULT_PNG_LEVEL
+
+    # 1 strips constant alpha and greyscale-as-RGB channels from the baked texture
+    reduce_channels = len(argv) > 12 and argv[12] == "1"
+
+    low_uv_obj, prepared_blend = prepared_paths(output_glb)
+    actual_baked_png = output_glb.replace('.glb', '_baked.png')
+
+    if bake_stage == "finish":
+        low_obj = load_prepared_scene(prepared_blend)
+        high_poly_objs = []
+    else:
+        high_poly_objs, low_obj = build_low_poly(high_poly_obj, low_poly_raw_obj, token_type)
+        bake_res = pack_and_measure_uvs(low_obj, uv_packer_mode, max_res, output_glb.replace('.glb', '_uv_stats.json'), texel_density)
+
+        if bake_stage == "prepare":
+            export_prepared_scene(low_obj, high_poly_objs, low_uv_obj, prepared_blend)
+            bpy.ops.wm.quit_blender()
+            return
+
+    if bake_stage == "full":
+        low_mat, bake_tex_node = bake_with_cycles(high_poly_objs, low_obj, high_poly_tex, bake_res, actual_baked_png, png_level=png_level)
+    else:
+        print(f"🔹 Applying externally baked texture: {actual_baked_png}")
+        if not os.path.exists(actual_baked_png):
+            print(f"❌ Baked texture {actual_baked_png} does not exist.")
+            sys.exit(1)
+        low_mat, bake_tex_node = setup_low_material(low_obj, None)
+
+    if texture_max_error > 0:
+        fit_baked_texture(actual_baked_png, texture_max_error, output_glb.replace('.glb', '_texture_stats.json'), png_level)
+
+    opaque = False
+    if reduce_channels:
+        report = reduce_baked_channels(actual_baked_png, output_glb.replace('.glb', '_channel_stats.json'), png_level)
+        opaque = not report.alpha
+
+    apply_matte_finish(low_mat, bake_tex_node, actual_baked_png, opaque=opaque)
+    finalize_and_export(low_obj, high_poly_objs, output_glb, token_type)
+
+def build_low_poly(high_poly_obj, low_poly_raw_obj, token_type):
     # 1. CLEAN SCENE
     bpy.ops.object.select_all(action='SELECT')
     bpy.ops.object.delete()
@@ -136,6 +379,14 @@ def process():
     except Exception:
         pass
 
+    return high_poly_objs, low_obj
+
+def bake_with_cycles(high_poly_objs, low_obj, high_poly_tex, max_res, actual_baked_png, margin=8, cage_extrusion=None, transparent=False, png_level=DEFAULT_PNG_LEVEL):
+    """
+    Selected-to-active EMIT bake of the high-poly diffuse onto low_obj, saved to actual_baked_png.
+    UV tile bakes (blender_bake_tile.py) pass margin=0, the whole model's cage_extrusion and
+    transparent=True so unbaked texels can be told apart when the tiles are stitched.
+    """
     # 7. SETUP CYCLES & HIGH POLY MATERIAL
     print("🔹 Setting up Cycles and High-Poly Material...")
     bpy.context.scene.render.engine = 'CYCLES'
@@ -169,21 +420,10 @@ def process():
         obj.data.materials.append(high_mat)
 
     # 8. LOW POLY MATERIAL SETUP
-    print("🔹 Setting up Low-Poly Material for Bake...")
-    low_mat = bpy.data.materials.new(name="LowPoly_Mat")
-    low_mat.use_nodes = True
-    low_nodes = low_mat.node_tree.nodes
-
     baked_image = bpy.data.images.new(name="Baked_Diffuse", width=max_res, height=max_res, alpha=True)
-    bake_tex_node = low_nodes.new('ShaderNodeTexImage')
-    bake_tex_node.image = baked_image
-
-    for node in low_nodes: node.select = False
-    bake_tex_node.select = True
-    low_nodes.active = bake_tex_node
-
-    low_obj.data.materials.clear()
-    low_obj.data.materials.append(low_mat)
+    if transparent:
+        baked_image.generated_color = (0.0, 0.0, 0.0, 0.0)
+    low_mat, bake_tex_node = setup_low_material(low_obj, baked_image)
 
     # 9. EXECUTE BAKE
     print("🔹 Executing Cycles Bake...")
@@ -196,10 +436,13 @@ def process():
 
     bpy.context.view_layer.update()
     
-    max_dimension = max(low_obj.dimensions)
-    calculated_extrusion = max_dimension * 0.008
-    dynamic_extrusion = min(calculated_extrusion, 0.012)
-    print(f"🔹 Dynamic Cage Extrusion calculated at: {dynamic_extrusion:.4f}m")
+    if cage_extrusion is None:
+        max_dimension = max(low_obj.dimensions)
+        calculated_extrusion = max_dimension * 0.008
+        dynamic_extrusion = min(calculated_extrusion, 0.012)
+        print(f"🔹 Dynamic Cage Extrusion calculated at: {dynamic_extrusion:.4f}m")
+    else:
+        dynamic_extrusion = cage_extrusion
 
     try:
         bpy.ops.object.bake(
@@ -207,7 +450,7 @@ def process():
             use_selected_to_active=True,
             use_cage=True,
             cage_extrusion=dynamic_extrusion,
-            margin=8,
+            margin=margin,
             margin_type='EXTEND'
         )
         print("✅ Cycles bake complete!")
@@ -215,17 +458,42 @@ def process():
         print(f"❌ Cycles Bake Error: {e}")
         sys.exit(1)
 
-    # 10. SAVE TEXTURE & APPLY MATTE FINISH
-    print("🔹 Saving Texture and Applying Matte Finish...")
-    actual_baked_png = output_glb.replace('.glb', '_baked.png')
-    baked_image.filepath_raw = actual_baked_png
-    baked_image.file_format = 'PNG'
-    baked_image.save()
+    # 10. SAVE TEXTURE
+    save_image_png(baked_image, actual_baked_png, png_level)
+
+    return low_mat, bake_tex_node
+
+def setup_low_material(low_obj, image):
+    print("🔹 Setting up Low-Poly Material for Bake...")
+    low_mat = bpy.data.materials.new(name="LowPoly_Mat")
+    low_mat.use_nodes = True
+    low_nodes = low_mat.node_tree.nodes
+
+    bake_tex_node = low_nodes.new('ShaderNodeTexImage')
+    bake_tex_node.image = image
+
+    for node in low_nodes: node.select = False
+    bake_tex_node.select = True
+    low_nodes.active = bake_tex_node
+
+    low_obj.data.materials.clear()
+    low_obj.data.materials.append(low_mat)
+    return low_mat, bake_tex_node
+
+def apply_matte_finish(low_mat, bake_tex_node, actual_baked_png, opaque=False):
+    print("🔹 Packing Texture and Applying Matte Finish...")
+    low_nodes = low_mat.node_tree.nodes
 
     loaded_image = bpy.data.images.load(actual_baked_png)
     loaded_image.pack()
     bake_tex_node.image = loaded_image
 
+    if opaque:
+        # The bake was stored without alpha: export an OPAQUE material and don't look for an alpha channel
+        loaded_image.alpha_mode = 'NONE'
+        if hasattr(low_mat, 'blend_method'):
+            low_mat.blend_method = 'OPAQUE'
+
     bsdf = next((n for n in low_nodes if n.type == 'BSDF_PRINCIPLED'), None) or low_nodes.get("Principled BSDF") or low_nodes.new('ShaderNodeBsdfPrincipled')
 
     if 'Base Color' in bsdf.inputs:
@@ -242,6 +510,7 @@ def process():
     if 'Specular IOR Level' in bsdf.inputs: bsdf.inputs['Specular IOR Level'].default_value = 0.0
     elif 'Specular' in bsdf.inputs: bsdf.inputs['Specular'].default_value = 0.0
 
+def finalize_and_export(low_obj, high_poly_objs, output_glb, token_type):
     # 11. ATTACH MASTER BASE (POST-BAKE)
     if token_type == "3":
         print("🔹 Profile 3 (Tile/Scenery) selected. Skipping master base attachment.")
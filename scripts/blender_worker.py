@@ -2,22 +2,6 @@ import bpy
 import os
 import sys
 
-# Manually add the standard Windows Addon path to sys.path
-user_addon_path = os.path.expandvars(r'%APPDATA%\Blender Foundation\Blender\5.0\scripts\addons')
-if user_addon_path not in sys.path:
-    sys.path.append(user_addon_path)
-
-# Ensure the addon is actually enabled
-# Note: Changed from "quad_remesher_1_4" to "quad_remesher"
-addon_name = "quad_remesher"
-
-if addon_name not in bpy.context.preferences.addons:
-    try:
-        bpy.ops.preferences.addon_enable(module=addon_name)
-        print(f"✅ {addon_name} successfully enabled.")
-    except Exception as e:
-        print(f"❌ Could not enable {addon_name}: {e}")
-
 import bmesh
 import argparse
 import urllib.parse
@@ -27,6 +11,23 @@ import time
 
 MERGE_THRESHOLD = 0.0001
 
+def enable_quad_remesher():
+    # Manually add the standard Windows Addon path to sys.path
+    user_addon_path = os.path.expandvars(r'%APPDATA%\Blender Foundation\Blender\5.0\scripts\addons')
+    if user_addon_path not in sys.path:
+        sys.path.append(user_addon_path)
+
+    # Ensure the addon is actually enabled
+    # Note: Changed from "quad_remesher_1_4" to "quad_remesher"
+    addon_name = "quad_remesher"
+
+    if addon_name not in bpy.context.preferences.addons:
+        try:
+            bpy.ops.preferences.addon_enable(module=addon_name)
+            print(f"✅ {addon_name} successfully enabled.")
+        except Exception as e:
+            print(f"❌ Could not enable {addon_name}: {e}")
+
 # ==========================================
 # SECURITY & VALIDATION
 # ==========================================
@@ -100,6 +101,70 @@ def validate_gltf_path(filepath):
 
     return True
 
+# ==========================================
+# TEXTURE BUDGET
+# ==========================================
+def get_images_from_node_tree(node_tree, visited=None):
+    """
+    Every image referenced by node_tree, including inside nested node groups.
+    Each tree is walked once: `visited` holds the trees already seen and can be shared
+    across calls so groups reused by several materials are not walked again.
+    """
+    images = set()
+    if node_tree is None:
+        return images
+    if visited is None:
+        visited = set()
+
+    stack = [node_tree]
+    while stack:
+        tree = stack.pop()
+        if tree in visited:
+            continue
+        visited.add(tree)
+        for node in tree.nodes:
+            if node.type == 'TEX_IMAGE' and node.image is not None:
+                images.add(node.image)
+            elif node.type == 'GROUP' and node.node_tree is not None:
+                stack.append(node.node_tree)
+    return images
+
+def resize_textures(max_res, objects=None):
+    """
+    Scales every image used by the objects' materials so its longest side is at most max_res.
+    Materials and node trees shared between objects are visited once, and each image is
+    resized at most once. Returns the resized images.
+    """
+    if objects is None:
+        objects = bpy.context.scene.objects
+
+    seen_materials = set()
+    visited_trees = set()
+    images = set()
+    for obj in objects:
+        for slot in obj.material_slots:
+            mat = slot.material
+            if mat is None or mat in seen_materials:
+                continue
+            seen_materials.add(mat)
+            if mat.use_nodes:
+                images |= get_images_from_node_tree(mat.node_tree, visited_trees)
+
+    resized = []
+    for img in sorted(images, key=lambda i: i.name):
+        width, height = img.size[0], img.size[1]
+        longest = max(width, height)
+        if longest <= max_res:
+            continue
+        scale = max_res / longest
+        new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        img.scale(*new_size)
+        resized.append(img)
+        print(f"🔹 Resized texture {img.name}: {width}x{height} -> {new_size[0]}x{new_size[1]}")
+
+    print(f"🔹 Texture budget {max_res}px: {len(resized)} of {len(images)} image(s) resized.")
+    return resized
+
 # ==========================================
 # CLI ARGUMENTS
 # ==========================================
@@ -343,6 +408,7 @@ def process():
         argv = []
 
     args = build_args().parse_args(argv)
+    enable_quad_remesher()
 
     # 1. CLEAN SCENE & IMPORT HIGH-POLY
     bpy.ops.object.select_all(action='SELECT')
@@ -381,6 +447,9 @@ def process():
     high_obj = bpy.context.view_layer.objects.active
     high_obj.name = "HighPoly_Master"
 
+    # The bake supersamples at 2x maxtex; source textures above that only cost memory and bake time
+    resize_textures(args.maxtex * 2, [high_obj])
+
     # --- JULES: INSERT SURGICAL FIX HERE ---
     if args.normalize == 1:
         # Center the origin and normalize to exactly 1.0 unit
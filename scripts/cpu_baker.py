@@ -0,0 +1,345 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+try:
+    from scripts import mesh_bvh, png_writer
+except ImportError:  # Frozen build / running from inside scripts/
+    import mesh_bvh
+    import png_writer
+
+# CPU alternative to the Cycles selected-to-active EMIT bake in blender_unwrap_bake.py.
+# Runs on the host (outside Blender), so UV tiles can be spread over a real process pool.
+
+DEFAULT_TILE = 256
+DEFAULT_MARGIN = 8
+
+# Same cage as the Cycles bake: 0.8% of the largest dimension, capped at 12mm
+CAGE_FRACTION = 0.008
+CAGE_MAX = 0.012
+
+# Candidate (triangle, texel) pairs evaluated per rasterization chunk
+RASTER_CHUNK = 1 << 21
+
+
+# ==========================================
+# OBJ LOADING
+# ==========================================
+def _obj_indices(raw, count):
+    # OBJ indices are 1-based, negative values count back from the end, 0 marks a missing component
+    raw = raw.astype(np.int64)
+    return np.where(raw < 0, raw + count, raw - 1)
+
+
+def _parse_floats(lines, width):
+    values = np.array(' '.join(lines).split(), dtype=np.float64)
+    if values.size != len(lines) * width:
+        # Extra components (w, vertex colours) on some lines: fall back to per-line parsing
+        values = np.array([line.split()[:width] for line in lines], dtype=np.float64)
+    return values.reshape(-1, width)
+
+
+def load_obj(path):
+    """
+    Minimal OBJ reader for the meshes our Blender passes export.
+    Returns (positions, uvs, normals, corners) where corners is an (F, 3, 3) array of
+    position/uv/normal indices per triangle corner (-1 when a component is missing).
+    Polygons are fan-triangulated.
+    """
+    v_lines, vt_lines, vn_lines = [], [], []
+    faces_by_size = {}
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line.startswith('v '):
+                v_lines.append(line[2:])
+            elif line.startswith('vt '):
+                vt_lines.append(line[3:])
+            elif line.startswith('vn '):
+                vn_lines.append(line[3:])
+            elif line.startswith('f '):
+                tokens = line[2:].split()
+                if len(tokens) >= 3:
+                    faces_by_size.setdefault(len(tokens), []).append(tokens)
+
+    positions = _parse_floats(v_lines, 3) if v_lines else np.zeros((0, 3))
+    uvs = _parse_floats(vt_lines, 2) if vt_lines else np.zeros((0, 2))
+    normals = _parse_floats(vn_lines, 3) if vn_lines else np.zeros((0, 3))
+    counts = (len(positions), len(uvs), len(normals))
+
+    triangles = []
+    for size, faces in faces_by_size.items():
+        corners = np.zeros((len(faces), size, 3), dtype=np.int64)
+        for c in range(size):
+            parts = [face[c].split('/') for face in faces]
+            for k in range(3):
+                column = [p[k] if len(p) > k and p[k] else '0' for p in parts]
+                corners[:, c, k] = np.array(column, dtype=np.int64)
+        for k in range(3):
+            corners[..., k] = _obj_indices(corners[..., k], counts[k])
+        for i in range(1, size - 1):
+            triangles.append(corners[:, [0, i, i + 1]])
+
+    corners = np.concatenate(triangles) if triangles else np.zeros((0, 3, 3), dtype=np.int64)
+    return positions, uvs, normals, corners
+
+
+def _corner_normals(positions, corners, normals):
+    # Use exported normals when every corner has one, otherwise fall back to area-weighted vertex normals
+    if len(normals) and (corners[..., 2] >= 0).all():
+        return normals[corners[..., 2]]
+
+    tri = positions[corners[..., 0]]
+    face_n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    vertex_n = np.zeros_like(positions)
+    for c in range(3):
+        np.add.at(vertex_n, corners[:, c, 0], face_n)
+    return vertex_n[corners[..., 0]]
+
+
+def cage_extrusion(positions):
+    """Cage distance used by the Cycles bake for the same low-poly."""
+    if not len(positions):
+        return CAGE_MAX
+    max_dimension = float(np.max(positions.max(axis=0) - positions.min(axis=0)))
+    return min(max_dimension * CAGE_FRACTION, CAGE_MAX)
+
+
+# ==========================================
+# RASTERIZATION & SAMPLING
+# ==========================================
+def rasterize_uv_triangles(tri_uvs, resolution, tile=None):
+    """
+    Finds the texels whose centres fall inside each UV triangle.
+    `tile` optionally restricts the search to (x0, y0, x1, y1) texel bounds (rows from the top).
+    Returns (pixel_index, triangle, barycentrics) with one entry per covered texel.
+    """
+    x_lo, y_lo, x_hi, y_hi = tile or (0, 0, resolution, resolution)
+
+    # Texel (x, y) samples u = (x + 0.5) / res, v = 1 - (y + 0.5) / res
+    px = tri_uvs[..., 0] * resolution - 0.5
+    py = (1.0 - tri_uvs[..., 1]) * resolution - 0.5
+    x0 = np.maximum(np.ceil(px.min(axis=1)), x_lo).astype(np.int64)
+    x1 = np.minimum(np.floor(px.max(axis=1)), x_hi - 1).astype(np.int64)
+    y0 = np.maximum(np.ceil(py.min(axis=1)), y_lo).astype(np.int64)
+    y1 = np.minimum(np.floor(py.max(axis=1)), y_hi - 1).astype(np.int64)
+    widths = np.maximum(x1 - x0 + 1, 0)
+    counts = widths * np.maximum(y1 - y0 + 1, 0)
+
+    area = (px[:, 1] - px[:, 0]) * (py[:, 2] - py[:, 0]) - (px[:, 2] - px[:, 0]) * (py[:, 1] - py[:, 0])
+    candidates = np.flatnonzero((counts > 0) & (np.abs(area) > 1e-12))
+
+    pixels, tris, barys = [], [], []
+    start = 0
+    cumulative = np.cumsum(counts[candidates])
+    while start < len(candidates):
+        # Bound the number of (triangle, texel) candidates held in memory at once
+        base = cumulative[start - 1] if start else 0
+        stop = max(start + 1, int(np.searchsorted(cumulative, base + RASTER_CHUNK, side='right')))
+        chunk = candidates[start:stop]
+        start = stop
+
+        tri = np.repeat(chunk, counts[chunk])
+        offsets = np.cumsum(counts[chunk]) - counts[chunk]
+        local = np.arange(len(tri)) - np.repeat(offsets, counts[chunk])
+        x = x0[tri] + local % widths[tri]
+        y = y0[tri] + local // widths[tri]
+
+        # Edge functions give the barycentrics of each texel centre
+        w1 = ((x - px[tri, 0]) * (py[tri, 2] - py[tri, 0]) - (px[tri, 2] - px[tri, 0]) * (y - py[tri, 0])) / area[tri]
+        w2 = ((px[tri, 1] - px[tri, 0]) * (y - py[tri, 0]) - (x - px[tri, 0]) * (py[tri, 1] - py[tri, 0])) / area[tri]
+        w0 = 1.0 - w1 - w2
+        inside = (w0 >= -1e-9) & (w1 >= -1e-9) & (w2 >= -1e-9)
+
+        pixels.append(y[inside] * resolution + x[inside])
+        tris.append(tri[inside])
+        barys.append(np.stack([w0[inside], w1[inside], w2[inside]], axis=1))
+
+    if not pixels:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+
+    pixels, tris, barys = np.concatenate(pixels), np.concatenate(tris), np.concatenate(barys)
+    # Texels on a shared edge belong to whichever triangle claimed them first
+    pixels, first = np.unique(pixels, return_index=True)
+    return pixels, tris[first], barys[first]
+
+
+def sample_bilinear(texture, uv):
+    """Bilinearly samples an (H, W, C) float texture at UV coordinates, repeating outside 0-1."""
+    h, w = texture.shape[:2]
+    x = uv[:, 0] * w - 0.5
+    y = (1.0 - uv[:, 1]) * h - 0.5
+    x0 = np.floor(x)
+    y0 = np.floor(y)
+    fx = (x - x0)[:, None]
+    fy = (y - y0)[:, None]
+    x0 = x0.astype(np.int64) % w
+    y0 = y0.astype(np.int64) % h
+    x1 = (x0 + 1) % w
+    y1 = (y0 + 1) % h
+    top = texture[y0, x0] * (1 - fx) + texture[y0, x1] * fx
+    bottom = texture[y1, x0] * (1 - fx) + texture[y1, x1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def dilate(image, mask, margin):
+    """
+    Edge-extend margin: grows covered texels outwards `margin` pixels, each new texel
+    taking the mean of its already-covered 8-neighbours. Matches Cycles' EXTEND margin closely
+    enough that mip-mapping never bleeds the background into UV seams.
+    """
+    image = image.copy()
+    mask = mask.copy()
+    h, w = mask.shape
+    for _ in range(margin):
+        if mask.all():
+            break
+        padded_img = np.pad(image * mask[..., None], ((1, 1), (1, 1), (0, 0)))
+        padded_mask = np.pad(mask.astype(np.float32), 1)
+        total = np.zeros_like(image)
+        weight = np.zeros(mask.shape, dtype=np.float32)
+        for dy in (0, 1, 2):
+            for dx in (0, 1, 2):
+                if dy == 1 and dx == 1:
+                    continue
+                total += padded_img[dy:dy + h, dx:dx + w]
+                weight += padded_mask[dy:dy + h, dx:dx + w]
+        grow = ~mask & (weight > 0)
+        if not grow.any():
+            break
+        image[grow] = total[grow] / weight[grow][:, None]
+        mask |= grow
+    return image, mask
+
+
+# ==========================================
+# TILE WORKERS
+# ==========================================
+_STATE = {}
+
+
+def _init_worker(state):
+    _STATE.clear()
+    _STATE.update(state)
+
+
+def _bake_tile(tile):
+    s = _STATE
+    pixels, tris, barys = rasterize_uv_triangles(s['low_uvs'], s['resolution'], tile)
+    if not len(pixels):
+        return pixels, np.zeros((0, s['texture'].shape[2]), dtype=np.float32)
+
+    points = np.einsum('ij,ijk->ik', barys, s['low_positions'][tris])
+    normals = np.einsum('ij,ijk->ik', barys, s['low_normals'][tris])
+    normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-12)[:, None]
+
+    # Shoot inwards from the cage, like Cycles' use_cage with cage_extrusion
+    hits = mesh_bvh.intersect_rays(s['bvh'], points + normals * s['extrusion'], -normals, t_min=0.0, workers=1)
+
+    # Texels whose cage ray found nothing look outwards instead (high-poly floating above the low-poly)
+    missed = np.flatnonzero(~hits.hit)
+    if missed.size:
+        retry = mesh_bvh.intersect_rays(s['bvh'], points[missed], normals[missed], t_min=0.0, workers=1)
+        for field, values in zip(hits, retry):
+            field[missed] = values
+
+    hit = hits.hit
+    tri = hits.tri[hit]
+    u = hits.u[hit][:, None]
+    v = hits.v[hit][:, None]
+    corner_uvs = s['high_uvs'][tri]
+    hit_uvs = corner_uvs[:, 0] * (1 - u - v) + corner_uvs[:, 1] * u + corner_uvs[:, 2] * v
+    return pixels[hit], sample_bilinear(s['texture'], hit_uvs).astype(np.float32)
+
+
+def _make_tiles(resolution, tile_size):
+    return [
+        (x, y, min(x + tile_size, resolution), min(y + tile_size, resolution))
+        for y in range(0, resolution, tile_size)
+        for x in range(0, resolution, tile_size)
+    ]
+
+
+# ==========================================
+# BAKE ENTRY POINT
+# ==========================================
+def bake_texture(high_obj, high_tex, low_obj, output_png, resolution=1024, extrusion=None, margin=DEFAULT_MARGIN, tile_size=DEFAULT_TILE, workers=None, png_level=png_writer.DEFAULT_LEVEL):
+    """
+    Bakes the high-poly diffuse onto the low-poly's UVs and saves it as `output_png`.
+    Drop-in for the Cycles EMIT bake: same cage, same EXTEND margin, untextured high-poly bakes white.
+    Returns True on success.
+    """
+    for path in (high_obj, low_obj):
+        if not os.path.exists(path):
+            print(f"❌ CPU Bake Error: {path} does not exist.")
+            return False
+
+    high_positions, high_uvs, _, high_corners = load_obj(high_obj)
+    low_positions, low_uvs, low_normals, low_corners = load_obj(low_obj)
+
+    if not len(high_corners) or not len(low_corners):
+        print("❌ CPU Bake Error: high-poly or low-poly OBJ has no faces.")
+        return False
+    if not len(low_uvs) or (low_corners[..., 1] < 0).any():
+        print("❌ CPU Bake Error: low-poly OBJ has no UVs.")
+        return False
+
+    if high_tex and os.path.exists(high_tex):
+        with Image.open(high_tex) as img:
+            texture = np.asarray(img.convert('RGB'), dtype=np.float32) / 255.0
+    else:
+        print("⚠️ No high-poly texture found. Baking plain white like an untextured emission shader.")
+        texture = np.ones((1, 1, 3), dtype=np.float32)
+
+    if len(high_uvs) and (high_corners[..., 1] >= 0).all():
+        high_tri_uvs = high_uvs[high_corners[..., 1]].astype(np.float32)
+    else:
+        high_tri_uvs = np.zeros((len(high_corners), 3, 2), dtype=np.float32)
+
+    if extrusion is None:
+        extrusion = cage_extrusion(low_positions)
+
+    print(f"🔹 Building BVH over {len(high_corners)} high-poly triangles...")
+    bvh = mesh_bvh.build_bvh(high_positions, high_corners[..., 0])
+
+    state = {
+        'bvh': bvh,
+        'high_uvs': high_tri_uvs,
+        'texture': texture,
+        'low_uvs': low_uvs[low_corners[..., 1]],
+        'low_positions': low_positions[low_corners[..., 0]],
+        'low_normals': _corner_normals(low_positions, low_corners, low_normals),
+        'extrusion': extrusion,
+        'resolution': resolution,
+    }
+
+    tiles = _make_tiles(resolution, tile_size)
+    workers = min(workers or os.cpu_count() or 1, len(tiles))
+    print(f"🔹 CPU baking {resolution}px in {len(tiles)} tiles on {workers} worker(s), cage {extrusion:.4f}m...")
+
+    image = np.zeros((resolution * resolution, texture.shape[2]), dtype=np.float32)
+    covered = np.zeros(resolution * resolution, dtype=bool)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state,)) as executor:
+            results = list(executor.map(_bake_tile, tiles))
+    else:
+        _init_worker(state)
+        results = [_bake_tile(tile) for tile in tiles]
+        _STATE.clear()
+
+    for pixels, colors in results:
+        image[pixels] = colors
+        covered[pixels] = True
+
+    image, _ = dilate(image.reshape(resolution, resolution, -1), covered.reshape(resolution, resolution), margin)
+
+    # Unbaked background stays opaque black, like the Cycles bake target
+    rgba = np.ones((resolution, resolution, 4), dtype=np.float32)
+    rgba[..., :3] = image
+    png_writer.write_png(output_png, rgba, png_level)
+
+    print(f"✅ CPU bake complete! {covered.mean():.1%} of texels covered.")
+    return True
@@ -0,0 +1,236 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+# Minimal GLB container access for host-side passes that rewrite embedded images after Blender
+# has exported: read the JSON and BIN chunks, swap an image's bytes, and re-lay the binary
+# buffer out with every bufferView 4-byte aligned.
+
+GLB_MAGIC = b'glTF'
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+COMPONENT_TYPES = {5120: np.int8, 5121: np.uint8, 5122: np.int16, 5123: np.uint16, 5125: np.uint32, 5126: np.float32}
+TYPE_SIZES = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT2': 4, 'MAT3': 9, 'MAT4': 16}
+FLOAT = 5126
+
+
+def _pad(data, fill):
+    return data + fill * (-len(data) % 4)
+
+
+def read_glb(path):
+    """Returns (gltf dict, bin bytes) of a GLB file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < 20 or data[:4] != GLB_MAGIC:
+        raise ValueError(f"{path} is not a GLB file")
+
+    gltf, binary = None, b''
+    offset = 12
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack_from('<II', data, offset)
+        chunk = data[offset + 8:offset + 8 + length]
+        if kind == CHUNK_JSON:
+            gltf = json.loads(chunk.decode('utf-8'))
+        elif kind == CHUNK_BIN and not binary:
+            binary = chunk
+        offset += 8 + length
+    if gltf is None:
+        raise ValueError(f"{path} has no JSON chunk")
+    return gltf, binary
+
+
+def verify_glb(path):
+    """
+    Checks a GLB's header and chunk table against its size on disk, reading only the headers.
+    Raises ValueError for anything truncated or not a glTF 2.0 binary.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != GLB_MAGIC:
+            raise ValueError(f"{path} is not a GLB file")
+        version, length = struct.unpack('<II', header[4:])
+        if version != 2:
+            raise ValueError(f"{path} is glTF version {version}, expected 2")
+        if length != size:
+            raise ValueError(f"{path} is {size} bytes but its header declares {length}")
+
+        offset = 12
+        while offset < length:
+            f.seek(offset)
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"{path} has a truncated chunk header at byte {offset}")
+            chunk_length, kind = struct.unpack('<II', chunk)
+            if offset == 12 and kind != CHUNK_JSON:
+                raise ValueError(f"{path} does not start with a JSON chunk")
+            offset += 8 + chunk_length
+        if offset != length:
+            raise ValueError(f"{path} has a chunk running past the end of the file")
+
+
+def write_glb(path, gltf, binary):
+    json_chunk = _pad(json.dumps(gltf, separators=(',', ':')).encode('utf-8'), b' ')
+    chunks = struct.pack('<II', len(json_chunk), CHUNK_JSON) + json_chunk
+    if binary:
+        bin_chunk = _pad(binary, b'\0')
+        chunks += struct.pack('<II', len(bin_chunk), CHUNK_BIN) + bin_chunk
+    with open(path, 'wb') as f:
+        f.write(GLB_MAGIC + struct.pack('<II', 2, 12 + len(chunks)) + chunks)
+    return 12 + len(chunks)
+
+
+def view_bytes(gltf, binary, view_index):
+    view = gltf['bufferViews'][view_index]
+    start = view.get('byteOffset', 0)
+    return binary[start:start + view['byteLength']]
+
+
+def embedded_images(gltf, binary):
+    """(image_index, bytes, mimeType) for every image stored in a bufferView."""
+    return [
+        (i, view_bytes(gltf, binary, image['bufferView']), image.get('mimeType', ''))
+        for i, image in enumerate(gltf.get('images', []))
+        if 'bufferView' in image
+    ]
+
+
+def rebuild_buffer(gltf, binary, replacements):
+    """
+    New BIN chunk with bufferView contents swapped per replacements {view_index: bytes};
+    every view of buffer 0 is repacked at a 4-byte aligned offset and buffer 0's byteLength updated.
+    """
+    out = bytearray()
+    for i, view in enumerate(gltf.get('bufferViews', [])):
+        if view.get('buffer', 0) != 0:
+            continue
+        data = replacements[i] if i in replacements else view_bytes(gltf, binary, i)
+        out += b'\0' * (-len(out) % 4)
+        view['byteOffset'] = len(out)
+        view['byteLength'] = len(data)
+        out += data
+    if gltf.get('buffers'):
+        gltf['buffers'][0]['byteLength'] = len(out)
+    return bytes(out)
+
+
+def replace_images(gltf, binary, images):
+    """Swaps embedded image data: images is {image_index: (bytes, mimeType)}. Returns the new BIN chunk."""
+    replacements = {}
+    for index, (data, mime) in images.items():
+        image = gltf['images'][index]
+        replacements[image['bufferView']] = data
+        image['mimeType'] = mime
+    return rebuild_buffer(gltf, binary, replacements)
+
+
+def read_accessor(gltf, binary, index):
+    """(count, components) float array of an accessor; normalized integers are scaled to [0, 1] / [-1, 1]."""
+    accessor = gltf['accessors'][index]
+    if 'sparse' in accessor or 'bufferView' not in accessor:
+        raise ValueError(f"Accessor {index} is sparse or has no bufferView")
+    dtype = np.dtype(COMPONENT_TYPES[accessor['componentType']])
+    components = TYPE_SIZES[accessor['type']]
+    view = gltf['bufferViews'][accessor['bufferView']]
+    stride = view.get('byteStride') or dtype.itemsize * components
+    start = view.get('byteOffset', 0) + accessor.get('byteOffset', 0)
+
+    values = np.ndarray((accessor['count'], components), dtype=dtype, buffer=binary, offset=start, strides=(stride, dtype.itemsize))
+    values = values.astype(np.float64)
+    if accessor.get('normalized'):
+        limit = float(np.iinfo(dtype).max)
+        values = np.maximum(values / limit, -1.0)
+    return values
+
+
+def append_view(gltf, binary, data):
+    """Appends data to buffer 0 as a new, 4-byte aligned bufferView. Returns (binary, view index)."""
+    binary = binary + b'\0' * (-len(binary) % 4)
+    views = gltf.setdefault('bufferViews', [])
+    views.append({'buffer': 0, 'byteOffset': len(binary), 'byteLength': len(data)})
+    binary += data
+    if gltf.get('buffers'):
+        gltf['buffers'][0]['byteLength'] = len(binary)
+    else:
+        gltf['buffers'] = [{'byteLength': len(binary)}]
+    return binary, len(views) - 1
+
+
+def write_float_accessor(gltf, binary, index, values):
+    """Points an accessor at a fresh tightly packed FLOAT copy of values; the old view is left for drop_unused_views."""
+    values = np.ascontiguousarray(values, dtype=np.float32)
+    binary, view = append_view(gltf, binary, values.tobytes())
+    accessor = gltf['accessors'][index]
+    accessor.update(bufferView=view, byteOffset=0, componentType=FLOAT, count=len(values))
+    accessor.pop('normalized', None)
+    if 'min' in accessor or 'max' in accessor:
+        accessor['min'] = values.min(axis=0).tolist()
+        accessor['max'] = values.max(axis=0).tolist()
+    return binary
+
+
+def _collect_views(node, found):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'bufferView' and isinstance(value, int):
+                found.add(value)
+            else:
+                _collect_views(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_views(value, found)
+    return found
+
+
+def _remap_views(node, mapping):
+    # Every "bufferView" index anywhere in the JSON (accessors, sparse, images, compression extensions)
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'bufferView' and isinstance(value, int):
+                node[key] = mapping[value]
+            else:
+                _remap_views(value, mapping)
+    elif isinstance(node, list):
+        for value in node:
+            _remap_views(value, mapping)
+
+
+def drop_unused_views(gltf, binary):
+    """Removes bufferViews nothing references, renumbers the rest and repacks buffer 0. Returns the new BIN chunk."""
+    views = gltf.get('bufferViews', [])
+    others = {k: v for k, v in gltf.items() if k != 'bufferViews'}
+    dropped = set(range(len(views))) - _collect_views(others, set())
+    if not dropped:
+        return binary
+    binary = rebuild_buffer(gltf, binary, {view: b'' for view in dropped})
+
+    mapping = {}
+    for old in range(len(views)):
+        if old not in dropped:
+            mapping[old] = len(mapping)
+    gltf['bufferViews'] = [view for i, view in enumerate(views) if i not in dropped]
+    _remap_views(others, mapping)
+    binary = rebuild_buffer(gltf, binary, {})
+
+    # glTF forbids empty buffers and view lists
+    if not gltf['bufferViews']:
+        del gltf['bufferViews']
+        if len(gltf.get('buffers', [])) == 1:
+            del gltf['buffers']
+    return binary
+
+
+def externalize_images(gltf, binary, uris):
+    """
+    Points images at external files instead of their bufferViews: uris is {image_index: uri}.
+    The freed views are dropped, the rest renumbered and repacked. Returns the new BIN chunk.
+    """
+    for index, uri in uris.items():
+        image = gltf['images'][index]
+        image.pop('bufferView')
+        image['uri'] = uri
+    return drop_unused_views(gltf, binary)
@@ -3,9 +3,23 @@ import json
 import subprocess
 import shutil
 import argparse
+import functools
+import multiprocessing
 import sys
 from collections import namedtuple
 
+try:
+    from scripts import asset_report, png_writer, quantize, texture_analysis, texture_dedupe, texture_resize, texture_variants, tile_pack
+except ImportError:  # Frozen build / running from inside scripts/
+    import asset_report
+    import png_writer
+    import quantize
+    import texture_analysis
+    import texture_dedupe
+    import texture_resize
+    import texture_variants
+    import tile_pack
+
 # Import pipeline steps directly instead of subprocesses for PyInstaller compatibility
 
 AppPaths = namedtuple('AppPaths', ['base', 'scripts'])
@@ -62,12 +76,23 @@ def resolve_path(path, root_dir):
         return path
     return os.path.normpath(os.path.join(root_dir, path))
 
+def parse_tiers(value):
+    try:
+        return [int(t) for t in value.split(",") if t.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected comma-separated resolutions, got '{value}'")
+
 def parse_args():
     parser = argparse.ArgumentParser(description="ChrisEurolog 3D Asset Pipeline")
     parser.add_argument("--mode", choices=["single", "batch", "meshy"], help="Processing mode")
     parser.add_argument("--profile", choices=["token_production", "token_hobby", "tile", "archive"], help="Optimization profile")
     parser.add_argument("--input", help="Input filename (for single mode)")
     parser.add_argument("--auto", action="store_true", help="Run without interactive prompts")
+    parser.add_argument("--tiers", type=parse_tiers, default=[], help="Extra texture resolutions derived from the same bake, e.g. 2048,1024")
+    parser.add_argument("--also-profile", action="append", default=[], choices=["token_production", "token_hobby", "tile", "archive"], help="Also write this profile's texture resolution from the same bake (repeatable)")
+    parser.add_argument("--pack-tiles", choices=tile_pack.PACK_MODES, help="After processing, atlas the batch's textures: separate GLBs sharing atlas pages, or one combined scene GLB")
+    parser.add_argument("--pack-name", default="tile_pack", help="Name of the tile pack's atlas pages / combined GLB")
+    parser.add_argument("--dedupe", choices=["exact", "perceptual"], help="After processing, share textures repeated across the output library as external files")
     return parser.parse_args()
 
 def get_processing_mode(args_mode):
@@ -109,6 +134,14 @@ def confirm_settings(profile_key, profile_data, auto=False):
     print(f"\n✅ Selected: {profile_key}")
     print(f"   Target Vertices: {target_v}")
     print(f"   Max Resolution: {max_res}px")
+    if profile_data.get('texel_density'):
+        print(f"   Texel Density Target: {profile_data['texel_density']}px/unit (resolution picked per asset, up to the max)")
+    if profile_data.get('texture_max_error'):
+        print(f"   Texture Error Budget: {profile_data['texture_max_error']} (textures downscaled while 1 - SSIM stays below it)")
+    if profile_data.get('texture_budget'):
+        print(f"   Source Texture Budget: {profile_data['texture_budget']}px per image before packing")
+    if profile_data.get('quantize_colors'):
+        print(f"   Palette Quantization: {profile_data['quantize_colors']} colours{' (dithered)' if profile_data.get('quantize_dither') else ''}")
 
     if auto:
         return target_v, max_res
@@ -156,7 +189,7 @@ def get_files_to_process(mode, args_input, source_dir):
 
     return files
 
-def unwrap_and_bake(blender_exe, script_dir, f, high_poly_obj, low_poly_raw_obj, high_poly_tex, temp_base, temp_out_glb, max_res, target_v, profile_key):
+def unwrap_and_bake(blender_exe, script_dir, f, high_poly_obj, low_poly_raw_obj, high_poly_tex, temp_base, temp_out_glb, max_res, target_v, profile_key, bake_backend="cycles", bake_tiles=1, bake_chunk_high=False, uv_packer="blender", texel_density=0, texture_max_error=0, png_level=png_writer.DEFAULT_LEVEL, reduce_channels=False):
     blender_unwrap = os.path.join(script_dir, "blender_unwrap_bake.py")
 
     token_type = "3" if profile_key == "tile" else "1"
@@ -166,15 +199,208 @@ def unwrap_and_bake(blender_exe, script_dir, f, high_poly_obj, low_poly_raw_obj,
         blender_exe, "--background", "--python", blender_unwrap, "--",
         high_poly_obj, low_poly_raw_obj, high_poly_tex, temp_out_glb, str(max_res), str(target_v), token_type
     ]
+    # Appended after the bake stage argument
+    stage_args = [uv_packer, str(texel_density), str(texture_max_error), str(png_level), "1" if reduce_channels else "0"]
+
+    if bake_backend == "cpu":
+        try:
+            from scripts import cpu_baker
+        except ImportError:
+            import cpu_baker
+
+        def bake(low_uv_obj, baked_png, res):
+            return cpu_baker.bake_texture(high_poly_obj, high_poly_tex, low_uv_obj, baked_png, res, png_level=png_level)
+
+        return unwrap_and_bake_staged(unwrap_cmd, stage_args, f, temp_out_glb, max_res, bake)
+
+    if bake_tiles > 1:
+        try:
+            from scripts import bake_tiles as tiled
+        except ImportError:
+            import bake_tiles as tiled
+
+        def bake(low_uv_obj, baked_png, res):
+            return tiled.bake_tiled(blender_exe, script_dir, high_poly_obj, high_poly_tex, low_uv_obj, baked_png, res, bake_tiles, bake_chunk_high, png_level=png_level)
+
+        return unwrap_and_bake_staged(unwrap_cmd, stage_args, f, temp_out_glb, max_res, bake)
 
     try:
-        subprocess.run(unwrap_cmd, check=True)
+        subprocess.run(unwrap_cmd + ["full"] + stage_args, check=True)
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ Blender UV/Bake Error on {f}: {e}")
         return False
 
-def process_file(f, source_dir, temp_dir, output_dir, blender_exe, instant_meshes_exe, xnormal_exe, gltfpack_exe, profile_data, target_v, max_res, app_paths, profile_key, archive_dir):
+def read_bake_resolution(temp_out_glb, max_res):
+    """Resolution picked by the unwrap pass from the profile's texel density target (max_res if unknown)."""
+    try:
+        with open(temp_out_glb.replace('.glb', '_uv_stats.json')) as stats_file:
+            return int(json.load(stats_file).get('res', max_res))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return max_res
+
+def unwrap_and_bake_staged(unwrap_cmd, stage_args, f, temp_out_glb, max_res, bake):
+    """
+    Runs the bake outside the unwrap Blender process: Blender unwraps and saves the scene
+    ('prepare'), bake(low_uv_obj, baked_png, res) writes <output>_baked.png, then Blender
+    reopens the scene to apply it and export ('finish').
+    """
+    low_uv_obj = temp_out_glb.replace('.glb', '_low_uv.obj')
+    baked_png = temp_out_glb.replace('.glb', '_baked.png')
+
+    try:
+        subprocess.run(unwrap_cmd + ["prepare"] + stage_args, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Blender UV Unwrap Error on {f}: {e}")
+        return False
+
+    if not bake(low_uv_obj, baked_png, read_bake_resolution(temp_out_glb, max_res)):
+        print(f"❌ Bake Error on {f}")
+        return False
+
+    try:
+        subprocess.run(unwrap_cmd + ["finish"] + stage_args, check=True)
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Blender Export Error on {f}: {e}")
+        return False
+
+def read_sidecar(path):
+    """Loads and removes a JSON stats file left by a Blender pass; None if it is missing or unreadable."""
+    try:
+        with open(path) as stats_file:
+            stats = json.load(stats_file)
+        os.remove(path)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return stats
+
+def record_uv_stats(f, temp_out_glb, output_dir):
+    """Moves the UV coverage / texel density written by the unwrap pass into the asset report."""
+    stats = read_sidecar(temp_out_glb.replace('.glb', '_uv_stats.json'))
+    if stats is None:
+        return None
+
+    asset_report.record_asset(os.path.join(output_dir, asset_report.REPORT_NAME), f, "uv", stats)
+    print(f"  UV coverage {stats.get('coverage', 0):.1%}, texel density {stats.get('texel_density', 0):.0f}px/unit at {stats.get('res', '?')}px")
+    return stats
+
+def fit_source_texture(high_poly_tex, max_side):
+    """Downscales the extracted diffuse in place when its longest side exceeds max_side."""
+    try:
+        shape = texture_resize.resize_png(high_poly_tex, high_poly_tex, max_side)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warning: Could not resize {high_poly_tex}: {e}")
+        return None
+    if shape:
+        print(f"  Source texture downscaled to {shape[1]}x{shape[0]} (budget {max_side}px)")
+    return shape
+
+def source_texture_cap(high_poly_tex, max_res, max_error):
+    """
+    Caps the bake resolution at the useful resolution of the extracted diffuse (rounded up to a
+    power of two): baking finer than the source's detail only adds empty texels.
+    Returns (bake_res, analysis dict or None).
+    """
+    if max_error <= 0 or not os.path.exists(high_poly_tex):
+        return max_res, None
+    try:
+        analysis = texture_analysis.analyze_png(high_poly_tex, max_error)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warning: Could not analyse {high_poly_tex}: {e}")
+        return max_res, None
+
+    bake_res = min(max_res, 1 << max(0, (analysis.res - 1).bit_length()))
+    print(f"  Source texture uses ~{analysis.res}px of {analysis.size}px (error {analysis.error:.4f}); bake capped at {bake_res}px")
+    return bake_res, dict(analysis._asdict(), bake_cap=bake_res)
+
+def record_texture_stats(f, temp_out_glb, output_dir, source=None):
+    """
+    Records the baked texture's useful resolution, its channel reduction and the source analysis
+    (whichever exist) in the asset report.
+    """
+    stats = read_sidecar(temp_out_glb.replace('.glb', '_texture_stats.json'))
+    channels = read_sidecar(temp_out_glb.replace('.glb', '_channel_stats.json'))
+
+    if stats is None and source is None and channels is None:
+        return None
+    section = {"baked": stats, "source": source, "channels": channels}
+    asset_report.record_asset(os.path.join(output_dir, asset_report.REPORT_NAME), f, "texture", section)
+    if stats:
+        print(f"  Baked texture shipped at {stats.get('res', '?')}px (round-trip error {stats.get('error', 0):.4f})")
+    if channels:
+        saved = channels.get('png_bytes_in', 0) - channels.get('png_bytes_out', 0)
+        print(f"  Baked texture channels {channels.get('channels_in')} -> {channels.get('channels_out')} ({saved / 1024:.1f} KiB saved)")
+    return section
+
+def quantize_textures(f, temp_out_glb, output_dir, colors, dither=False, png_level=png_writer.DEFAULT_LEVEL, section="quantize"):
+    """Palette-quantizes the GLB's embedded textures in place and records the byte savings in the asset report."""
+    if colors <= 0 or not os.path.exists(temp_out_glb):
+        return None
+    try:
+        stats = quantize.quantize_glb(temp_out_glb, colors, dither, png_level)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warning: Could not quantize textures in {temp_out_glb}: {e}")
+        return None
+
+    asset_report.record_asset(os.path.join(output_dir, asset_report.REPORT_NAME), f, section, stats)
+    saved = stats['bytes_before'] - stats['bytes_after']
+    print(f"  Palette quantized {stats['quantized']}/{stats['images']} textures to {colors} colours, saved {saved / 1024:.1f} KiB")
+    return stats
+
+def requested_variants(profiles, tiers, also_profiles, png_level=png_writer.DEFAULT_LEVEL):
+    """TextureVariants for --tiers (named '<res>px') and --also-profile (named after the profile, at its res and PNG level)."""
+    variants = [texture_variants.TextureVariant(f"{tier}px", tier, png_level) for tier in tiers]
+    for name in also_profiles:
+        other = profiles.get(name)
+        if other is None:
+            print(f"⚠️ Warning: Profile '{name}' not found in config. No variant written for it.")
+            continue
+        variants.append(texture_variants.TextureVariant(name, other.get('res', 1024), other.get('png_level', png_writer.DEFAULT_LEVEL)))
+    return variants
+
+def derive_texture_variants(temp_out_glb, max_res, png_level, variants):
+    """
+    Scales the baked textures down to the profile's own max_res (in place) and to every variant's res.
+    Returns {variant name: unoptimized glb}, None being the profile's own output.
+    """
+    try:
+        outputs = texture_variants.write_variants(temp_out_glb, [texture_variants.TextureVariant(None, max_res, png_level)] + list(variants))
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warning: Could not derive texture variants from {temp_out_glb}: {e}")
+        return {None: temp_out_glb}
+    print(f"  Derived {len(variants)} texture variant(s) from one bake: {', '.join(f'{v.name} ({v.res}px)' for v in variants)}")
+    return outputs
+
+def finish_textures(f, temp_out_glb, output_dir, profile_data, max_res, png_level, variants=()):
+    """
+    Derives the texture variants from the bake, then palette-quantizes every output (the profile's
+    own and each variant) when the profile sets quantize_colors. Returns {variant name: unoptimized glb}.
+    """
+    variant_glbs = derive_texture_variants(temp_out_glb, max_res, png_level, variants) if variants else {None: temp_out_glb}
+    for name, variant_glb in variant_glbs.items():
+        quantize_textures(
+            f, variant_glb, output_dir, profile_data.get('quantize_colors', 0),
+            profile_data.get('quantize_dither', False), png_level, "quantize" if name is None else f"quantize_{name}"
+        )
+    return variant_glbs
+
+def run_gltfpack(gltfpack_exe, src_glb, dst_glb, f):
+    """Meshopt pass from src_glb to dst_glb (a plain copy without gltfpack). Returns False if gltfpack fails."""
+    print("  Running Meshopt (gltfpack) pass...")
+    if not os.path.exists(gltfpack_exe):
+        print(f"⚠️ Warning: gltfpack not found at {gltfpack_exe}. Skipping compression.")
+        shutil.copy(src_glb, dst_glb)
+        return True
+    meshopt_cmd = [gltfpack_exe, "-i", src_glb, "-o", dst_glb, "-noq", "-tw"]
+    try:
+        subprocess.run(meshopt_cmd, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Meshopt Error on {f}: {e}")
+        return False
+    return True
+
+def process_file(f, source_dir, temp_dir, output_dir, blender_exe, instant_meshes_exe, xnormal_exe, gltfpack_exe, profile_data, target_v, max_res, app_paths, profile_key, archive_dir, variants=()):
     input_path = os.path.join(source_dir, f)
     if not os.path.exists(input_path):
             print(f"⚠️ Warning: File not found: {input_path}")
@@ -198,9 +424,16 @@ def process_file(f, source_dir, temp_dir, output_dir, blender_exe, instant_meshe
     extract_cap = profile_data.get('extract_v', target_v * 10)
     target_extract_v = str(extract_cap)
 
+    # 'interior' drops faces hidden inside joined meshes, 'underside' also drops faces only visible from below the base
+    cull_mode = profile_data.get('cull', 'none')
+
+    # Optional per-image cap applied in Blender before the materials are packed into one diffuse;
+    # fit_source_texture below still caps the packed result
+    texture_budget = str(profile_data.get('texture_budget', 0))
+
     extract_cmd = [
         blender_exe, "--background", "--python", blender_extract, "--",
-        input_path, high_poly_obj, target_extract_v
+        input_path, high_poly_obj, target_extract_v, cull_mode, texture_budget
     ]
 
     try:
@@ -209,6 +442,14 @@ def process_file(f, source_dir, temp_dir, output_dir, blender_exe, instant_meshe
         print(f"❌ Blender Extraction Error on {f}: {e}")
         return
 
+    # The bake never samples the source finer than ~2x the output resolution, so larger textures
+    # are scaled down first (in linear light, unlike Blender's Image.scale). This is the pipeline's
+    # always-on pre-bake limit; a profile's texture_budget only bounds each image before packing
+    # Variants are all cut from one bake, so it runs at the largest requested resolution
+    bake_max = max([max_res] + [variant.res for variant in variants])
+    if os.path.exists(high_poly_tex):
+        fit_source_texture(high_poly_tex, bake_max * 2)
+
     # 2. Instant Meshes Pass
     low_poly_raw_obj = f"{temp_base}_low_raw.obj"
     
@@ -245,25 +486,34 @@ def process_file(f, source_dir, temp_dir, output_dir, blender_exe, instant_meshe
             return False
 
     # 3. Blender UV Unwrap and Bake Pass
+    texture_max_error = profile_data.get('texture_max_error', 0)
+    png_level = profile_data.get('png_level', png_writer.DEFAULT_LEVEL)
+    bake_res, source_texture = source_texture_cap(high_poly_tex, bake_max, texture_max_error)
+
     print("  Running Blender UV Unwrap and Bake pass...")
     bake_success = unwrap_and_bake(
         blender_exe, app_paths.scripts, f, high_poly_obj, low_poly_raw_obj, 
-        high_poly_tex, temp_base, temp_out_glb, max_res, target_v, profile_key
+        high_poly_tex, temp_base, temp_out_glb, bake_res, target_v, profile_key,
+        profile_data.get('bake_backend', 'cycles'), profile_data.get('bake_tiles', 1),
+        profile_data.get('bake_chunk_high', False), profile_data.get('uv_packer', 'blender'),
+        profile_data.get('texel_density', 0), texture_max_error,
+        png_level, profile_data.get('reduce_channels', False)
     )
     
     if bake_success:
+        record_uv_stats(f, temp_out_glb, output_dir)
+        record_texture_stats(f, temp_out_glb, output_dir, source_texture)
+
+        variant_glbs = finish_textures(f, temp_out_glb, output_dir, profile_data, max_res, png_level, variants)
+
         # 4. GLTFPack Optimization Pass
-        print("  Running Meshopt (gltfpack) pass...")
-        if not os.path.exists(gltfpack_exe):
-            print(f"⚠️ Warning: gltfpack not found at {gltfpack_exe}. Skipping compression.")
-            shutil.copy(temp_out_glb, final_out)
-        else:
-            meshopt_cmd = [gltfpack_exe, "-i", temp_out_glb, "-o", final_out, "-noq", "-tw"]
-            try:
-                subprocess.run(meshopt_cmd, check=True)
-            except subprocess.CalledProcessError as e:
-                print(f"❌ Meshopt Error on {f}: {e}")
+        for name, variant_glb in variant_glbs.items():
+            variant_out = final_out if name is None else final_out.replace("_optimized.glb", f"_{name}_optimized.glb")
+            if not run_gltfpack(gltfpack_exe, variant_glb, variant_out, f):
                 return
+            if name is not None:
+                print(f"  Variant {name}: {variant_out}")
+                os.remove(variant_glb)
 
         # 5. Archive and Cleanup
         print(f"✅ Success: {f} -> {final_out}")
@@ -283,49 +533,107 @@ def process_file(f, source_dir, temp_dir, output_dir, blender_exe, instant_meshe
 # ==========================================
 # MAIN EXECUTION LOOP
 # ==========================================
-def main():
-    app_paths = get_app_paths()
-    config = load_config(app_paths.base)
-    
-    if not config:
-        print("Exiting due to missing configuration.")
-        sys.exit(1)
-
-    root_dir = app_paths.base
-    paths = config['paths']
-
+def load_pipeline_config(args, app_paths, config):
+    """Resolves executables and folders from the config (creating the folders) into a PipelineConfig."""
     root_dir = app_paths.base
     paths = config.get('paths', {})
     dirs = config.get('directories', {})
 
-    # Extract executables from 'paths'
-    blender_exe = resolve_path(paths.get('blender_exe', ''), root_dir)
-    instant_meshes_exe = resolve_path(paths.get('instant_meshes_exe', ''), root_dir)
-    xnormal_exe = resolve_path(paths.get('xnormal_exe', ''), root_dir)
-    gltfpack_exe = resolve_path(paths.get('gltfpack_exe', ''), root_dir)
-    
     # Extract folders from 'directories' (with safe fallbacks to prevent crashes)
-    source_dir = resolve_path(dirs.get('source_files', paths.get('source_dir', './assets/source/exports')), root_dir)
-    output_dir = resolve_path(dirs.get('output_tokens', paths.get('output_dir', './assets/builds')), root_dir)
-    temp_dir = resolve_path(dirs.get('temp_processing', paths.get('temp_dir', './assets/temp')), root_dir)
-    archive_dir = resolve_path(dirs.get('archive', paths.get('archive_dir', './assets/archive')), root_dir)
+    pipeline = PipelineConfig(
+        args=args,
+        app_paths=app_paths,
+        config=config,
+        blender_exe=resolve_path(paths.get('blender_exe', ''), root_dir),
+        meshopt_exe=resolve_path(paths.get('gltfpack_exe', ''), root_dir),
+        source_dir=resolve_path(dirs.get('source_files', paths.get('source_dir', './assets/source/exports')), root_dir),
+        output_dir=resolve_path(dirs.get('output_tokens', paths.get('output_dir', './assets/builds')), root_dir),
+        temp_dir=resolve_path(dirs.get('temp_processing', paths.get('temp_dir', './assets/temp')), root_dir),
+        instant_meshes_exe=resolve_path(paths.get('instant_meshes_exe', ''), root_dir),
+        xnormal_exe=resolve_path(paths.get('xnormal_exe', ''), root_dir),
+        archive_dir=resolve_path(dirs.get('archive', paths.get('archive_dir', './assets/archive')), root_dir),
+    )
 
     # Ensure directories exist
-    for d in [source_dir, output_dir, temp_dir, archive_dir]:
+    for d in [pipeline.source_dir, pipeline.output_dir, pipeline.temp_dir, pipeline.archive_dir]:
         os.makedirs(d, mode=0o755, exist_ok=True)
+    return pipeline
+
+def process_model(pipeline, path, profile_key, profile_data, target_v, max_res, variants=()):
+    """process_file for a GLB given by full path, e.g. one just downloaded by the Meshy feeder."""
+    process_file(
+        os.path.basename(path), os.path.dirname(path), pipeline.temp_dir, pipeline.output_dir, pipeline.blender_exe,
+        pipeline.instant_meshes_exe, pipeline.xnormal_exe, pipeline.meshopt_exe,
+        profile_data, target_v, max_res, pipeline.app_paths, profile_key, pipeline.archive_dir, variants
+    )
+
+def consume_models(model_queue, pipeline, profile_key, profile_data, target_v, max_res, variants=()):
+    """
+    Worker loop: processes GLB paths from model_queue as they arrive, until it takes a None.
+    Returns the number of models processed.
+    """
+    processed = 0
+    while True:
+        path = model_queue.get()
+        try:
+            if path is None:
+                return processed
+            process_model(pipeline, path, profile_key, profile_data, target_v, max_res, variants)
+            processed += 1
+        except Exception as e:
+            print(f"❌ Error processing {path}: {e}")
+        finally:
+            model_queue.task_done()
+
+def run_meshy_mode(pipeline, profile_key, profile_data, target_v, max_res, variants=()):
+    """
+    Generates the Meshy portraits and processes each model as it downloads, all in this process:
+    the feeder reuses this config and these pipeline workers instead of starting a batch run.
+    """
+    # The feeder imports this module; when it runs as a script, share it rather than import it twice
+    sys.modules.setdefault('main_pipeline', sys.modules[__name__])
+    sys.modules.setdefault('scripts.main_pipeline', sys.modules[__name__])
+    try:
+        from scripts import meshy_feeder
+    except ImportError:  # Frozen build / running from inside scripts/
+        import meshy_feeder
+
+    meshy_feeder.configure(pipeline.config)
+    workers = functools.partial(
+        consume_models, pipeline=pipeline, profile_key=profile_key, profile_data=profile_data,
+        target_v=target_v, max_res=max_res, variants=variants
+    )
+    return meshy_feeder.run_meshy(workers)
+
+def main():
+    app_paths = get_app_paths()
+    config = load_config(app_paths.base)
+    
+    if not config:
+        print("Exiting due to missing configuration.")
+        sys.exit(1)
 
     # Setup Arguments and Profile
     args = parse_args()
+    pipeline = load_pipeline_config(args, app_paths, config)
+    blender_exe, gltfpack_exe = pipeline.blender_exe, pipeline.meshopt_exe
+    instant_meshes_exe, xnormal_exe = pipeline.instant_meshes_exe, pipeline.xnormal_exe
+    source_dir, output_dir = pipeline.source_dir, pipeline.output_dir
+    temp_dir, archive_dir = pipeline.temp_dir, pipeline.archive_dir
+
     mode = get_processing_mode(args.mode)
-    
-    if mode == "meshy":
-        print("Meshy generation selected. Implementation pending.")
-        return
 
     profile_key = select_profile(config.get('profiles', {}), args.profile)
     profile_data = config['profiles'][profile_key]
     
     target_v, max_res = confirm_settings(profile_key, profile_data, args.auto)
+    variants = requested_variants(config['profiles'], args.tiers, args.also_profile, profile_data.get('png_level', png_writer.DEFAULT_LEVEL))
+    if variants:
+        print(f"   Texture Variants: {', '.join(f'{v.name} ({v.res}px)' for v in variants)} (one bake at {max([max_res] + [v.res for v in variants])}px)")
+
+    if mode == "meshy":
+        run_meshy_mode(pipeline, profile_key, profile_data, target_v, max_res, variants)
+        return
     
     # Get files and process
     files = get_files_to_process(mode, args.input, source_dir)
@@ -338,11 +646,24 @@ def main():
         process_file(
             f, source_dir, temp_dir, output_dir, blender_exe, 
             instant_meshes_exe, xnormal_exe, gltfpack_exe, 
-            profile_data, target_v, max_res, app_paths, profile_key, archive_dir
+            profile_data, target_v, max_res, app_paths, profile_key, archive_dir, variants
         )
 
+    if args.pack_tiles:
+        outputs = [os.path.join(output_dir, f.replace(".glb", "_optimized.glb")) for f in files]
+        outputs = [path for path in outputs if os.path.exists(path)]
+        print(f"\n🔹 Packing {len(outputs)} outputs into tile pack '{args.pack_name}' ({args.pack_tiles})...")
+        tile_pack.pack_tiles(outputs, output_dir, args.pack_name, args.pack_tiles)
+
+    # Runs over the whole library, so earlier batches share textures with this one
+    if args.dedupe:
+        print("\n🔹 Deduplicating textures across the output library...")
+        texture_dedupe.dedupe_library(output_dir, perceptual=args.dedupe == "perceptual")
+
 
 if __name__ == "__main__":
+    # The CPU baker spawns worker processes; required for the frozen Windows executable
+    multiprocessing.freeze_support()
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,244 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Pure NumPy triangle BVH + ray caster.
+# Importable both from the host pipeline and from inside Blender (which bundles NumPy),
+# so it must never import bpy.
+
+BVH = namedtuple('BVH', ['node_min', 'node_max', 'first_leaf', 'leaf_count', 'leaf_size', 'tri_index', 'v0', 'e1', 'e2'])
+RayHits = namedtuple('RayHits', ['hit', 't', 'tri', 'u', 'v'])
+
+DEFAULT_BATCH = 16384
+
+
+def _median_split_order(centroids, padded_leaves, leaf_size):
+    # Top-down median splits along each node's longest axis, one tree level per pass.
+    # Nodes split at their index midpoint (the tree is complete), so a stable per-node
+    # sort on the chosen axis is all a level needs, and it vectorizes as one lexsort.
+    tri_count = len(centroids)
+    order = np.arange(tri_count)
+    span = padded_leaves * leaf_size
+    while span > leaf_size:
+        segment = np.arange(tri_count) // span
+        starts = np.flatnonzero(np.r_[True, segment[1:] != segment[:-1]])
+        pts = centroids[order]
+        extent = np.maximum.reduceat(pts, starts) - np.minimum.reduceat(pts, starts)
+        axis = np.argmax(extent, axis=1)[np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, tri_count]))]
+        order = order[np.lexsort((pts[np.arange(tri_count), axis], segment))]
+        span //= 2
+    return order
+
+
+def build_bvh(vertices, triangles, leaf_size=8):
+    """
+    Builds a complete binary BVH stored heap-style (children of node i are 2i+1 and
+    2i+2) over fixed-size leaves of consecutive triangles. Building is vectorized per
+    tree level, so an 800k-triangle high-poly builds in a couple of seconds.
+    """
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    tri_count = len(triangles)
+
+    leaf_count = max(1, -(-tri_count // leaf_size))
+    padded_leaves = 1 << int(np.ceil(np.log2(leaf_count)))
+    first_leaf = padded_leaves - 1
+    node_count = 2 * padded_leaves - 1
+
+    # Padding nodes get NaN bounds: every slab comparison against NaN is False, so they are never entered
+    node_min = np.full((node_count, 3), np.nan, dtype=np.float32)
+    node_max = np.full((node_count, 3), np.nan, dtype=np.float32)
+
+    slots = leaf_count * leaf_size
+    v0 = np.full((slots, 3), np.nan, dtype=np.float32)
+    e1 = np.full((slots, 3), np.nan, dtype=np.float32)
+    e2 = np.full((slots, 3), np.nan, dtype=np.float32)
+    tri_index = np.full(slots, -1, dtype=np.int64)
+
+    if tri_count:
+        corners = vertices[triangles]
+        order = _median_split_order(corners.mean(axis=1), padded_leaves, leaf_size)
+        corners = corners[order]
+
+        tri_index[:tri_count] = order
+        v0[:tri_count] = corners[:, 0]
+        e1[:tri_count] = corners[:, 1] - corners[:, 0]
+        e2[:tri_count] = corners[:, 2] - corners[:, 0]
+
+        starts = np.arange(0, tri_count, leaf_size)
+        node_min[first_leaf:first_leaf + leaf_count] = np.minimum.reduceat(corners.min(axis=1), starts)
+        node_max[first_leaf:first_leaf + leaf_count] = np.maximum.reduceat(corners.max(axis=1), starts)
+
+        # Propagate bounds up one tree level at a time
+        level_start = first_leaf
+        while level_start > 0:
+            parent_start = (level_start - 1) // 2
+            parents = np.arange(parent_start, level_start)
+            node_min[parents] = np.fmin(node_min[2 * parents + 1], node_min[2 * parents + 2])
+            node_max[parents] = np.fmax(node_max[2 * parents + 1], node_max[2 * parents + 2])
+            level_start = parent_start
+
+    return BVH(node_min, node_max, first_leaf, leaf_count, leaf_size, tri_index, v0, e1, e2)
+
+
+def _intersect_triangles(orig, dirs, v0, e1, e2):
+    # Möller–Trumbore, vectorized over candidate (ray, triangle) pairs
+    pvec = np.cross(dirs, e2)
+    det = np.einsum('ij,ij->i', e1, pvec)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_det = 1.0 / det
+        tvec = orig - v0
+        u = np.einsum('ij,ij->i', tvec, pvec) * inv_det
+        qvec = np.cross(tvec, e1)
+        v = np.einsum('ij,ij->i', dirs, qvec) * inv_det
+        t = np.einsum('ij,ij->i', e2, qvec) * inv_det
+        ok = (np.abs(det) > 1e-12) & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0)
+    return ok, t, u, v
+
+
+def _box_hits(bvh, orig, inv_dirs, ids, nodes, t_min, t_best):
+    o = orig[ids]
+    inv = inv_dirs[ids]
+    t0 = (bvh.node_min[nodes] - o) * inv
+    t1 = (bvh.node_max[nodes] - o) * inv
+    lo = np.minimum(t0, t1)
+    hi = np.maximum(t0, t1)
+    t_near = np.maximum(np.maximum(lo[:, 0], lo[:, 1]), np.maximum(lo[:, 2], t_min))
+    t_far = np.minimum(np.minimum(hi[:, 0], hi[:, 1]), hi[:, 2])
+    return (t_near <= t_far) & (t_near <= t_best[ids]), t_near
+
+
+def _traverse(bvh, orig, dirs, t_min, t_best, tri_out, u_out, v_out, any_hit, skip_tri):
+    safe_dirs = np.where(np.abs(dirs) < 1e-12, np.copysign(1e-12, dirs), dirs)
+    inv_dirs = 1.0 / safe_dirs
+    ray_count = len(orig)
+    lanes = np.arange(bvh.leaf_size)
+
+    # Every ray walks the tree depth-first, nearest child first, with its own small stack.
+    # Each loop step advances all live rays by one node, so the Python loop runs once per
+    # traversal step while the per-ray work matches a scalar ray tracer (early exits included).
+    depth = int(np.log2(bvh.first_leaf + 1)) + 1
+    stack = np.zeros((ray_count, depth), dtype=np.int64)
+    stack_t = np.zeros((ray_count, depth), dtype=np.float32)
+    sp = np.zeros(ray_count, dtype=np.int64)
+
+    all_rays = np.arange(ray_count)
+    root_hit, root_t = _box_hits(bvh, orig, inv_dirs, all_rays, np.zeros(ray_count, dtype=np.int64), t_min, t_best)
+    cur = np.where(root_hit, 0, -1)
+    cur_t = root_t.astype(np.float32)
+
+    def pop(ids):
+        has_more = sp[ids] > 0
+        resume = ids[has_more]
+        sp[resume] -= 1
+        cur[resume] = stack[resume, sp[resume]]
+        cur_t[resume] = stack_t[resume, sp[resume]]
+        cur[ids[~has_more]] = -1
+
+    active = np.flatnonzero(cur >= 0)
+    while active.size:
+        # Nodes pushed earlier may now lie beyond a closer hit found since
+        stale = cur_t[active] > t_best[active]
+        pop(active[stale])
+        ids = active[~stale]
+        nodes = cur[ids]
+
+        is_leaf = nodes >= bvh.first_leaf
+        leaf_rays = ids[is_leaf]
+        if leaf_rays.size:
+            cand_ray = np.repeat(leaf_rays, bvh.leaf_size)
+            cand_slot = ((nodes[is_leaf] - bvh.first_leaf)[:, None] * bvh.leaf_size + lanes).ravel()
+
+            ok, t, u, v = _intersect_triangles(orig[cand_ray], dirs[cand_ray], bvh.v0[cand_slot], bvh.e1[cand_slot], bvh.e2[cand_slot])
+            ok &= (t >= t_min) & (t < t_best[cand_ray])
+            if skip_tri is not None:
+                ok &= bvh.tri_index[cand_slot] != skip_tri[cand_ray]
+
+            if ok.any():
+                cand_ray, cand_slot, t, u, v = cand_ray[ok], cand_slot[ok], t[ok], u[ok], v[ok]
+                # Keep the nearest candidate per ray
+                order = np.lexsort((t, cand_ray))
+                first = order[np.r_[True, cand_ray[order][1:] != cand_ray[order][:-1]]]
+                rays = cand_ray[first]
+                t_best[rays] = t[first]
+                tri_out[rays] = bvh.tri_index[cand_slot[first]]
+                u_out[rays] = u[first]
+                v_out[rays] = v[first]
+
+            if any_hit:
+                done = tri_out[leaf_rays] >= 0
+                cur[leaf_rays[done]] = -1
+                leaf_rays = leaf_rays[~done]
+            pop(leaf_rays)
+
+        inner_rays = ids[~is_leaf]
+        if inner_rays.size:
+            left = 2 * nodes[~is_leaf] + 1
+            right = left + 1
+            hit_l, t_l = _box_hits(bvh, orig, inv_dirs, inner_rays, left, t_min, t_best)
+            hit_r, t_r = _box_hits(bvh, orig, inv_dirs, inner_rays, right, t_min, t_best)
+
+            both = hit_l & hit_r
+            left_first = t_l <= t_r
+            near = np.where(left_first, left, right)
+            far = np.where(left_first, right, left)
+            near_t = np.where(left_first, t_l, t_r)
+            far_t = np.where(left_first, t_r, t_l)
+
+            pushed = inner_rays[both]
+            stack[pushed, sp[pushed]] = far[both]
+            stack_t[pushed, sp[pushed]] = far_t[both]
+            sp[pushed] += 1
+
+            cur[inner_rays] = np.where(both, near, np.where(hit_l, left, right))
+            cur_t[inner_rays] = np.where(both, near_t, np.where(hit_l, t_l, t_r))
+            pop(inner_rays[~(hit_l | hit_r)])
+
+        active = np.flatnonzero(cur >= 0)
+
+
+def intersect_rays(bvh, origins, directions, t_min=1e-6, t_max=np.inf, any_hit=False, skip_tri=None, batch_size=DEFAULT_BATCH, workers=None):
+    """
+    Casts rays against the BVH. Returns the nearest hit per ray (or any hit when
+    `any_hit` is set, which is all occlusion queries need). `skip_tri` optionally
+    holds one triangle index per ray to ignore, e.g. the triangle the ray starts on.
+    Batches run on a thread pool; NumPy releases the GIL for the heavy array work.
+    """
+    origins = np.ascontiguousarray(origins, dtype=np.float32).reshape(-1, 3)
+    directions = np.ascontiguousarray(directions, dtype=np.float32).reshape(-1, 3)
+    ray_count = len(origins)
+
+    t_best = np.empty(ray_count, dtype=np.float32)
+    t_best[:] = t_max
+    tri = np.full(ray_count, -1, dtype=np.int64)
+    u = np.zeros(ray_count, dtype=np.float32)
+    v = np.zeros(ray_count, dtype=np.float32)
+    if skip_tri is not None:
+        skip_tri = np.asarray(skip_tri, dtype=np.int64)
+
+    def run_batch(start):
+        end = min(start + batch_size, ray_count)
+        _traverse(
+            bvh, origins[start:end], directions[start:end], t_min,
+            t_best[start:end], tri[start:end], u[start:end], v[start:end],
+            any_hit, None if skip_tri is None else skip_tri[start:end]
+        )
+
+    batches = range(0, ray_count, batch_size)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(run_batch, batches))
+    else:
+        for start in batches:
+            run_batch(start)
+
+    hit = tri >= 0
+    return RayHits(hit, np.where(hit, t_best, np.inf), tri, u, v)
+
+
+def occluded(bvh, origins, directions, t_min=1e-6, t_max=np.inf, skip_tri=None, workers=None):
+    """Returns a boolean array: True where the ray hits anything within (t_min, t_max)."""
+    return intersect_rays(bvh, origins, directions, t_min=t_min, t_max=t_max, any_hit=True, skip_tri=skip_tri, workers=workers).hit
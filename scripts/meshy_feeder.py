@@ -1,26 +1,47 @@
 import os
 import time
 import base64
+import email.utils
+import functools
+import io
+import json
+import queue
+import random
 import requests
-import subprocess
-import sys
+import threading
 import urllib.parse
+from collections import deque, namedtuple
 from concurrent.futures import ThreadPoolExecutor
-from scripts.main_pipeline import get_app_paths, load_config, resolve_path
+try:
+    from scripts import glb_io, task_journal, texture_dedupe
+    from scripts.main_pipeline import confirm_settings, consume_models, get_app_paths, load_config, load_pipeline_config, resolve_path
+except ImportError:  # Frozen build / running from inside scripts/
+    import glb_io
+    import task_journal
+    import texture_dedupe
+    from main_pipeline import confirm_settings, consume_models, get_app_paths, load_config, load_pipeline_config, resolve_path
 
 # ==========================================
 # ⚙️ CONFIGURATION
 # ==========================================
 app_paths = get_app_paths()
-config = load_config(app_paths.base) or {}
-MESHY_API_KEY = config.get('meshy_api_key', os.environ.get('MESHY_API_KEY', 'YOUR_MESHY_KEY_HERE'))
 
 INPUT_FOLDER = './assets/portraits'
 
-# Use the resolved source directory from the main config so models end up in the right place
-EXPORT_DIR = resolve_path(config.get('paths', {}).get('source_dir', './assets/source/exports'), app_paths.base)
+# Image-to-3d endpoints live under this base; meshy.api_base can point it at a local stand-in
+DEFAULT_API_BASE = "https://api.meshy.ai/v1"
 
-PIPELINE_SCRIPT = './scripts/main_pipeline.py'
+# Portrait dedupe against the journal and the batch: a perceptual hash (texture_dedupe's dHash plus
+# colour thumbnail, any resolution) within DUPLICATE_DISTANCE bits is the same portrait re-saved
+# and reuses its model; within NEAR_DUPLICATE_DISTANCE it is flagged instead of submitted
+DUPLICATE_DISTANCE = 2
+NEAR_DUPLICATE_DISTANCE = 8
+
+# Downloaded models go straight to in-process pipeline workers using this profile
+PIPELINE_PROFILE = "token_production"
+
+# Task IDs survive restarts here, so an interrupted run resumes polling instead of paying again
+JOURNAL_PATH = os.path.join(INPUT_FOLDER, task_journal.JOURNAL_NAME)
 
 TARGET_POLYCOUNT = 60000
 TEXTURE_RES = "2048"
@@ -28,133 +49,642 @@ TEXTURE_RES = "2048"
 # Security: Timeouts and retry limits for API and file downloads to prevent hanging
 API_TIMEOUT = 30
 DOWNLOAD_TIMEOUT = 120
-MAX_RETRIES = 40  # 10 minutes (40 * 15s)
+MAX_WAIT_SECONDS = 600  # Wall-clock limit per generation, however often it is polled
 MAX_IMAGE_SIZE = 20 * 1024 * 1024  # 20 MB limit for image uploads
 
-def get_base64_image(image_path):
+# Portraits are downsized to the longest side the image-to-3d model actually uses before upload
+MAX_INPUT_SIDE = 2048
+JPEG_QUALITY = 90
+
+# Base64 is produced while the request body is read, in blocks of whole 3-byte groups
+B64_BLOCK = 3 * 64 * 1024
+
+# Models stream to <name>.glb.part in 1 MiB chunks; a dropped connection resumes with a Range request
+DOWNLOAD_CHUNK = 1024 * 1024
+DOWNLOAD_ATTEMPTS = 3
+
+# Adaptive polling: start fast, back off geometrically, never exceed POLL_MAX_DELAY.
+# Once the API reports progress, the wait is also capped by the estimated time remaining.
+POLL_MIN_DELAY = 2.0
+POLL_MAX_DELAY = 15.0
+POLL_BACKOFF = 1.5
+
+# Keep-alive connections shared by every worker thread
+POOL_SIZE = 8
+
+# Generations run remotely, so many can be in flight while one scheduler loop polls them all;
+# finished models are downloaded on a small pool so a slow download never delays the polls
+DOWNLOAD_WORKERS = 4
+
+# One submitted generation awaiting its next status poll (due is a time.monotonic() deadline)
+PendingTask = namedtuple('PendingTask', ['filename', 'task_id', 'polls', 'due', 'started', 'image_hash'])
+
+# Encoded image ready for upload
+Portrait = namedtuple('Portrait', ['data', 'mime', 'size', 'original_size', 'original_bytes'])
+
+def configure(loaded_config):
+    """
+    Applies an already loaded axiom_config (API key, export folder, meshy section). Called once
+    by main() here, or by main_pipeline's --mode meshy with the config it loaded itself.
+    """
+    global config, MESHY_API_KEY, API_BASE, EXPORT_DIR, MAX_IN_FLIGHT, PIPELINE_WORKERS, RATE_LIMITER, RETRY_BUDGET, API_RETRIES
+    global SUBMIT_NEAR_DUPLICATES, ARCHIVE_DIR
+    config = loaded_config or {}
+    MESHY_API_KEY = config.get('meshy_api_key', os.environ.get('MESHY_API_KEY', 'YOUR_MESHY_KEY_HERE'))
+    API_BASE = config.get('meshy', {}).get('api_base', DEFAULT_API_BASE).rstrip('/')
+    # Use the resolved source directory from the main config so models end up in the right place
+    EXPORT_DIR = resolve_path(config.get('paths', {}).get('source_dir', './assets/source/exports'), app_paths.base)
+    # process_file moves each processed model here, so journaled outputs are looked up in both places
+    ARCHIVE_DIR = resolve_path(
+        config.get('directories', {}).get('archive', config.get('paths', {}).get('archive_dir', './assets/archive')), app_paths.base
+    )
+    MAX_IN_FLIGHT = config.get('meshy', {}).get('max_in_flight', 16)
+    PIPELINE_WORKERS = config.get('meshy', {}).get('pipeline_workers', 1)
+    RATE_LIMITER = TokenBucket(config.get('meshy', {}).get('requests_per_second', 2), config.get('meshy', {}).get('burst', 5))
+    RETRY_BUDGET = RetryBudget()
+    API_RETRIES = config.get('meshy', {}).get('max_retries', 5)
+    SUBMIT_NEAR_DUPLICATES = config.get('meshy', {}).get('submit_near_duplicates', False)
+
+# ==========================================
+# 🚦 RATE LIMITING & RETRIES
+# ==========================================
+# Meshy answers bursts with 429; these (and transient 5xx) are retried after a jittered backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+# Retry budget: every retry spends a token, every success earns back RETRY_BUDGET_RATIO, so an
+# outage can't turn into an endless retry storm
+RETRY_BUDGET_TOKENS = 10
+RETRY_BUDGET_RATIO = 0.1
+
+class TokenBucket:
+    """
+    Thread-safe limiter for every Meshy API call: `rate` requests per second on average, `burst` at
+    once. acquire() reserves a token, sleeping for however long the bucket is overdrawn.
+    """
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class RetryBudget:
+    def __init__(self, tokens=RETRY_BUDGET_TOKENS, ratio=RETRY_BUDGET_RATIO):
+        self.max_tokens = tokens
+        self.tokens = float(tokens)
+        self.ratio = ratio
+        self.lock = threading.Lock()
+
+    def succeeded(self):
+        with self.lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self):
+        """True (and one token spent) if a retry is still affordable."""
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+def retry_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff for retry number attempt (0-based); never shorter than Retry-After."""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+def api_request(method, url, retries=None, make_body=None, **kwargs):
+    """
+    Rate-limited Meshy API call through the pooled session (method is 'get' or 'post'). 429/5xx
+    responses and connection errors are retried up to `retries` times while the retry budget
+    allows. make_body builds a fresh `data` body per attempt (streamed bodies can only be read once).
+    Returns the last response; re-raises the last connection error.
+    """
+    retries = API_RETRIES if retries is None else retries
+    for attempt in range(retries + 1):
+        if make_body is not None:
+            kwargs['data'] = make_body()
+        RATE_LIMITER.acquire()
+        try:
+            response = getattr(get_session(), method)(url, **kwargs)
+        except OSError as e:  # requests' exceptions are OSErrors
+            if attempt == retries or not RETRY_BUDGET.try_spend():
+                raise
+            delay = retry_delay(attempt)
+            print(f"⚠️ Warning: Meshy API request failed ({e}). Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            continue
+
+        if response.status_code not in RETRY_STATUSES:
+            RETRY_BUDGET.succeeded()
+            return response
+        if attempt == retries or not RETRY_BUDGET.try_spend():
+            return response
+        delay = retry_delay(attempt, parse_retry_after(response))
+        print(f"⚠️ Warning: Meshy API returned {response.status_code}. Retrying in {delay:.1f}s ({attempt + 1}/{retries})...")
+        time.sleep(delay)
+    return response
+
+# Defaults until a config is applied
+configure({})
+
+# ==========================================
+# 🌐 HTTP SESSION & POLLING
+# ==========================================
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """The shared pooled Session, so polls and downloads reuse TLS connections instead of reconnecting."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+def parse_retry_after(response):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP-date), or None."""
+    value = response.headers.get('Retry-After')
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+def next_poll_delay(attempt, progress=None, elapsed=0.0, retry_after=None):
+    """
+    Seconds to wait before poll number attempt + 1. Backs off from POLL_MIN_DELAY to POLL_MAX_DELAY;
+    a progress percentage shortens the wait to the estimated time left, and Retry-After always wins.
+    """
+    delay = min(POLL_MAX_DELAY, POLL_MIN_DELAY * POLL_BACKOFF ** attempt)
+    if isinstance(progress, (int, float)) and 0 < progress < 100 and elapsed > 0:
+        remaining = elapsed * (100 - progress) / progress
+        delay = max(POLL_MIN_DELAY, min(delay, remaining))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def prepare_portrait(image_path):
+    """
+    Reads a portrait for upload, downsized to MAX_INPUT_SIDE and re-encoded (PNG when it has
+    transparency, else JPEG) whenever that is smaller than the original file.
+    """
     if os.path.getsize(image_path) > MAX_IMAGE_SIZE:
-        raise ValueError(f"File exceeds the maximum allowed size of 20MB.")
+        raise ValueError("File exceeds the maximum allowed size of 20MB.")
+    from PIL import Image, ImageOps
 
     with open(image_path, "rb") as image_file:
-        encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-    extension = os.path.splitext(image_path)[1][1:].lower()
-    if extension == 'jpg': extension = 'jpeg'
-    return f"data:image/{extension};base64,{encoded_string}"
+        original = image_file.read()
+    with Image.open(io.BytesIO(original)) as img:
+        original_mime = Image.MIME.get(img.format, 'image/png')
+        original_size = img.size
+        img = ImageOps.exif_transpose(img)
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+        img.thumbnail((MAX_INPUT_SIDE, MAX_INPUT_SIDE), Image.LANCZOS)
 
-def create_meshy_task(image_data_uri):
-    url = "https://api.meshy.ai/v1/image-to-3d"
+        buffer = io.BytesIO()
+        if has_alpha:
+            img.save(buffer, 'PNG', optimize=True)
+        else:
+            img.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+        size = img.size
+
+    encoded = buffer.getvalue()
+    if size == original_size and len(encoded) >= len(original):
+        return Portrait(original, original_mime, original_size, original_size, len(original))
+    return Portrait(encoded, 'image/png' if has_alpha else 'image/jpeg', size, original_size, len(original))
+
+class TaskBody:
+    """
+    JSON request body whose image_url data URI is base64-encoded as the body is read, so the full
+    encoded string never exists in memory. Has a length, so requests sends Content-Length.
+    """
+    def __init__(self, payload, portrait):
+        self.head = f'{{"image_url": "data:{portrait.mime};base64,'.encode('ascii')
+        self.tail = ('", ' + json.dumps(payload)[1:]).encode('utf-8')
+        self.data = portrait.data
+        self.length = len(self.head) + 4 * ((len(self.data) + 2) // 3) + len(self.tail)
+        self._parts = self._encode()
+        self._buffer = b''
+
+    def _encode(self):
+        yield self.head
+        view = memoryview(self.data)
+        for start in range(0, len(view), B64_BLOCK):
+            yield base64.b64encode(view[start:start + B64_BLOCK])
+        yield self.tail
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size=-1):
+        while size is None or size < 0 or len(self._buffer) < size:
+            part = next(self._parts, None)
+            if part is None:
+                break
+            self._buffer += part
+        if size is None or size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+def create_meshy_task(image):
+    """Starts an image-to-3d task from a Portrait, streamed as the request body. Returns the task id or None."""
+    url = f"{API_BASE}/image-to-3d"
     headers = {"Authorization": f"Bearer {MESHY_API_KEY}"}
     payload = {
-        "image_url": image_data_uri,
         "enable_pbr": True,
         "target_polycount": TARGET_POLYCOUNT,
         "texture_res": TEXTURE_RES,
         "topology": "quad"  # Quads for smooth Blender decimation!
     }
 
-    response = requests.post(url, headers=headers, json=payload, timeout=API_TIMEOUT)
+    headers["Content-Type"] = "application/json"
+    response = api_request('post', url, make_body=lambda: TaskBody(payload, image), headers=headers, timeout=API_TIMEOUT)
     if response.status_code == 202:
         return response.json()['result']
     print(f"❌ Error creating task: {response.text}")
     return None
 
-def download_model(task_id, filename):
-    url = f"https://api.meshy.ai/v1/image-to-3d/{task_id}"
+def poll_task(task_id):
+    """
+    One status request, not retried here: on 429/5xx the task json is empty and the caller's
+    next poll waits out the response's Retry-After. Returns (task json, response).
+    """
+    url = f"{API_BASE}/image-to-3d/{task_id}"
     headers = {"Authorization": f"Bearer {MESHY_API_KEY}"}
+    response = api_request('get', url, retries=0, headers=headers, timeout=API_TIMEOUT)
+    if response.status_code in RETRY_STATUSES:
+        return {}, response
+    return response.json(), response
 
-    print(f"⏳ Meshy is sculpting {filename}... (Usually 1-3 mins)")
-    retries = 0
-    while retries < MAX_RETRIES:
-        response = requests.get(url, headers=headers, timeout=API_TIMEOUT)
-        retries += 1
-        status = response.json().get('status')
+def model_path(filename):
+    return os.path.join(EXPORT_DIR, f"{os.path.splitext(filename)[0]}.glb")
 
-        if status == 'SUCCEEDED':
-            model_url = response.json()['model_urls']['glb']
+def save_model(task, filename):
+    """Downloads a SUCCEEDED task's GLB into EXPORT_DIR after checking its URL points at Meshy."""
+    model_url = task['model_urls']['glb']
 
-            parsed_url = urllib.parse.urlparse(model_url)
-            if parsed_url.scheme != 'https':
-                print(f"❌ Security Error: Invalid URL scheme '{parsed_url.scheme}'. Expected 'https'.")
-                return False
-
-            if not parsed_url.hostname.endswith('.meshy.ai') and parsed_url.hostname != 'meshy.ai':
-                print(f"❌ Security Error: Invalid URL host '{parsed_url.hostname}'.")
-                return False
+    parsed_url = urllib.parse.urlparse(model_url)
+    api_url = urllib.parse.urlparse(API_BASE)
+    # Models served by the configured API itself (e.g. a local stand-in) are trusted as-is
+    if (parsed_url.scheme, parsed_url.netloc) != (api_url.scheme, api_url.netloc):
+        if parsed_url.scheme != 'https':
+            print(f"❌ Security Error: Invalid URL scheme '{parsed_url.scheme}'. Expected 'https'.")
+            return False
 
-            model_data = requests.get(model_url, timeout=DOWNLOAD_TIMEOUT).content
+        if not parsed_url.hostname.endswith('.meshy.ai') and parsed_url.hostname != 'meshy.ai':
+            print(f"❌ Security Error: Invalid URL host '{parsed_url.hostname}'.")
+            return False
 
-            output_path = os.path.join(EXPORT_DIR, f"{os.path.splitext(filename)[0]}.glb")
-            with open(output_path, 'wb') as f:
-                f.write(model_data)
+    output_path = model_path(filename)
+    try:
+        fetch_model(model_url, output_path)
+    except ValueError as e:
+        print(f"❌ Corrupt download for {filename}: {e}")
+        return False
 
-            print(f"✅ Downloaded to {output_path}")
-            return True
-        elif status == 'FAILED':
-            print(f"❌ Meshy failed to process {filename}.")
-            return False
+    print(f"✅ Downloaded to {output_path}")
+    return True
 
-        time.sleep(15)
+def stream_to_file(url, part_path):
+    """
+    Streams url into part_path chunk by chunk. After a dropped connection the next attempt asks
+    for the remaining bytes with a Range header, starting over if the server ignores it.
+    """
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            response = get_session().get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT)
+            try:
+                if offset and response.status_code == 416:
+                    return  # Everything was already received
+                response.raise_for_status()
+                resumed = offset and response.status_code == 206
+                with open(part_path, 'ab' if resumed else 'wb') as f:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK):
+                        f.write(chunk)
+            finally:
+                response.close()
+            return
+        except OSError as e:  # requests' exceptions are OSErrors
+            if attempt == DOWNLOAD_ATTEMPTS:
+                raise
+            print(f"⚠️ Warning: Download interrupted ({e}). Resuming (attempt {attempt + 1}/{DOWNLOAD_ATTEMPTS})...")
 
-    print(f"❌ Timed out waiting for {filename} after {MAX_RETRIES} attempts.")
-    return False
+def fetch_model(url, output_path):
+    """Downloads a GLB to output_path.part, verifies its header and length, then renames it into place."""
+    part_path = output_path + ".part"
+    if os.path.exists(part_path):
+        os.remove(part_path)
+    try:
+        stream_to_file(url, part_path)
+        glb_io.verify_glb(part_path)
+    except (OSError, ValueError):
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, output_path)
 
 
-def _process_single_file(filename):
+# ==========================================
+# 🗓️ TASK SCHEDULER
+# ==========================================
+def submit_image(filename):
+    """Uploads one portrait. Returns its Meshy task id, or None."""
     print(f"\n--- Initiating Meshy generation for {filename} ---")
-    image_path = os.path.join(INPUT_FOLDER, filename)
-
     try:
-        data_uri = get_base64_image(image_path)
-        task_id = create_meshy_task(data_uri)
-
-        if task_id and download_model(task_id, filename):
-            os.remove(image_path)
-            print(f"🗑️ Removed original image: {filename}")
-            return True
+        portrait = prepare_portrait(os.path.join(INPUT_FOLDER, filename))
+        print(
+            f"  {filename}: {portrait.original_size[0]}x{portrait.original_size[1]} {portrait.original_bytes / 1024:.0f} KiB"
+            f" -> {portrait.size[0]}x{portrait.size[1]} {len(portrait.data) / 1024:.0f} KiB ({portrait.mime})"
+        )
+        return create_meshy_task(portrait)
     except ValueError as e:
         print(f"❌ Skipped {filename}: {e}")
     except Exception as e:
         print(f"❌ Error processing {filename}: {e}")
+    return None
+
+def finish_image(task, filename, image_hash=None, journal_path=None, model_queue=None):
+    """
+    Downloads a finished generation, journals it, hands it to model_queue and removes its portrait.
+    Runs on the download pool.
+    """
+    try:
+        if save_model(task, filename):
+            if journal_path and image_hash:
+                task_journal.record_task(journal_path, image_hash, status=task_journal.SUCCEEDED, output=model_path(filename))
+            if model_queue is not None:
+                model_queue.put(model_path(filename))
+            remove_portrait(filename)
+            return True
+    except Exception as e:
+        print(f"❌ Error processing {filename}: {e}")
     return False
 
-def main():
+def remove_portrait(filename):
+    """Deletes a portrait from INPUT_FOLDER once it has a model."""
+    image_path = os.path.join(INPUT_FOLDER, filename)
+    if os.path.exists(image_path):
+        os.remove(image_path)
+        print(f"🗑️ Removed original image: {filename}")
+
+def generated_model(record):
+    """Where a journaled model is now: as downloaded, or archived once the pipeline processed it. None if gone."""
+    output = record.get('output')
+    if not output:
+        return None
+    for path in (output, os.path.join(ARCHIVE_DIR, os.path.basename(output))):
+        if os.path.exists(path):
+            return path
+    return None
+
+def portrait_fingerprint(path):
+    """Perceptual fingerprint of a portrait, or None if it can't be decoded."""
+    with open(path, 'rb') as f:
+        return texture_dedupe.fingerprint(f.read())
+
+def closest_portrait(mark, known):
+    """(record, distance) of the known portrait nearest to mark within NEAR_DUPLICATE_DISTANCE, or None."""
+    best = None
+    for record, other in known:
+        if texture_dedupe.similar(mark, other, NEAR_DUPLICATE_DISTANCE, match_size=False):
+            distance = texture_dedupe.hash_distance(mark, other)
+            if best is None or distance < best[1]:
+                best = (record, distance)
+    return best
+
+def check_duplicate(filename, image_hash, mark, known, journal_path):
+    """
+    True if the portrait must not be submitted: a duplicate of a generated portrait (its model is
+    journaled as this image's output and the portrait removed), of one still generating, or a
+    flagged near-duplicate. The portrait's own journal record (same image_hash) never counts.
+    """
+    known = [(record, other) for record, other in known if record.get('hash') != image_hash]
+    match = closest_portrait(mark, known) if mark is not None else None
+    if match is None:
+        return False
+    other, distance = match
+    if distance <= DUPLICATE_DISTANCE:
+        output = generated_model(other) if other.get('status') == task_journal.SUCCEEDED else None
+        if output:
+            print(f"♻️ {filename} duplicates {other['filename']}: reusing {output}")
+            task_journal.record_task(
+                journal_path, image_hash, filename=filename, status=task_journal.SUCCEEDED,
+                output=output, duplicate_of=other['filename']
+            )
+            remove_portrait(filename)
+        elif other.get('status') == task_journal.SUCCEEDED:
+            print(f"🔁 Regenerating {filename}: duplicate of {other['filename']}, whose model no longer exists")
+            return False
+        else:
+            print(f"⏭️ Skipped {filename}: duplicate of {other['filename']}, which is still generating")
+        return True
+    if SUBMIT_NEAR_DUPLICATES:
+        return False
+    print(
+        f"⚠️ Flagged {filename}: near-duplicate of {other['filename']} ({distance} bits apart). "
+        f"Not submitted; set meshy.submit_near_duplicates to send it anyway."
+    )
+    task_journal.record_task(journal_path, image_hash, filename=filename, status=task_journal.FLAGGED, similar_to=other['filename'])
+    return True
+
+def resume_journal(image_files, journal_path):
+    """
+    Splits image_files against the journal. Returns (tasks to resume polling, images to submit):
+    images with an unfinished task are resumed, images already generated are skipped, and exact or
+    perceptual duplicates of journaled or earlier images in the batch are reused or flagged.
+    """
+    records = task_journal.compact_journal(journal_path)
+    now = time.monotonic()
+    resumed = [
+        PendingTask(record['filename'], record['task_id'], 0, now, now, record['hash'])
+        for record in task_journal.unfinished(records)
+    ]
+    if resumed:
+        print(f"🔁 Resuming {len(resumed)} unfinished Meshy task(s) from {journal_path}")
+
+    # Only portraits still generating, or generated with their model still on disk, can be reused
+    known = [
+        (record, texture_dedupe.fingerprint_from_json(record['fingerprint']))
+        for record in records.values()
+        if record.get('fingerprint') and (
+            record.get('status') == task_journal.PENDING
+            or record.get('status') == task_journal.SUCCEEDED and generated_model(record)
+        )
+    ]
+    batch_hashes = {}
+    to_submit = []
+    for filename in image_files:
+        path = os.path.join(INPUT_FOLDER, filename)
+        try:
+            image_hash = task_journal.hash_image(path)
+            mark = portrait_fingerprint(path)
+        except OSError as e:
+            print(f"❌ Skipped {filename}: {e}")
+            continue
+        record = records.get(image_hash, {})
+        if record.get('status') == task_journal.PENDING and record.get('task_id'):
+            continue
+        output = generated_model(record) if record.get('status') == task_journal.SUCCEEDED else None
+        if output:
+            print(f"⏭️ Skipped {filename}: already generated as {output}")
+            continue
+        if record.get('status') == task_journal.SUCCEEDED:
+            print(f"🔁 Regenerating {filename}: its model {record.get('output')} no longer exists")
+        if image_hash in batch_hashes:
+            print(f"⏭️ Skipped {filename}: identical to {batch_hashes[image_hash]}")
+            continue
+        if check_duplicate(filename, image_hash, mark, known, journal_path):
+            continue
+
+        batch_hashes[image_hash] = filename
+        fields = {'fingerprint': texture_dedupe.fingerprint_to_json(mark)} if mark is not None else {}
+        if mark is not None:
+            known.append(({'hash': image_hash, 'filename': filename, 'status': None}, mark))
+        to_submit.append((filename, image_hash, fields))
+    return resumed, to_submit
+
+def run_tasks(image_files, max_in_flight=None, download_workers=DOWNLOAD_WORKERS, journal_path=None, model_queue=None):
+    """
+    Generates every image with one scheduler loop: portraits are submitted while fewer than
+    max_in_flight tasks are pending, the task whose poll is due soonest is polled next, and each
+    finished model is handed to the download pool. With a journal_path, task IDs are journaled as
+    soon as they exist and unfinished tasks from earlier runs are resumed rather than resubmitted.
+    Each downloaded model's path is put on model_queue if one is given.
+    Returns the number of models downloaded.
+    """
+    max_in_flight = max_in_flight or MAX_IN_FLIGHT
+    if journal_path:
+        pending, to_submit = resume_journal(image_files, journal_path)
+    else:
+        pending, to_submit = [], [(filename, None, {}) for filename in image_files]
+    waiting = deque(to_submit)
+    downloads = []
+    with ThreadPoolExecutor(max_workers=download_workers) as pool:
+        while waiting or pending:
+            while waiting and len(pending) < max_in_flight:
+                filename, image_hash, fields = waiting.popleft()
+                task_id = submit_image(filename)
+                if task_id:
+                    if journal_path:
+                        task_journal.record_task(journal_path, image_hash, filename=filename, task_id=task_id, status=task_journal.PENDING, **fields)
+                    now = time.monotonic()
+                    pending.append(PendingTask(filename, task_id, 0, now + POLL_MIN_DELAY, now, image_hash))
+                    print(f"⏳ Meshy is sculpting {filename}... ({len(pending)} in flight)")
+            if not pending:
+                continue
+
+            entry = min(pending, key=lambda p: p.due)
+            pending.remove(entry)
+            wait = entry.due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            polls = entry.polls + 1
+            try:
+                task, response = poll_task(entry.task_id)
+            except Exception as e:
+                print(f"⚠️ Warning: Status check for {entry.filename} failed: {e}")
+                task, response = {}, None
+
+            status = task.get('status')
+            if status == 'SUCCEEDED':
+                downloads.append(pool.submit(finish_image, task, entry.filename, entry.image_hash, journal_path, model_queue))
+            elif status == 'FAILED':
+                print(f"❌ Meshy failed to process {entry.filename}.")
+                if journal_path:
+                    task_journal.record_task(journal_path, entry.image_hash, status=task_journal.FAILED)
+            elif time.monotonic() - entry.started >= MAX_WAIT_SECONDS:
+                # Left PENDING in the journal: the next run picks the task up again
+                print(f"❌ Timed out waiting for {entry.filename} after {MAX_WAIT_SECONDS / 60:.0f} minutes ({polls} polls).")
+            else:
+                now = time.monotonic()
+                retry_after = parse_retry_after(response) if response is not None else None
+                delay = next_poll_delay(polls - 1, task.get('progress'), now - entry.started, retry_after)
+                pending.append(entry._replace(polls=polls, due=now + delay))
+
+    return sum(1 for download in downloads if download.result())
+
+def generate_and_process(image_files, process_models=None, journal_path=None, pipeline_workers=None):
+    """
+    Runs the generations with pipeline workers attached: each model is queued the moment it is
+    downloaded and processed while the remaining portraits are still generating.
+    process_models(model_queue) is a worker loop such as main_pipeline.consume_models; without one
+    the models are only downloaded. Returns (models downloaded, models processed).
+    """
+    if process_models is None:
+        return run_tasks(image_files, journal_path=journal_path), 0
+
+    pipeline_workers = pipeline_workers or PIPELINE_WORKERS
+    model_queue = queue.Queue()
+    with ThreadPoolExecutor(max_workers=pipeline_workers) as workers:
+        consumers = [workers.submit(process_models, model_queue) for _ in range(pipeline_workers)]
+        try:
+            downloaded = run_tasks(image_files, journal_path=journal_path, model_queue=model_queue)
+        finally:
+            for _ in consumers:
+                model_queue.put(None)
+        processed = sum(consumer.result() for consumer in consumers)
+    return downloaded, processed
+
+def pipeline_workers_for(profile_key=PIPELINE_PROFILE):
+    """consume_models bound to the pipeline config and profile, or None if the profile is missing."""
+    profile_data = config.get('profiles', {}).get(profile_key)
+    if profile_data is None:
+        print(f"⚠️ Warning: Profile '{profile_key}' not found in config. Models will only be downloaded.")
+        return None
+    pipeline = load_pipeline_config(None, app_paths, config)
+    target_v, max_res = confirm_settings(profile_key, profile_data, auto=True)
+    return functools.partial(
+        consume_models, pipeline=pipeline, profile_key=profile_key, profile_data=profile_data,
+        target_v=target_v, max_res=max_res
+    )
+
+def run_meshy(process_models=None):
+    """Generates every portrait in INPUT_FOLDER, handing each model to process_models (see generate_and_process)."""
     os.makedirs(INPUT_FOLDER, mode=0o755, exist_ok=True)
     os.makedirs(EXPORT_DIR, mode=0o755, exist_ok=True)
 
-    files_processed = 0
-    if os.path.exists(INPUT_FOLDER):
-        image_files = [f for f in os.listdir(INPUT_FOLDER) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-
-        if image_files:
-            # Concurrent processing to avoid blocking the main thread
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                results = list(executor.map(_process_single_file, image_files))
-                files_processed = sum(1 for r in results if r)
-
-    if files_processed > 0:
-        print(f"\n🚀 Generation complete. Handing off to ChrisEurolog Pipeline...")
-
-        # Check if running as PyInstaller executable
-        if getattr(sys, 'frozen', False):
-            # In compiled exe, sys.executable IS the pipeline script
-            cmd = [
-                sys.executable,
-                "--mode", "batch",
-                "--profile", "token_production",
-                "--auto"
-            ]
-        else:
-            cmd = [
-                sys.executable,
-                PIPELINE_SCRIPT,
-                "--mode", "batch",
-                "--profile", "token_production",
-                "--auto"
-            ]
-
-        subprocess.run(cmd, shell=False)
+    image_files = [f for f in os.listdir(INPUT_FOLDER) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+
+    # Runs even without new images so unfinished tasks from an interrupted run are collected
+    downloaded, processed = generate_and_process(image_files, process_models, JOURNAL_PATH)
+
+    if downloaded > 0:
+        print(f"\n🚀 Generation complete: {downloaded} model(s) downloaded, {processed} processed by the pipeline.")
     else:
         print("\nNo new portraits found in ./assets/portraits/")
+    return downloaded, processed
+
+def main():
+    configure(load_config(app_paths.base))
+    run_meshy(pipeline_workers_for())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,115 @@
+import numpy as np
+
+try:
+    from scripts import mesh_bvh
+except ImportError:  # Running inside Blender, where scripts/ itself is on sys.path
+    import mesh_bvh
+
+GOLDEN_ANGLE = np.pi * (3.0 - np.sqrt(5.0))
+
+# Directions must rise at least ~5 degrees above the horizon to count as "seen from outside"
+# when culling the underside. A flat horizontal ray from a boot sole would otherwise graze
+# along the floor and keep faces that sit flush on the token base.
+UNDERSIDE_MIN_Z = 0.087
+
+CULL_MODES = ("none", "interior", "underside")
+
+# Triangles this many times larger than the median also get corner samples (see _sample_points)
+LARGE_TRIANGLE_FACTOR = 4.0
+
+
+def sphere_directions(count, min_z=-1.0):
+    """Fibonacci-spiral unit vectors, evenly covering the spherical cap z >= min_z."""
+    i = np.arange(count) + 0.5
+    z = 1.0 - i / count * (1.0 - min_z)
+    r = np.sqrt(np.clip(1.0 - z * z, 0.0, None))
+    phi = i * GOLDEN_ANGLE
+    return np.stack([r * np.cos(phi), r * np.sin(phi), z], axis=1)
+
+
+def _sample_points(corners):
+    # Centroid first, then three points pulled towards each corner so a large face that is
+    # only partly hidden is not culled on the strength of one sample.
+    yield corners.mean(axis=1)
+    for k in range(3):
+        yield corners.mean(axis=1) * 0.5 + corners[:, k] * 0.5
+
+
+def find_visible_triangles(vertices, triangles, direction_count=64, min_direction_z=-1.0, bvh=None, workers=None):
+    """
+    Returns a boolean mask of the triangles that can be seen from outside the mesh.
+
+    A triangle is visible if a ray leaving one of its sample points escapes the mesh
+    in at least one allowed direction. Each triangle first tries its own normal (both
+    signs, since the joined Meshy meshes have inconsistent winding), which settles most
+    of the exterior surface with two rays; only still-hidden triangles go on to sample
+    the full sphere. Restricting `min_direction_z` to the upper hemisphere also culls
+    faces that can only be seen from below the token base.
+    """
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    tri_count = len(triangles)
+    visible = np.zeros(tri_count, dtype=bool)
+    if not tri_count:
+        return visible
+
+    if bvh is None:
+        bvh = mesh_bvh.build_bvh(vertices, triangles)
+
+    corners = vertices[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    degenerate = lengths < 1e-12
+    normals = normals / np.where(degenerate, 1.0, lengths)[:, None]
+
+    # Degenerate slivers have no area to see; leave them to the polygon they belong to
+    candidates = np.flatnonzero(~degenerate)
+    if not candidates.size:
+        return visible
+    large = lengths > LARGE_TRIANGLE_FACTOR * np.median(lengths[candidates])
+
+    sphere = sphere_directions(direction_count, min_direction_z).astype(np.float32)
+    eps = 1e-5 * float(np.max(vertices.max(axis=0) - vertices.min(axis=0)) or 1.0)
+
+    for sample_index, points in enumerate(_sample_points(corners)):
+        pending = candidates[~visible[candidates]]
+        if sample_index:
+            pending = pending[large[pending]]
+        passes = [normals, -normals] + [np.broadcast_to(d, normals.shape) for d in sphere]
+
+        for dirs in passes:
+            if not pending.size:
+                break
+            ray_dirs = dirs[pending]
+            allowed = ray_dirs[:, 2] >= min_direction_z
+            rays = pending[allowed]
+            if not rays.size:
+                continue
+
+            blocked = mesh_bvh.occluded(
+                bvh, points[rays], ray_dirs[allowed], t_min=eps,
+                skip_tri=rays, workers=workers
+            )
+            visible[rays[~blocked]] = True
+            pending = pending[~visible[pending]]
+
+    return visible
+
+
+def find_hidden_polygons(vertices, loop_triangles, triangle_polygons, polygon_count, mode="interior", direction_count=64, workers=None):
+    """
+    Polygon-level wrapper for Blender meshes: a polygon is kept if any of its loop
+    triangles is visible. Returns the indices of polygons that should be deleted.
+    """
+    if mode not in CULL_MODES:
+        raise ValueError(f"Unknown cull mode '{mode}'. Expected one of {CULL_MODES}.")
+    if mode == "none":
+        return np.empty(0, dtype=np.int64)
+
+    min_z = UNDERSIDE_MIN_Z if mode == "underside" else -1.0
+    visible_tris = find_visible_triangles(vertices, loop_triangles, direction_count, min_z, workers=workers)
+
+    triangle_polygons = np.asarray(triangle_polygons, dtype=np.int64)
+    polygon_visible = np.zeros(polygon_count, dtype=bool)
+    polygon_visible[triangle_polygons[visible_tris]] = True
+    return np.flatnonzero(~polygon_visible)
@@ -0,0 +1,175 @@
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Multi-threaded PNG encoder. Scanlines are filtered with NumPy (adaptive per-row choice of the
+# five PNG filters), the filtered bytes are cut into blocks, and each block is deflated in its
+# own thread (zlib releases the GIL). Like pigz, every block is primed with the previous 32 KiB
+# as a preset dictionary and ends on a full flush, so the raw streams concatenate into a single
+# valid zlib stream and one IDAT. Pure NumPy + zlib, so it also runs inside Blender.
+
+# Compression for textures that ship; intermediates between stages favour speed
+DEFAULT_LEVEL = 6
+INTERMEDIATE_LEVEL = 1
+
+# Uncompressed bytes per deflate block (pigz uses 128 KiB)
+BLOCK_SIZE = 128 * 1024
+
+# Deflate window: the preset dictionary each block gets from the data before it
+WINDOW = 32 * 1024
+
+# Rows filtered per thread-pool task
+FILTER_ROWS = 64
+
+COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+
+
+def to_uint8(image):
+    """(H, W, C) uint8 pixels from uint8 or [0, 1] float input; 2D input becomes one channel."""
+    image = np.asarray(image)
+    if image.ndim == 2:
+        image = image[..., None]
+    if image.dtype != np.uint8:
+        image = np.clip(image * 255.0 + 0.5, 0, 255).astype(np.uint8)
+    return image
+
+
+def _filter_rows(raw, above, channels):
+    # raw: (n, stride) int16 rows, above: the row before them (zeros for the first row)
+    a = np.zeros_like(raw)
+    a[:, channels:] = raw[:, :-channels]
+    b = np.empty_like(raw)
+    b[0] = above
+    b[1:] = raw[:-1]
+    c = np.zeros_like(raw)
+    c[:, channels:] = b[:, :-channels]
+
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+    candidates = np.stack([
+        raw,
+        raw - a,
+        raw - b,
+        raw - ((a + b) >> 1),
+        raw - paeth,
+    ]).astype(np.uint8)
+
+    # Minimum sum of absolute differences, treating residual bytes as signed
+    cost = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2)
+    choice = np.argmin(cost, axis=0)
+
+    out = np.empty((raw.shape[0], 1 + raw.shape[1]), dtype=np.uint8)
+    out[:, 0] = choice
+    out[:, 1:] = candidates[choice, np.arange(raw.shape[0])]
+    return out
+
+
+def filter_scanlines(pixels, pool=None):
+    """
+    PNG-filters every row of (H, W, C) uint8 pixels, picking per row the filter with the
+    smallest sum of absolute (signed) residuals. Returns (H, 1 + W * C) bytes with the filter type first.
+    """
+    height, width, channels = pixels.shape
+    raw = pixels.reshape(height, width * channels).astype(np.int16)
+    zero = np.zeros(width * channels, dtype=np.int16)
+
+    def run(start):
+        stop = min(start + FILTER_ROWS, height)
+        return _filter_rows(raw[start:stop], raw[start - 1] if start else zero, channels)
+
+    starts = range(0, height, FILTER_ROWS)
+    return np.concatenate(list(pool.map(run, starts) if pool else map(run, starts)))
+
+
+def _deflate_block(data, start, stop, level):
+    dictionary = data[max(0, start - WINDOW):start]
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, *([dictionary] if dictionary else []))
+    body = compressor.compress(data[start:stop])
+    return body + compressor.flush(zlib.Z_FINISH if stop == len(data) else zlib.Z_FULL_FLUSH)
+
+
+def compress_parallel(data, level=DEFAULT_LEVEL, workers=None, block_size=BLOCK_SIZE, pool=None):
+    """zlib stream of `data` built from independently deflated blocks joined at full-flush boundaries."""
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as own_pool:
+            return compress_parallel(data, level, block_size=block_size, pool=own_pool)
+
+    data = bytes(data)
+    starts = list(range(0, len(data), block_size)) or [0]
+    blocks = list(pool.map(lambda start: _deflate_block(data, start, min(start + block_size, len(data)), level), starts))
+
+    # CMF/FLG header: 32 KiB window, FDICT clear, FLEVEL from the level, FCHECK making it a multiple of 31
+    flevel = 0 if level < 2 else 1 if level < 6 else 2 if level == 6 else 3
+    cmf = 0x78
+    flg = flevel << 6
+    flg += 31 - ((cmf << 8) + flg) % 31
+    return bytes([cmf, flg]) + b''.join(blocks) + struct.pack('>I', zlib.adler32(data))
+
+
+def _chunk(kind, payload):
+    return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload))
+
+
+def encode_png(image, level=DEFAULT_LEVEL, workers=None):
+    """PNG file bytes for an (H, W[, C]) image, C in 1-4, 8 bits per channel."""
+    pixels = to_uint8(image)
+    height, width, channels = pixels.shape
+    if channels not in COLOR_TYPES:
+        raise ValueError(f"Unsupported channel count {channels}; expected 1 to 4.")
+
+    header = struct.pack('>IIBBBBB', width, height, 8, COLOR_TYPES[channels], 0, 0, 0)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        idat = compress_parallel(filter_scanlines(pixels, pool).tobytes(), level, pool=pool)
+    return b'\x89PNG\r\n\x1a\n' + _chunk(b'IHDR', header) + _chunk(b'IDAT', idat) + _chunk(b'IEND', b'')
+
+
+def encode_indexed_png(indices, palette, level=DEFAULT_LEVEL, workers=None):
+    """
+    Palette PNG bytes: (H, W) uint8 indices into a (K, 3|4) uint8 palette, K <= 256.
+    Rows are left unfiltered (the usual choice for indexed data); alpha goes into a tRNS chunk.
+    """
+    indices = np.asarray(indices, dtype=np.uint8)
+    palette = np.asarray(palette, dtype=np.uint8)
+    if len(palette) > 256 or palette.shape[1] not in (3, 4):
+        raise ValueError(f"Unsupported palette shape {palette.shape}; expected up to 256 RGB or RGBA entries.")
+
+    height, width = indices.shape
+    header = struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)
+    chunks = _chunk(b'IHDR', header) + _chunk(b'PLTE', palette[:, :3].tobytes())
+    if palette.shape[1] == 4 and (palette[:, 3] < 255).any():
+        # Trailing opaque entries may be omitted from tRNS
+        alpha = palette[:, 3]
+        last = int(np.nonzero(alpha < 255)[0][-1]) + 1
+        chunks += _chunk(b'tRNS', alpha[:last].tobytes())
+
+    rows = np.zeros((height, 1 + width), dtype=np.uint8)
+    rows[:, 1:] = indices
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        idat = compress_parallel(rows.tobytes(), level, pool=pool)
+    return b'\x89PNG\r\n\x1a\n' + chunks + _chunk(b'IDAT', idat) + _chunk(b'IEND', b'')
+
+
+def write_png(path, image, level=DEFAULT_LEVEL, workers=None):
+    """Writes image to path as a PNG; returns the file size in bytes."""
+    data = encode_png(image, level, workers)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def save_image_png(image, path, level=DEFAULT_LEVEL, workers=None):
+    """
+    Writes a Blender image (anything with size, channels and pixels.foreach_get) with this encoder
+    instead of image.save(). Shared by the Blender scripts; needs no bpy import itself.
+    """
+    width, height = image.size
+    channels = image.channels
+    pixels = np.zeros(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    # Blender stores rows bottom-up
+    return write_png(path, pixels.reshape(height, width, channels)[::-1], level, workers)
@@ -0,0 +1,165 @@
+import io
+
+import numpy as np
+
+try:
+    from scripts import glb_io, png_writer
+except ImportError:  # Frozen build / running from inside scripts/
+    import glb_io
+    import png_writer
+
+# Palette quantization for small tile textures: median cut over the texture's distinct colours
+# (weighted by how often they occur), refined with a few k-means passes, then every texel is
+# mapped to its nearest palette entry, optionally through an 8x8 ordered (Bayer) dither.
+# The result is written as an indexed PNG and replaces the GLB's embedded image when smaller.
+
+DEFAULT_COLORS = 64
+KMEANS_ITERATIONS = 4
+
+# Texels per chunk when computing nearest-palette distances
+CHUNK = 65536
+
+BAYER_8 = np.array([
+    [0, 32, 8, 40, 2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44, 4, 36, 14, 46, 6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [3, 35, 11, 43, 1, 33, 9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47, 7, 39, 13, 45, 5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21],
+], dtype=np.float32) / 64.0
+
+
+def unique_colors(pixels):
+    """(colors, counts, inverse) over the rows of an (N, C) uint8 array."""
+    # Pack each texel into one integer so np.unique sorts scalars instead of rows
+    keys = np.zeros(len(pixels), dtype=np.uint32)
+    for c in range(pixels.shape[1]):
+        keys = (keys << 8) | pixels[:, c]
+    unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    shifts = 8 * np.arange(pixels.shape[1] - 1, -1, -1, dtype=np.uint32)
+    colors = ((unique[:, None] >> shifts) & 0xFF).astype(np.uint8)
+    return colors, counts, inverse.ravel()
+
+
+def median_cut(colors, counts, target):
+    """Splits the colour set at the weighted median of its widest channel until `target` boxes exist."""
+    colors = colors.astype(np.float32)
+
+    def measure(box):
+        # Widest channel, weighted by how many texels the box covers
+        span = np.ptp(colors[box], axis=0) if len(box) > 1 else np.zeros(colors.shape[1])
+        return span.max() * np.sqrt(counts[box].sum()), int(np.argmax(span))
+
+    boxes = [np.arange(len(colors))]
+    scores = [measure(boxes[0])]
+    while len(boxes) < target:
+        widest = max(range(len(boxes)), key=lambda i: scores[i][0])
+        if scores[widest][0] <= 0:
+            break
+        box = boxes.pop(widest)
+        channel = scores.pop(widest)[1]
+        order = box[np.argsort(colors[box, channel], kind='stable')]
+        cumulative = np.cumsum(counts[order])
+        split = int(np.clip(np.searchsorted(cumulative, cumulative[-1] / 2), 0, len(order) - 2)) + 1
+        for half in (order[:split], order[split:]):
+            boxes.append(half)
+            scores.append(measure(half))
+
+    return np.array([np.average(colors[box], axis=0, weights=counts[box]) for box in boxes], dtype=np.float32)
+
+
+def nearest(pixels, palette):
+    """Index of the nearest palette entry (squared distance) for every row of pixels."""
+    pixels = pixels.astype(np.float32)
+    norms = (palette ** 2).sum(axis=1)
+    out = np.empty(len(pixels), dtype=np.int64)
+    for start in range(0, len(pixels), CHUNK):
+        chunk = pixels[start:start + CHUNK]
+        # |p - c|^2 minus the |p|^2 term, which does not change the argmin
+        out[start:start + CHUNK] = np.argmin(norms[None, :] - 2.0 * chunk @ palette.T, axis=1)
+    return out
+
+
+def kmeans(colors, counts, palette, iterations=KMEANS_ITERATIONS):
+    """Weighted Lloyd iterations over the distinct colours; empty clusters keep their entry."""
+    colors = colors.astype(np.float32)
+    weights = counts.astype(np.float64)
+    for _ in range(iterations):
+        labels = nearest(colors, palette)
+        totals = np.bincount(labels, weights, minlength=len(palette))
+        used = totals > 0
+        for c in range(colors.shape[1]):
+            sums = np.bincount(labels, weights * colors[:, c], minlength=len(palette))
+            palette[used, c] = sums[used] / totals[used]
+    return palette
+
+
+def quantize(image, colors=DEFAULT_COLORS, dither=False, iterations=KMEANS_ITERATIONS):
+    """
+    Palette-quantizes an (H, W, C) uint8 image. Returns (indices (H, W) uint8, palette (K, C) uint8).
+    With dither, a Bayer offset scaled to the palette spacing is added before the nearest-colour lookup.
+    """
+    height, width, channels = image.shape
+    pixels = image.reshape(-1, channels)
+    distinct, counts, inverse = unique_colors(pixels)
+
+    if len(distinct) <= colors:
+        return inverse.reshape(height, width).astype(np.uint8), distinct
+
+    palette = kmeans(distinct, counts, median_cut(distinct, counts, colors), iterations)
+    palette = np.clip(np.round(palette), 0, 255)
+
+    if dither:
+        # Roughly the gap between neighbouring palette entries along one colour axis
+        spread = 255.0 / np.cbrt(len(palette))
+        offsets = (np.tile(BAYER_8, (height // 8 + 1, width // 8 + 1))[:height, :width] - 0.5) * spread
+        shifted = pixels.astype(np.float32).copy()
+        shifted[:, :3] += offsets.reshape(-1, 1)
+        indices = nearest(shifted, palette)
+    else:
+        indices = nearest(distinct, palette)[inverse]
+
+    return indices.reshape(height, width).astype(np.uint8), palette.astype(np.uint8)
+
+
+def quantize_png_bytes(data, colors=DEFAULT_COLORS, dither=False, level=png_writer.DEFAULT_LEVEL):
+    """Indexed PNG bytes for an encoded image. Host side only: decoding needs Pillow."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        mode = 'RGBA' if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info else 'RGB'
+        pixels = np.asarray(img.convert(mode))
+    if mode == 'RGBA' and (pixels[..., 3] == 255).all():
+        pixels = pixels[..., :3]
+
+    indices, palette = quantize(pixels, colors, dither)
+    return png_writer.encode_indexed_png(indices, palette, level)
+
+
+def quantize_glb(glb_path, colors=DEFAULT_COLORS, dither=False, level=png_writer.DEFAULT_LEVEL):
+    """
+    Replaces every embedded image of glb_path with an indexed PNG where that is smaller.
+    Returns {"images": n, "bytes_before": ..., "bytes_after": ...} for the images considered.
+    """
+    gltf, binary = glb_io.read_glb(glb_path)
+    before = after = 0
+    replaced = {}
+    images = glb_io.embedded_images(gltf, binary)
+    for index, data, mime in images:
+        before += len(data)
+        if mime not in ('image/png', 'image/jpeg'):
+            after += len(data)
+            continue
+        indexed = quantize_png_bytes(data, colors, dither, level)
+        if len(indexed) < len(data):
+            replaced[index] = (indexed, 'image/png')
+            after += len(indexed)
+        else:
+            after += len(data)
+
+    if replaced:
+        glb_io.write_glb(glb_path, gltf, glb_io.replace_images(gltf, binary, replaced))
+    return {"images": len(images), "quantized": len(replaced), "colors": colors, "dither": dither,
+            "bytes_before": before, "bytes_after": after}
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Append-only JSON-lines journal of Meshy generations, one line per state change:
+# {"hash": <sha256 of the portrait>, "filename", "task_id", "status", "output", "time"}.
+# Later lines for the same hash override earlier fields, so a record is never rewritten in
+# place and a crash can at worst leave one torn line at the end.
+
+JOURNAL_NAME = "meshy_tasks.jsonl"
+
+# PENDING: submitted, result not downloaded yet (resume polling). SUCCEEDED: output written.
+# FLAGGED: near-duplicate of another portrait, held back instead of submitted.
+PENDING = "PENDING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+FLAGGED = "FLAGGED"
+
+HASH_BLOCK = 1024 * 1024
+
+_LOCK = threading.Lock()
+
+
+def hash_image(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_journal(journal_path):
+    """{image hash: merged record}. Unreadable lines (e.g. torn by a crash) are skipped."""
+    records = {}
+    if not os.path.exists(journal_path):
+        return records
+    with open(journal_path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                records.setdefault(entry['hash'], {}).update(entry)
+            except (json.JSONDecodeError, KeyError, TypeError):
+                print(f"⚠️ Warning: Ignoring unreadable line {number} of {journal_path}")
+    return records
+
+
+def record_task(journal_path, image_hash, **fields):
+    """Appends one state change and flushes it to disk before returning."""
+    entry = {"hash": image_hash, **fields, "time": time.time()}
+    with _LOCK:
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def compact_journal(journal_path):
+    """Rewrites the journal with one line per image, replacing the file atomically. Returns the records."""
+    with _LOCK:
+        records = load_journal(journal_path)
+        if records:
+            tmp_path = journal_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in records.values():
+                    f.write(json.dumps(record, sort_keys=True) + "\n")
+            os.replace(tmp_path, journal_path)
+    return records
+
+
+def unfinished(records):
+    """Records of submitted tasks whose model was never downloaded."""
+    return [record for record in records.values() if record.get('status') == PENDING and record.get('task_id')]
@@ -0,0 +1,113 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Estimates how much resolution a texture actually uses: the texture is box-downscaled by
+# powers of two, scaled back up, and compared with SSIM on luminance. The smallest size whose
+# round trip stays within the error budget is its useful resolution. Pure NumPy so it runs
+# inside Blender too (the baked texture is analysed before it is packed into the GLB).
+
+TextureAnalysis = namedtuple('TextureAnalysis', ['res', 'error', 'size'])
+
+# 1 - mean SSIM allowed by default between a texture and its downscaled round trip
+DEFAULT_MAX_ERROR = 0.02
+
+# Never suggest a texture smaller than this
+MIN_RESOLUTION = 128
+
+# SSIM window (pixels) and stabilising constants for values in [0, 1]
+SSIM_WINDOW = 8
+SSIM_C1 = 0.01 ** 2
+SSIM_C2 = 0.03 ** 2
+
+
+def luminance(image):
+    """Rec. 601 luma of an (H, W[, C]) image in [0, 1]; alpha is ignored."""
+    image = np.asarray(image, dtype=np.float32)
+    if image.ndim == 2:
+        return image
+    if image.shape[2] < 3:
+        return image[..., 0]
+    return image[..., 0] * 0.299 + image[..., 1] * 0.587 + image[..., 2] * 0.114
+
+
+def box_downsample(image, factor):
+    """Averages factor x factor blocks; edges are padded by repetition when the size does not divide."""
+    if factor <= 1:
+        return image
+    h, w = image.shape[:2]
+    out_h, out_w = -(-h // factor), -(-w // factor)
+    pad = [(0, out_h * factor - h), (0, out_w * factor - w)] + [(0, 0)] * (image.ndim - 2)
+    padded = np.pad(image, pad, mode='edge')
+    return padded.reshape((out_h, factor, out_w, factor) + image.shape[2:]).mean(axis=(1, 3))
+
+
+def _linear_axis(image, size, axis):
+    n = image.shape[axis]
+    if n == size:
+        return image
+    # Pixel centres line up as in any bilinear texture sampler
+    coords = np.clip((np.arange(size) + 0.5) * (n / size) - 0.5, 0, n - 1)
+    i0 = np.floor(coords).astype(np.int64)
+    i1 = np.minimum(i0 + 1, n - 1)
+    shape = [1] * image.ndim
+    shape[axis] = size
+    w = (coords - i0).astype(np.float32).reshape(shape)
+    return np.take(image, i0, axis=axis) * (1 - w) + np.take(image, i1, axis=axis) * w
+
+
+def upsample_linear(image, shape):
+    """Bilinear resize of an (H, W[, C]) image to shape (H', W')."""
+    return _linear_axis(_linear_axis(image, shape[0], 0), shape[1], 1)
+
+
+def _block_mean(x, size):
+    # Mean over non-overlapping size x size windows; a partial border row/column is dropped
+    h, w = (x.shape[0] // size) * size, (x.shape[1] // size) * size
+    return x[:h, :w].reshape(h // size, size, w // size, size).mean(axis=(1, 3), dtype=np.float64)
+
+
+def ssim(a, b, window=SSIM_WINDOW):
+    """Mean structural similarity of two equally sized greyscale images in [0, 1], over tiled windows."""
+    window = max(1, min(window, a.shape[0], a.shape[1]))
+    mu_a, mu_b = _block_mean(a, window), _block_mean(b, window)
+    var_a = _block_mean(a * a, window) - mu_a ** 2
+    var_b = _block_mean(b * b, window) - mu_b ** 2
+    cov = _block_mean(a * b, window) - mu_a * mu_b
+    numerator = (2 * mu_a * mu_b + SSIM_C1) * (2 * cov + SSIM_C2)
+    denominator = (mu_a ** 2 + mu_b ** 2 + SSIM_C1) * (var_a + var_b + SSIM_C2)
+    return float((numerator / denominator).mean())
+
+
+def roundtrip_error(gray, factor):
+    """1 - SSIM between a greyscale image and its downscale-by-factor, upscale-back round trip."""
+    if factor <= 1:
+        return 0.0
+    return 1.0 - ssim(gray, upsample_linear(box_downsample(gray, factor), gray.shape))
+
+
+def useful_resolution(image, max_error=DEFAULT_MAX_ERROR, min_res=MIN_RESOLUTION):
+    """
+    Halves the texture while the round-trip error stays within max_error.
+    Returns TextureAnalysis(res, error, size) with res and size measured on the longest side.
+    """
+    gray = luminance(image)
+    size = max(gray.shape[:2])
+    res, error = size, 0.0
+    factor = 2
+    while size // factor >= min_res:
+        candidate = roundtrip_error(gray, factor)
+        if candidate > max_error:
+            break
+        res, error = -(-size // factor), candidate
+        factor *= 2
+    return TextureAnalysis(int(res), float(error), int(size))
+
+
+def analyze_png(path, max_error=DEFAULT_MAX_ERROR, min_res=MIN_RESOLUTION):
+    """useful_resolution() of an image file. Host side only: needs Pillow, which Blender does not ship."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        image = np.asarray(img.convert('RGB'), dtype=np.float32) / 255.0
+    return useful_resolution(image, max_error, min_res)
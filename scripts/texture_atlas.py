@@ -0,0 +1,118 @@
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from scripts import png_writer, texture_resize, uv_packer
+except ImportError:  # Frozen build / running from inside scripts/ (or Blender)
+    import png_writer
+    import texture_resize
+    import uv_packer
+
+# Packs the base colour of every high-poly material into one atlas so the bake stays a single
+# pass however many materials the source has. Images are skyline-packed (scripts/uv_packer.py)
+# with an edge-extended border, flat-colour materials get a small solid swatch, and the loop UVs
+# of each material's faces are remapped into its slot. Pure NumPy so it runs inside Blender;
+# images use Blender's bottom-up row order, so slot y and UV v both count from the bottom.
+
+# Border around every slot, filled by extending the image's edge texels
+ATLAS_PADDING = 8
+
+# Side of the solid tile used for materials without an image
+SWATCH_SIZE = 4
+
+# Larger atlases are built from images halved (area average, linear light) until they fit
+MAX_ATLAS_SIDE = 8192
+
+# Inner rectangle of one image in the atlas, in pixels from the atlas's bottom-left corner
+AtlasSlot = namedtuple('AtlasSlot', ['x', 'y', 'width', 'height'])
+
+
+def swatch(color):
+    """SWATCH_SIZE square RGBA uint8 tile of one [0, 1] colour (already in display space)."""
+    rgba = np.ones(4, dtype=np.float32)
+    rgba[:len(color)] = color[:4]
+    return np.tile(png_writer.to_uint8(rgba.reshape(1, 1, 4)), (SWATCH_SIZE, SWATCH_SIZE, 1))
+
+
+def _rgba(image):
+    image = png_writer.to_uint8(image)
+    channels = image.shape[2]
+    if channels == 4:
+        return image
+    if channels in (1, 2):
+        image = np.concatenate([np.repeat(image[..., :1], 3, axis=-1), image[..., 1:]], axis=-1)
+    if image.shape[2] == 3:
+        image = np.concatenate([image, np.full(image.shape[:2] + (1,), 255, dtype=np.uint8)], axis=-1)
+    return image
+
+
+def pack_atlas(sizes, padding=ATLAS_PADDING):
+    """
+    Skyline-packs (width, height) images, each with `padding` pixels on every side, trying the
+    same strip widths as the UV packer and keeping the squarest. Returns (slots, (height, width)).
+    """
+    sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+    padded = sizes + 2 * padding
+    area = float(np.prod(padded, axis=1).sum())
+
+    best = None
+    for factor in uv_packer.STRIP_FACTORS:
+        width = int(max(np.ceil(np.sqrt(area) * factor), padded[:, 0].max()))
+        # One skyline bin per pixel keeps every corner on whole texels
+        positions, _, height = uv_packer.skyline_pack(padded, width, bins=width, allow_rotation=False)
+        extent = max(width, int(np.ceil(height)))
+        if best is None or extent < best[0]:
+            best = (extent, width, int(np.ceil(height)), positions)
+    _, width, height, positions = best
+
+    slots = [
+        AtlasSlot(int(round(x)) + padding, int(round(y)) + padding, int(w), int(h))
+        for (x, y), (w, h) in zip(positions, sizes)
+    ]
+    return slots, (height, width)
+
+
+def build_atlas(images, padding=ATLAS_PADDING, max_side=MAX_ATLAS_SIDE):
+    """
+    Packs (H, W, C) images (uint8 or [0, 1] float) into one RGBA uint8 atlas.
+    Returns (atlas, slots) with slots in the order of images.
+    """
+    images = [_rgba(image) for image in images]
+    slots, shape = pack_atlas([(image.shape[1], image.shape[0]) for image in images], padding)
+    while max(shape) > max_side:
+        halved = []
+        for image in images:
+            if max(image.shape[:2]) <= SWATCH_SIZE:
+                halved.append(image)
+                continue
+            small = texture_resize.resize(image, (max(1, image.shape[0] // 2), max(1, image.shape[1] // 2)), filter="box")
+            halved.append(png_writer.to_uint8(small))
+        images = halved
+        slots, shape = pack_atlas([(image.shape[1], image.shape[0]) for image in images], padding)
+
+    atlas = np.zeros(shape + (4,), dtype=np.uint8)
+    for image, slot in zip(images, slots):
+        bordered = np.pad(image, ((padding, padding), (padding, padding), (0, 0)), mode='edge')
+        atlas[slot.y - padding:slot.y + slot.height + padding, slot.x - padding:slot.x + slot.width + padding] = bordered
+    return atlas, slots
+
+
+def wrap_face_uvs(loop_uvs, loop_totals):
+    """
+    Moves every face by whole UV tiles so its centroid lies in the 0-1 square, then clamps it
+    there: a slot can't repeat, so tiling textures keep each face's own tile.
+    """
+    loop_uvs = np.asarray(loop_uvs, dtype=np.float64).reshape(-1, 2)
+    totals = np.maximum(np.asarray(loop_totals), 1)
+    faces = uv_packer.loop_faces(loop_totals)
+    centroids = np.stack([np.bincount(faces, loop_uvs[:, k], minlength=len(totals)) for k in (0, 1)], axis=1) / totals[:, None]
+    return np.clip(loop_uvs - np.floor(centroids)[faces], 0.0, 1.0)
+
+
+def remap_uvs(loop_uvs, loop_slots, slots, shape):
+    """Maps 0-1 loop UVs into the atlas slot given per loop. shape is the atlas (height, width)."""
+    origins = np.array([(slot.x, slot.y) for slot in slots], dtype=np.float64)
+    extents = np.array([(slot.width, slot.height) for slot in slots], dtype=np.float64)
+    pixels = origins[loop_slots] + np.asarray(loop_uvs, dtype=np.float64).reshape(-1, 2) * extents[loop_slots]
+    return pixels / np.array([shape[1], shape[0]], dtype=np.float64)
@@ -0,0 +1,63 @@
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from scripts import png_writer
+except ImportError:  # Frozen build / running from inside scripts/ (or Blender)
+    import png_writer
+
+# Drops texture channels that carry no information: an alpha channel that is fully opaque (or that
+# the material never reads), and colour channels that are all equal (greyscale stored as RGB).
+# Comparisons are made on the 8-bit values that end up in the PNG, so the reduction is lossless.
+# Pure NumPy so it runs inside Blender on the baked texture before export.
+
+ChannelReport = namedtuple('ChannelReport', [
+    'channels_in', 'channels_out', 'grayscale', 'alpha', 'constant_alpha', 'raw_bytes_in', 'raw_bytes_out'
+])
+
+
+def analyze_channels(pixels):
+    """
+    (grayscale, alpha_varies, constant_alpha) for an (H, W, C) uint8 image; constant_alpha is the
+    alpha value in [0, 1] when the image has an alpha channel that never changes, else None.
+    """
+    channels = pixels.shape[2]
+    has_alpha = channels in (2, 4)
+    color = pixels[..., :-1] if has_alpha else pixels
+
+    grayscale = color.shape[2] == 1 or bool((color == color[..., :1]).all())
+    if not has_alpha:
+        return grayscale, False, None
+    alpha = pixels[..., -1]
+    if alpha.min() == alpha.max():
+        return grayscale, False, float(alpha.flat[0]) / 255.0
+    return grayscale, True, None
+
+
+def reduce_channels(image, keep_alpha=True):
+    """
+    Returns (uint8 pixels with only the channels that matter, ChannelReport). Alpha is kept only when
+    some pixel is not fully opaque and keep_alpha is set; greyscale colour collapses to one channel (L or LA).
+    """
+    pixels = png_writer.to_uint8(image)
+    height, width, channels = pixels.shape
+    grayscale, alpha_varies, constant_alpha = analyze_channels(pixels)
+    has_alpha = channels in (2, 4)
+
+    color = pixels[..., :-1] if has_alpha else pixels
+    if grayscale:
+        color = color[..., :1]
+    alpha = keep_alpha and (alpha_varies or (constant_alpha is not None and constant_alpha < 1.0))
+    reduced = np.concatenate([color, pixels[..., -1:]], axis=-1) if alpha else color
+
+    report = ChannelReport(
+        channels_in=channels,
+        channels_out=reduced.shape[2],
+        grayscale=grayscale,
+        alpha=alpha,
+        constant_alpha=constant_alpha,
+        raw_bytes_in=height * width * channels,
+        raw_bytes_out=height * width * reduced.shape[2],
+    )
+    return np.ascontiguousarray(reduced), report
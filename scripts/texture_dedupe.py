@@ -0,0 +1,176 @@
+import hashlib
+import io
+import os
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from scripts import asset_report, glb_io
+except ImportError:  # Frozen build / running from inside scripts/
+    import asset_report
+    import glb_io
+
+# Library-level texture sharing. Every image in the GLBs of output_dir is hashed; images that occur
+# more than once (byte-identical, or optionally perceptually identical) are written once to
+# output_dir/textures/ and each GLB references that file by relative URI instead of embedding it,
+# so the Foundry client's HTTP cache fetches it a single time.
+
+SHARED_DIR = "textures"
+
+EXTENSIONS = {'image/png': '.png', 'image/jpeg': '.jpg', 'image/webp': '.webp', 'image/ktx2': '.ktx2'}
+
+# Difference hash: HASH_SIZE x HASH_SIZE gradient bits of a greyscale thumbnail
+HASH_SIZE = 8
+MAX_DISTANCE = 4
+
+# Colour thumbnail compared alongside the (greyscale) hash so recolours are never merged
+THUMB_SIZE = 4
+COLOR_TOLERANCE = 6
+
+TextureRef = namedtuple('TextureRef', ['glb', 'image', 'data', 'mime', 'uri'])
+Fingerprint = namedtuple('Fingerprint', ['size', 'dhash', 'thumb'])
+
+
+def fingerprint(data):
+    """Perceptual fingerprint of an encoded image, or None if Pillow cannot decode it (e.g. KTX2)."""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            size = img.size
+            gray = np.asarray(img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR), dtype=np.int16)
+            thumb = np.asarray(img.convert('RGB').resize((THUMB_SIZE, THUMB_SIZE), Image.BOX), dtype=np.int16)
+    except OSError:
+        return None
+    dhash = int.from_bytes(np.packbits(gray[:, 1:] > gray[:, :-1]).tobytes(), 'big')
+    return Fingerprint(size, dhash, thumb)
+
+
+def hash_distance(a, b):
+    """Differing dHash bits between two fingerprints."""
+    return bin(a.dhash ^ b.dhash).count('1')
+
+
+def similar(a, b, max_distance=MAX_DISTANCE, match_size=True):
+    return (
+        (a.size == b.size or not match_size)
+        and hash_distance(a, b) <= max_distance
+        and int(np.abs(a.thumb - b.thumb).max()) <= COLOR_TOLERANCE
+    )
+
+
+def fingerprint_to_json(mark):
+    return {"size": list(mark.size), "dhash": mark.dhash, "thumb": mark.thumb.tolist()}
+
+
+def fingerprint_from_json(data):
+    return Fingerprint(tuple(data["size"]), int(data["dhash"]), np.asarray(data["thumb"], dtype=np.int16))
+
+
+def collect_textures(output_dir):
+    """Every image of every GLB in output_dir, embedded or already shared. Returns ({glb: (gltf, bin)}, [TextureRef])."""
+    glbs, refs = {}, []
+    for name in sorted(os.listdir(output_dir)):
+        if not name.endswith('.glb'):
+            continue
+        path = os.path.join(output_dir, name)
+        try:
+            gltf, binary = glb_io.read_glb(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Warning: Skipping {name} for texture dedupe: {e}")
+            continue
+        glbs[name] = (gltf, binary)
+
+        for index, image in enumerate(gltf.get('images', [])):
+            if 'bufferView' in image:
+                data = glb_io.view_bytes(gltf, binary, image['bufferView'])
+                refs.append(TextureRef(name, index, data, image.get('mimeType', ''), None))
+            elif image.get('uri', '').startswith(SHARED_DIR + '/'):
+                try:
+                    with open(os.path.join(output_dir, image['uri']), 'rb') as f:
+                        refs.append(TextureRef(name, index, f.read(), image.get('mimeType', ''), image['uri']))
+                except OSError:
+                    print(f"⚠️ Warning: {name} references missing shared texture {image['uri']}")
+    return glbs, refs
+
+
+def group_textures(refs, perceptual=False, max_distance=MAX_DISTANCE):
+    """Lists of refs sharing one texture: exact SHA-256 matches, then (optionally) perceptual matches across those."""
+    exact = {}
+    for ref in refs:
+        exact.setdefault(hashlib.sha256(ref.data).hexdigest(), []).append(ref)
+    groups = list(exact.values())
+    if not perceptual:
+        return groups
+
+    # Greedy clustering: each group joins the first leader it resembles
+    clusters = []
+    for group in groups:
+        mark = fingerprint(group[0].data)
+        for leader, members in clusters:
+            if mark is not None and leader is not None and similar(mark, leader, max_distance):
+                members.extend(group)
+                break
+        else:
+            clusters.append((mark, list(group)))
+    return [members for _, members in clusters]
+
+
+def shared_uri(group):
+    """The group's existing shared file, or textures/<sha256 prefix><ext> of its first member."""
+    existing = next((ref.uri for ref in group if ref.uri), None)
+    if existing:
+        return existing, None
+    source = group[0]
+    name = hashlib.sha256(source.data).hexdigest()[:16] + EXTENSIONS.get(source.mime, '.bin')
+    return f"{SHARED_DIR}/{name}", source
+
+
+def dedupe_library(output_dir, perceptual=False, max_distance=MAX_DISTANCE):
+    """
+    Moves every texture used more than once across output_dir's GLBs into output_dir/textures/ and
+    rewrites the GLBs to reference it. Records per-asset savings in the asset report and returns totals.
+    """
+    glbs, refs = collect_textures(output_dir)
+    groups = [group for group in group_textures(refs, perceptual, max_distance) if len(group) > 1]
+
+    uris = {}
+    bytes_saved = files_written = 0
+    for group in groups:
+        uri, source = shared_uri(group)
+        embedded = [ref for ref in group if ref.uri is None]
+        if not embedded:
+            continue
+        if source is not None:
+            os.makedirs(os.path.join(output_dir, SHARED_DIR), exist_ok=True)
+            path = os.path.join(output_dir, uri)
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(source.data)
+                files_written += 1
+                bytes_saved -= len(source.data)
+        for ref in embedded:
+            uris.setdefault(ref.glb, {})[ref.image] = (uri, len(ref.data))
+            bytes_saved += len(ref.data)
+
+    report_path = os.path.join(output_dir, asset_report.REPORT_NAME)
+    for name, images in uris.items():
+        gltf, binary = glbs[name]
+        binary = glb_io.externalize_images(gltf, binary, {index: uri for index, (uri, _) in images.items()})
+        glb_io.write_glb(os.path.join(output_dir, name), gltf, binary)
+        asset_report.record_asset(report_path, name.replace('_optimized.glb', '.glb'), "dedupe", {
+            "shared": sorted({uri for uri, _ in images.values()}),
+            "bytes_removed": sum(size for _, size in images.values()),
+        })
+
+    summary = {
+        "textures": len(refs),
+        "shared_groups": len(groups),
+        "files_written": files_written,
+        "assets_rewritten": len(uris),
+        "bytes_saved": bytes_saved,
+        "perceptual": perceptual,
+    }
+    print(f"✅ Texture dedupe: {len(groups)} shared textures across {len(uris)} assets, {bytes_saved / 1024:.1f} KiB saved")
+    return summary
@@ -0,0 +1,207 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from scripts import png_writer
+except ImportError:  # Frozen build / running from inside scripts/ (or Blender)
+    import png_writer
+
+# Gamma-correct separable resizer. Colour channels are converted from sRGB to linear light,
+# resampled with an exact area-average box or a Lanczos-3 filter (widened when shrinking so it
+# averages over the source footprint), and converted back. Each pass splits its output rows
+# across a thread pool; NumPy releases the GIL inside the per-tap multiply-adds.
+# Pure NumPy so Blender can use it too; only load_png needs Pillow.
+
+FILTERS = ("box", "lanczos")
+LANCZOS_LOBES = 3
+
+# Texture tiers produced from a single decode
+DEFAULT_SIZES = (2048, 1024, 512, 256)
+
+# Output rows handed to each thread-pool task
+ROWS_PER_TASK = 64
+
+
+def srgb_to_linear(values):
+    values = np.asarray(values, dtype=np.float32)
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4).astype(np.float32)
+
+
+def linear_to_srgb(values):
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * values ** (1 / 2.4) - 0.055).astype(np.float32)
+
+
+def _lanczos(x, lobes=LANCZOS_LOBES):
+    return np.where(np.abs(x) < lobes, np.sinc(x) * np.sinc(x / lobes), 0.0)
+
+
+def resample_weights(src, dst, filter="lanczos"):
+    """
+    Per-output-pixel source indices and weights, both (dst, taps), for resampling one axis
+    from src to dst pixels. Indices past the edge are clamped; every row of weights sums to 1.
+    """
+    if filter not in FILTERS:
+        raise ValueError(f"Unknown filter '{filter}'. Expected one of {FILTERS}.")
+    scale = src / dst
+    centres = (np.arange(dst) + 0.5) * scale
+
+    if filter == "box":
+        # Exact overlap of each source pixel [j, j+1] with the output footprint [c - s/2, c + s/2]
+        half = max(scale, 1.0) / 2
+        first = np.floor(centres - half).astype(np.int64)
+        taps = int(np.ceil(2 * half)) + 1
+        idx = first[:, None] + np.arange(taps)
+        weights = np.clip(np.minimum(idx + 1, (centres + half)[:, None]) - np.maximum(idx, (centres - half)[:, None]), 0.0, None)
+    else:
+        stretch = max(scale, 1.0)
+        support = LANCZOS_LOBES * stretch
+        first = np.floor(centres - 0.5 - support).astype(np.int64) + 1
+        taps = int(np.ceil(2 * support)) + 1
+        idx = first[:, None] + np.arange(taps)
+        weights = _lanczos((idx + 0.5 - centres[:, None]) / stretch)
+
+    weights = weights / weights.sum(axis=1, keepdims=True)
+    return np.clip(idx, 0, src - 1), weights.astype(np.float32)
+
+
+def _resample_rows(image, out, idx, weights, axis, start, stop):
+    if axis == 0:
+        acc = np.zeros_like(out[start:stop])
+        for k in range(idx.shape[1]):
+            acc += weights[start:stop, k].reshape((-1,) + (1,) * (image.ndim - 1)) * image[idx[start:stop, k]]
+    else:
+        rows = image[start:stop]
+        acc = np.zeros_like(out[start:stop])
+        for k in range(idx.shape[1]):
+            acc += weights[:, k].reshape((1, -1) + (1,) * (image.ndim - 2)) * rows[:, idx[:, k]]
+    out[start:stop] = acc
+
+
+def _resample_axis(image, size, axis, filter, pool):
+    if image.shape[axis] == size:
+        return image
+    idx, weights = resample_weights(image.shape[axis], size, filter)
+    shape = list(image.shape)
+    shape[axis] = size
+    out = np.empty(shape, dtype=np.float32)
+    tasks = [
+        pool.submit(_resample_rows, image, out, idx, weights, axis, start, min(start + ROWS_PER_TASK, shape[0]))
+        for start in range(0, shape[0], ROWS_PER_TASK)
+    ]
+    for task in tasks:
+        task.result()
+    return out
+
+
+def _resize_linear(image, shape, filter, pool):
+    # Shrink the longer axis first so the second pass has less to do
+    if image.shape[1] / shape[1] > image.shape[0] / shape[0]:
+        return _resample_axis(_resample_axis(image, shape[1], 1, filter, pool), shape[0], 0, filter, pool)
+    return _resample_axis(_resample_axis(image, shape[0], 0, filter, pool), shape[1], 1, filter, pool)
+
+
+def _split_alpha(image):
+    # Greyscale + alpha and RGBA keep alpha linear; everything else is colour
+    channels = image.shape[2] if image.ndim == 3 else 1
+    return channels in (2, 4)
+
+
+def _convert(image, curve):
+    if _split_alpha(image):
+        return np.concatenate([curve(image[..., :-1]), np.clip(image[..., -1:], 0.0, 1.0)], axis=-1)
+    return curve(image)
+
+
+def _map_rows(func, image, pool):
+    if pool is None:
+        return func(image)
+    out = np.empty(image.shape, dtype=np.float32)
+
+    def run(start, stop):
+        out[start:stop] = func(image[start:stop])
+
+    tasks = [pool.submit(run, start, min(start + ROWS_PER_TASK, image.shape[0])) for start in range(0, image.shape[0], ROWS_PER_TASK)]
+    for task in tasks:
+        task.result()
+    return out
+
+
+def to_linear(image, srgb=True, pool=None):
+    """float32 copy of an (H, W[, C]) image in [0, 1] (uint8 is rescaled) with colour channels in linear light."""
+    image = np.asarray(image)
+    image = image.astype(np.float32) / 255.0 if image.dtype == np.uint8 else image.astype(np.float32)
+    if not srgb:
+        return image
+    return _map_rows(lambda rows: _convert(rows, srgb_to_linear), image, pool)
+
+
+def from_linear(image, srgb=True, pool=None):
+    if not srgb:
+        return np.clip(image, 0.0, 1.0)
+    return _map_rows(lambda rows: _convert(rows, linear_to_srgb), image, pool)
+
+
+def fit_shape(shape, max_side):
+    """(H, W) scaled so the longest side is max_side, keeping the aspect ratio."""
+    scale = max_side / max(shape[0], shape[1])
+    return max(1, round(shape[0] * scale)), max(1, round(shape[1] * scale))
+
+
+def resize(image, shape, filter="lanczos", srgb=True, workers=None):
+    """Resizes an (H, W[, C]) image to shape (H', W'); returns float32 in [0, 1], sRGB-encoded if srgb."""
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        return from_linear(_resize_linear(to_linear(image, srgb, pool), tuple(shape), filter, pool), srgb, pool)
+
+
+def build_pyramid(image, sizes=DEFAULT_SIZES, filter="lanczos", srgb=True, workers=None):
+    """
+    Every texture tier from one decoded image: {max_side: image} for each size in sizes.
+    The image is linearised once and each tier is filtered straight from it; tiers at or
+    above the source size are the source itself.
+    """
+    pyramid = {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        linear = to_linear(image, srgb, pool)
+        longest = max(linear.shape[:2])
+        for size in sorted(set(sizes), reverse=True):
+            if size >= longest:
+                pyramid[size] = from_linear(linear, srgb, pool)
+            else:
+                pyramid[size] = from_linear(_resize_linear(linear, fit_shape(linear.shape, size), filter, pool), srgb, pool)
+    return pyramid
+
+
+def load_png(path):
+    """float32 (H, W, C) image in [0, 1]. Host side only: needs Pillow."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        mode = 'RGBA' if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info else 'RGB'
+        return np.asarray(img.convert(mode), dtype=np.float32) / 255.0
+
+
+def save_png(path, image, level=png_writer.INTERMEDIATE_LEVEL):
+    return png_writer.write_png(path, image, level)
+
+
+def resize_png(src, dst, max_side, filter="lanczos", workers=None):
+    """Writes src to dst with its longest side at most max_side. Returns the new (H, W), or None if src already fits."""
+    image = load_png(src)
+    if max(image.shape[:2]) <= max_side:
+        return None
+    shape = fit_shape(image.shape, max_side)
+    save_png(dst, resize(image, shape, filter, workers=workers))
+    return shape
+
+
+def write_pyramid(path, sizes=DEFAULT_SIZES, filter="lanczos", workers=None, level=png_writer.DEFAULT_LEVEL):
+    """Writes <name>_<size>.png next to path for every tier. Returns {size: png_path}."""
+    pyramid = build_pyramid(load_png(path), sizes, filter, workers=workers)
+    outputs = {}
+    for size, image in pyramid.items():
+        outputs[size] = path.replace('.png', f'_{size}.png')
+        save_png(outputs[size], image, level)
+    return outputs
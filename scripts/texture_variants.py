@@ -0,0 +1,66 @@
+import copy
+import io
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from scripts import glb_io, png_writer, texture_resize
+except ImportError:  # Frozen build / running from inside scripts/
+    import glb_io
+    import png_writer
+    import texture_resize
+
+# Texture tiers derived from one bake. The baked GLB's embedded images are decoded once, every
+# requested size is filtered from that single linear-light copy (texture_resize.build_pyramid),
+# and each variant is written as a copy of the GLB with only its images swapped, so the
+# geometry is shared and no extra Blender or Cycles run is needed.
+
+# name: output suffix (None rewrites the source GLB itself), res: longest texture side
+TextureVariant = namedtuple('TextureVariant', ['name', 'res', 'png_level'])
+
+
+def decode_image(data):
+    """(H, W, C) uint8 pixels of an encoded image; RGBA only if it has transparency. Needs Pillow."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        mode = 'RGBA' if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info else 'RGB'
+        return np.asarray(img.convert(mode))
+
+
+def variant_path(src_glb, name):
+    return src_glb if name is None else src_glb.replace('.glb', f'_{name}.glb')
+
+
+def write_variants(src_glb, variants, workers=None):
+    """
+    Writes one GLB per TextureVariant, with every embedded PNG/JPEG image larger than the variant's
+    res scaled down (Lanczos, gamma-correct). Images already within res keep their original bytes.
+    Returns {variant name: glb path}.
+    """
+    gltf, binary = glb_io.read_glb(src_glb)
+    sizes = sorted({variant.res for variant in variants})
+
+    pyramids = {}
+    for index, data, mime in glb_io.embedded_images(gltf, binary):
+        if mime not in ('image/png', 'image/jpeg'):
+            continue
+        pixels = decode_image(data)
+        needed = [size for size in sizes if size < max(pixels.shape[:2])]
+        if needed:
+            pyramids[index] = texture_resize.build_pyramid(pixels, needed, workers=workers)
+
+    outputs = {}
+    for variant in variants:
+        replacements = {
+            index: (png_writer.encode_png(pyramid[variant.res], variant.png_level, workers), 'image/png')
+            for index, pyramid in pyramids.items()
+            if variant.res in pyramid
+        }
+        path = variant_path(src_glb, variant.name)
+        if replacements or path != src_glb:
+            doc = copy.deepcopy(gltf)
+            glb_io.write_glb(path, doc, glb_io.replace_images(doc, binary, replacements) if replacements else binary)
+        outputs[variant.name] = path
+    return outputs
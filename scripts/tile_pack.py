@@ -0,0 +1,339 @@
+import copy
+import io
+import math
+import os
+
+import numpy as np
+
+try:
+    from scripts import asset_report, glb_io, png_writer, texture_atlas, texture_resize
+except ImportError:  # Frozen build / running from inside scripts/
+    import asset_report
+    import glb_io
+    import png_writer
+    import texture_atlas
+    import texture_resize
+
+# Pack-level atlasing for tile outputs. The base colour textures of a set of GLBs are packed into
+# shared atlas pages (scripts/texture_atlas.py), each primitive's UVs are rewritten into its slot,
+# and the tiles are written back either as separate GLBs referencing the shared pages by URI
+# ("separate") or as one scene GLB laid out on a grid with the pages embedded once ("combined").
+
+PACK_MODES = ("separate", "combined")
+PAGE_SIZE = 2048
+ATLAS_DIR = "atlases"
+
+# Distance between tiles in the combined scene; extract normalizes every model to unit size
+GRID_SPACING = 1.25
+
+CLAMP_TO_EDGE = 33071
+
+
+def base_color_textures(gltf):
+    """
+    {material index: (texture index, texCoord set)} for materials whose only texture is the base colour;
+    remapping UVs for anything else (normal maps sharing the UVs) would break it.
+    """
+    found = {}
+    for i, material in enumerate(gltf.get('materials', [])):
+        pbr = material.get('pbrMetallicRoughness', {})
+        info = pbr.get('baseColorTexture')
+        others = [key for key in ('normalTexture', 'occlusionTexture', 'emissiveTexture') if key in material]
+        if info is None or others or 'metallicRoughnessTexture' in pbr:
+            continue
+        found[i] = (info['index'], info.get('texCoord', 0))
+    return found
+
+
+def texture_source(texture):
+    # WebP textures from gltfpack -tw keep their image in the extension
+    return texture.get('extensions', {}).get('EXT_texture_webp', {}).get('source', texture.get('source'))
+
+
+def load_image(gltf, binary, image_index):
+    """RGBA uint8 pixels of an embedded image (top row first). Needs Pillow."""
+    from PIL import Image
+
+    image = gltf['images'][image_index]
+    with Image.open(io.BytesIO(glb_io.view_bytes(gltf, binary, image['bufferView']))) as img:
+        return np.asarray(img.convert('RGBA'))
+
+
+def assign_pages(sizes, page_size=PAGE_SIZE, padding=texture_atlas.ATLAS_PADDING):
+    """Lists of image indices per page: largest first, each page filled until the next image no longer fits."""
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][0] * sizes[i][1])
+    pages, current = [], []
+    for i in order:
+        trial = current + [i]
+        _, shape = texture_atlas.pack_atlas([sizes[j] for j in trial], padding)
+        if max(shape) <= page_size or not current:
+            current = trial
+        else:
+            pages.append(current)
+            current = [i]
+    if current:
+        pages.append(current)
+    return pages
+
+
+def fit_to_page(pixels, page_size=PAGE_SIZE, padding=texture_atlas.ATLAS_PADDING):
+    limit = page_size - 2 * padding
+    if max(pixels.shape[:2]) <= limit:
+        return pixels
+    return png_writer.to_uint8(texture_resize.resize(pixels, texture_resize.fit_shape(pixels.shape, limit)))
+
+
+def remap_primitives(gltf, binary, texture_slots):
+    """
+    Rewrites the UVs of every primitive whose material samples a packed texture into that texture's
+    atlas slot. texture_slots is {texture index: (slot, page shape)}. Returns the new BIN chunk.
+    """
+    materials = base_color_textures(gltf)
+    done = set()
+    for mesh in gltf.get('meshes', []):
+        for primitive in mesh.get('primitives', []):
+            entry = materials.get(primitive.get('material'))
+            if entry is None or entry[0] not in texture_slots:
+                continue
+            accessor = primitive.get('attributes', {}).get(f"TEXCOORD_{entry[1]}")
+            if accessor is None or accessor in done:
+                continue
+            slot, shape = texture_slots[entry[0]]
+            # A slot can't repeat, so tiling UVs are clamped to their first tile
+            uvs = np.clip(glb_io.read_accessor(gltf, binary, accessor), 0.0, 1.0)
+            atlas_uvs = texture_atlas.remap_uvs(uvs, np.zeros(len(uvs), dtype=np.int64), [slot], shape)
+            binary = glb_io.write_float_accessor(gltf, binary, accessor, atlas_uvs)
+            done.add(accessor)
+    return binary
+
+
+def point_textures_at_pages(gltf, texture_pages, page_images):
+    """Sends packed textures to their page's image (page_images: {page: image index}) with clamped sampling."""
+    samplers = gltf.setdefault('samplers', [])
+    clamp = len(samplers)
+    samplers.append({'wrapS': CLAMP_TO_EDGE, 'wrapT': CLAMP_TO_EDGE, 'magFilter': 9729, 'minFilter': 9987})
+    for index, page in texture_pages.items():
+        texture = gltf['textures'][index]
+        texture.pop('extensions', None)
+        texture['source'] = page_images[page]
+        texture['sampler'] = clamp
+
+    if not any('EXT_texture_webp' in t.get('extensions', {}) for t in gltf.get('textures', [])):
+        for key in ('extensionsUsed', 'extensionsRequired'):
+            if 'EXT_texture_webp' in gltf.get(key, []):
+                gltf[key].remove('EXT_texture_webp')
+                if not gltf[key]:
+                    del gltf[key]
+
+
+def drop_unused_images(gltf):
+    """Removes images no texture uses and renumbers texture sources."""
+    images = gltf.get('images', [])
+    used = sorted({texture_source(t) for t in gltf.get('textures', []) if texture_source(t) is not None})
+    mapping = {old: new for new, old in enumerate(used)}
+    gltf['images'] = [images[i] for i in used]
+    for texture in gltf.get('textures', []):
+        if 'source' in texture:
+            texture['source'] = mapping[texture['source']]
+        webp = texture.get('extensions', {}).get('EXT_texture_webp')
+        if webp:
+            webp['source'] = mapping[webp['source']]
+    if not gltf['images']:
+        del gltf['images']
+
+
+# ==========================================
+# COMBINED SCENE
+# ==========================================
+def _offset_texture_infos(node, offset):
+    # Every textureInfo ("...Texture": {"index": n}) in a material, extensions included
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key.endswith('Texture') and isinstance(value, dict) and 'index' in value:
+                value['index'] += offset
+            _offset_texture_infos(value, offset)
+    elif isinstance(node, list):
+        for value in node:
+            _offset_texture_infos(value, offset)
+
+
+def merge_scenes(docs, names, spacing=GRID_SPACING):
+    """
+    One glTF holding every (gltf, binary) in docs, each under a node named after it on a square grid.
+    Images are not merged: textures keep their source, so callers point them at shared images first.
+    """
+    out = {"asset": {"version": "2.0", "generator": "chriseurolog3d tile_pack"}, "scene": 0, "scenes": [{"nodes": []}]}
+    binary = b''
+    columns = max(1, math.ceil(math.sqrt(len(docs))))
+
+    placed = 0
+    for (gltf, doc_binary), name in zip(docs, names):
+        if gltf.get('skins') or gltf.get('animations') or gltf.get('cameras'):
+            print(f"⚠️ Warning: {name} has skins, animations or cameras; left out of the combined pack.")
+            continue
+        offsets = {key: len(out.get(key, [])) for key in ('nodes', 'meshes', 'materials', 'textures', 'samplers', 'accessors', 'bufferViews')}
+        doc = copy.deepcopy(gltf)
+
+        for i, view in enumerate(doc.get('bufferViews', [])):
+            binary, _ = glb_io.append_view(out, binary, glb_io.view_bytes(gltf, doc_binary, i))
+            if 'byteStride' in view:
+                out['bufferViews'][-1]['byteStride'] = view['byteStride']
+            if 'target' in view:
+                out['bufferViews'][-1]['target'] = view['target']
+        for accessor in doc.get('accessors', []):
+            if 'bufferView' in accessor:
+                accessor['bufferView'] += offsets['bufferViews']
+            for part in ('indices', 'values'):
+                if part in accessor.get('sparse', {}):
+                    accessor['sparse'][part]['bufferView'] += offsets['bufferViews']
+        for mesh in doc.get('meshes', []):
+            for primitive in mesh.get('primitives', []):
+                primitive['attributes'] = {k: v + offsets['accessors'] for k, v in primitive['attributes'].items()}
+                if 'indices' in primitive:
+                    primitive['indices'] += offsets['accessors']
+                if 'material' in primitive:
+                    primitive['material'] += offsets['materials']
+                if 'targets' in primitive:
+                    primitive['targets'] = [{k: v + offsets['accessors'] for k, v in t.items()} for t in primitive['targets']]
+        for material in doc.get('materials', []):
+            _offset_texture_infos(material, offsets['textures'])
+        for texture in doc.get('textures', []):
+            if 'sampler' in texture:
+                texture['sampler'] += offsets['samplers']
+        for node in doc.get('nodes', []):
+            if 'mesh' in node:
+                node['mesh'] += offsets['meshes']
+            if 'children' in node:
+                node['children'] = [c + offsets['nodes'] for c in node['children']]
+
+        for key in ('nodes', 'meshes', 'materials', 'textures', 'samplers', 'accessors'):
+            out.setdefault(key, []).extend(doc.get(key, []))
+        for key in ('extensionsUsed', 'extensionsRequired'):
+            for extension in doc.get(key, []):
+                if extension not in out.setdefault(key, []):
+                    out[key].append(extension)
+
+        scenes = doc.get('scenes', [])
+        roots = scenes[doc.get('scene', 0)].get('nodes', []) if scenes else []
+        row, column = divmod(placed, columns)
+        placed += 1
+        out['nodes'].append({
+            "name": os.path.splitext(name)[0],
+            "translation": [column * spacing, 0.0, row * spacing],
+            "children": [r + offsets['nodes'] for r in roots],
+        })
+        out['scenes'][0]['nodes'].append(len(out['nodes']) - 1)
+
+    return out, binary
+
+
+# ==========================================
+# PACKING
+# ==========================================
+def pack_tiles(glb_paths, output_dir, pack_name="tile_pack", mode="separate", page_size=PAGE_SIZE):
+    """
+    Packs the base colour textures of glb_paths into shared atlas pages and rewrites the tiles'
+    UVs. "separate" rewrites each GLB in place to reference output_dir/atlases/<pack>_<page>.png;
+    "combined" writes output_dir/<pack>.glb with every tile and the pages embedded once.
+    Returns a summary dict.
+    """
+    if mode not in PACK_MODES:
+        raise ValueError(f"Unknown pack mode '{mode}'. Expected one of {PACK_MODES}.")
+
+    docs, names, tiles = [], [], []
+    for path in glb_paths:
+        try:
+            gltf, binary = glb_io.read_glb(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Warning: Skipping {path} for the tile pack: {e}")
+            continue
+        doc = len(docs)
+        docs.append((gltf, binary))
+        names.append(os.path.basename(path))
+        for texture in sorted({t for t, _ in base_color_textures(gltf).values()}):
+            source = texture_source(gltf['textures'][texture])
+            if source is None or 'bufferView' not in gltf['images'][source]:
+                continue
+            try:
+                tiles.append((doc, texture, fit_to_page(load_image(gltf, binary, source), page_size)))
+            except OSError as e:
+                print(f"⚠️ Warning: Could not decode a texture of {path}: {e}")
+
+    if not tiles:
+        print("⚠️ No packable textures found; tile pack skipped.")
+        return None
+
+    pages = assign_pages([(pixels.shape[1], pixels.shape[0]) for _, _, pixels in tiles], page_size)
+    page_files, texture_slots = [], {}
+    for p, members in enumerate(pages):
+        atlas, slots = texture_atlas.build_atlas([tiles[i][2] for i in members], max_side=page_size)
+        page_files.append(png_writer.encode_png(atlas))
+        for i, slot in zip(members, slots):
+            doc, texture, _ = tiles[i]
+            texture_slots.setdefault(doc, {})[texture] = (slot, atlas.shape[:2], p)
+
+    report_path = os.path.join(output_dir, asset_report.REPORT_NAME)
+    rewritten, skipped = [], []
+    for doc, (gltf, binary) in enumerate(docs):
+        slots = texture_slots.get(doc, {})
+        if mode == "combined" and not gltf.get('textures'):
+            # Untextured tiles render from their material factors alone and join the scene as they are
+            gltf.pop('images', None)
+            docs[doc] = (gltf, glb_io.drop_unused_views(gltf, binary))
+            rewritten.append(doc)
+            continue
+        if mode == "combined" and len(slots) < len(gltf.get('textures', [])):
+            # The combined scene only carries the atlas pages, so every texture must be packed
+            print(f"⚠️ Warning: {names[doc]} has textures that can't be atlased; left out of the combined pack.")
+            skipped.append(names[doc])
+            continue
+        if not slots:
+            continue
+        binary = remap_primitives(gltf, binary, {t: (slot, shape) for t, (slot, shape, _) in slots.items()})
+        used_pages = sorted({p for _, _, p in slots.values()})
+        if mode == "separate":
+            # Shared pages are appended as external images; the tile's own images go
+            images = gltf.setdefault('images', [])
+            page_images = {}
+            for p in used_pages:
+                page_images[p] = len(images)
+                images.append({"uri": f"{ATLAS_DIR}/{pack_name}_{p}.png", "mimeType": "image/png"})
+        else:
+            page_images = {p: p for p in used_pages}
+        point_textures_at_pages(gltf, {t: p for t, (_, _, p) in slots.items()}, page_images)
+        if mode == "separate":
+            drop_unused_images(gltf)
+        else:
+            gltf.pop('images', None)
+        docs[doc] = (gltf, glb_io.drop_unused_views(gltf, binary))
+        rewritten.append(doc)
+
+        asset_report.record_asset(report_path, names[doc].replace('_optimized.glb', '.glb'), "tile_pack", {
+            "pack": pack_name,
+            "mode": mode,
+            "pages": used_pages,
+            "slots": [list(slot) for slot, _, _ in slots.values()],
+        })
+
+    if mode == "separate":
+        os.makedirs(os.path.join(output_dir, ATLAS_DIR), exist_ok=True)
+        for p, data in enumerate(page_files):
+            with open(os.path.join(output_dir, ATLAS_DIR, f"{pack_name}_{p}.png"), 'wb') as f:
+                f.write(data)
+        for doc in rewritten:
+            glb_io.write_glb(os.path.join(output_dir, names[doc]), *docs[doc])
+        output = os.path.join(output_dir, ATLAS_DIR)
+    else:
+        combined, binary = merge_scenes([docs[doc] for doc in rewritten], [names[doc] for doc in rewritten])
+        combined['images'] = []
+        for data in page_files:
+            binary, view = glb_io.append_view(combined, binary, data)
+            combined['images'].append({"bufferView": view, "mimeType": "image/png"})
+        output = os.path.join(output_dir, f"{pack_name}.glb")
+        glb_io.write_glb(output, combined, binary)
+
+    summary = {"tiles": len(rewritten), "textures": len(tiles), "pages": len(pages), "mode": mode, "output": output, "skipped": skipped}
+    print(f"✅ Tile pack '{pack_name}': {len(tiles)} textures from {len(rewritten)} tiles in {len(pages)} {page_size}px atlas page(s) -> {output}")
+    if skipped:
+        print(f"⚠️ {len(skipped)} tile(s) missing from the combined pack: {', '.join(skipped)}")
+    return summary
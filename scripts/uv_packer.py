@@ -0,0 +1,215 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Pure NumPy UV island repacker. Runs inside Blender on arrays pulled with foreach_get,
+# so it must never import bpy.
+
+UVStats = namedtuple('UVStats', ['islands', 'coverage', 'uv_area', 'world_area', 'texel_density'])
+
+# Skyline resolution across the packing width; one bin is roughly one texel at 1024px
+SKYLINE_BINS = 1024
+
+# Island rotations tried when looking for each island's tightest bounding box (0-90 degrees)
+ORIENTATION_STEPS = 18
+
+# Smallest texture the texel density target may pick
+MIN_RESOLUTION = 128
+
+# Strip widths tried, as multiples of sqrt(total island area); the squarest result wins
+STRIP_FACTORS = (1.0, 1.05, 1.1, 1.2, 1.35)
+
+
+def loop_faces(loop_totals):
+    """Face index of every loop, for Blender's contiguous per-polygon loop layout."""
+    return np.repeat(np.arange(len(loop_totals)), loop_totals)
+
+
+def fan_triangles(loop_starts, loop_totals):
+    """Loop index triples fan-triangulating every polygon."""
+    counts = np.maximum(np.asarray(loop_totals) - 2, 0)
+    first = np.repeat(loop_starts, counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    return np.stack([first, first + offset, first + offset + 1], axis=1)
+
+
+def find_islands(loop_verts, loop_uvs, loop_totals, precision=1e-5):
+    """
+    Labels every face with its UV island (0..n-1). Faces are connected when they share a
+    mesh vertex at the same UV coordinate, i.e. a non-seam edge or corner.
+    Returns (face_islands, island_count).
+    """
+    faces = loop_faces(loop_totals)
+    face_count = len(loop_totals)
+    if not face_count:
+        return np.zeros(0, dtype=np.int64), 0
+
+    quantized = np.round(np.asarray(loop_uvs) / precision).astype(np.int64)
+    keys = np.stack([np.asarray(loop_verts, dtype=np.int64), quantized[:, 0], quantized[:, 1]], axis=1)
+    _, key_ids = np.unique(keys, axis=0, return_inverse=True)
+    key_ids = key_ids.ravel()
+
+    # Min-label propagation with pointer jumping: converges in a handful of passes even for long islands
+    labels = np.arange(face_count)
+    while True:
+        key_min = np.full(key_ids.max() + 1, face_count)
+        np.minimum.at(key_min, key_ids, labels[faces])
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, faces, key_min[key_ids])
+        new_labels = new_labels[new_labels]
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    _, islands = np.unique(labels, return_inverse=True)
+    return islands.ravel(), int(islands.max()) + 1
+
+
+def _island_bounds(points, loop_islands, island_count):
+    lo = np.full((island_count, 2), np.inf)
+    hi = np.full((island_count, 2), -np.inf)
+    np.minimum.at(lo, loop_islands, points)
+    np.maximum.at(hi, loop_islands, points)
+    return lo, hi
+
+
+def _rotate(points, angles):
+    c, s = np.cos(angles), np.sin(angles)
+    return np.stack([points[:, 0] * c - points[:, 1] * s, points[:, 0] * s + points[:, 1] * c], axis=1)
+
+
+def island_orientations(loop_uvs, loop_islands, island_count, steps=ORIENTATION_STEPS):
+    """Per-island rotation angle (radians) giving the smallest axis-aligned bounding box."""
+    best_area = np.full(island_count, np.inf)
+    best_angle = np.zeros(island_count)
+    for angle in np.arange(steps) * (np.pi / 2 / steps):
+        lo, hi = _island_bounds(_rotate(loop_uvs, np.full(len(loop_uvs), angle)), loop_islands, island_count)
+        area = np.prod(hi - lo, axis=1)
+        better = area < best_area - 1e-12
+        best_area[better] = area[better]
+        best_angle[better] = angle
+    return best_angle
+
+
+def _window_max(values, width):
+    # Sliding-window maximum in O(n) for any width (van Herk / Gil-Werman)
+    n = len(values)
+    blocks = -(-n // width)
+    padded = np.full(blocks * width, -np.inf)
+    padded[:n] = values
+    padded = padded.reshape(blocks, width)
+    prefix = np.maximum.accumulate(padded, axis=1).ravel()
+    suffix = np.maximum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return np.maximum(suffix[:n - width + 1], prefix[width - 1:n])
+
+
+def skyline_pack(sizes, width, bins=SKYLINE_BINS, allow_rotation=True):
+    """
+    Bottom-left skyline packing of (w, h) rectangles into a strip `width` wide.
+    Returns (positions, rotated, height): lower-left corners, whether each rectangle was
+    turned 90 degrees, and the strip height used.
+    """
+    sizes = np.asarray(sizes, dtype=np.float64).reshape(-1, 2)
+    cell = width / bins
+    skyline = np.zeros(bins)
+    positions = np.zeros((len(sizes), 2))
+    rotated = np.zeros(len(sizes), dtype=bool)
+
+    # Tallest first keeps the skyline flat
+    for i in np.argsort(-sizes.max(axis=1), kind='stable'):
+        best = None
+        for turn in ((False, True) if allow_rotation else (False,)):
+            w, h = (sizes[i, 1], sizes[i, 0]) if turn else (sizes[i, 0], sizes[i, 1])
+            span = max(1, int(np.ceil(w / cell - 1e-9)))
+            if span > bins:
+                continue
+            floors = _window_max(skyline, span)
+            x = int(np.argmin(floors))
+            top = floors[x] + h
+            if best is None or top < best[0] - 1e-12:
+                best = (top, x, floors[x], span, turn)
+
+        if best is None:
+            raise ValueError(f"Rectangle {sizes[i]} does not fit a strip {width} wide.")
+        top, x, floor, span, turn = best
+        skyline[x:x + span] = top
+        positions[i] = (x * cell, floor)
+        rotated[i] = turn
+
+    return positions, rotated, float(skyline.max()) if len(sizes) else 0.0
+
+
+def pack_islands(loop_verts, loop_uvs, loop_totals, margin=0.004):
+    """
+    Repacks the UV islands into the unit square: each island is turned to its tightest
+    bounding box, the boxes are skyline-packed (with 90 degree turns), and everything is
+    scaled uniformly so relative texel density between islands is preserved.
+    `margin` is the gap between islands as a fraction of the texture.
+    Returns (new_loop_uvs, island_count).
+    """
+    loop_uvs = np.asarray(loop_uvs, dtype=np.float64).reshape(-1, 2)
+    face_islands, island_count = find_islands(loop_verts, loop_uvs, loop_totals)
+    if not island_count:
+        return loop_uvs.copy(), 0
+
+    loop_islands = face_islands[loop_faces(loop_totals)]
+    angles = island_orientations(loop_uvs, loop_islands, island_count)
+    turned = _rotate(loop_uvs, angles[loop_islands])
+    lo, hi = _island_bounds(turned, loop_islands, island_count)
+    sizes = hi - lo
+
+    # The gap is padded in pre-scale units, estimated from the packed area we expect to end up with
+    area = float(np.prod(sizes, axis=1).sum())
+    pad = margin * np.sqrt(max(area, 1e-12)) * 1.15
+    padded = sizes + pad
+
+    best = None
+    for factor in STRIP_FACTORS:
+        width = max(np.sqrt(float(np.prod(padded, axis=1).sum())) * factor, float(padded.min(axis=1).max()))
+        positions, rotated, height = skyline_pack(padded, width)
+        extent = max(width, height)
+        if best is None or extent < best[0]:
+            best = (extent, positions, rotated)
+    extent, positions, rotated = best
+
+    local = turned - lo[loop_islands]
+    spin = rotated[loop_islands]
+    # A 90 degree turn maps (x, y) to (h - y, x) inside the island's box
+    local[spin] = np.stack([sizes[loop_islands[spin], 1] - local[spin, 1], local[spin, 0]], axis=1)
+    packed = (local + positions[loop_islands] + pad / 2) / extent
+    return packed, island_count
+
+
+def uv_triangle_areas(loop_uvs, tris):
+    uv = np.asarray(loop_uvs, dtype=np.float64)[tris]
+    a = uv[:, 1] - uv[:, 0]
+    b = uv[:, 2] - uv[:, 0]
+    return 0.5 * np.abs(a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0])
+
+
+def uv_stats(loop_uvs, loop_positions, loop_starts, loop_totals, resolution, island_count=0):
+    """
+    Coverage is the share of the UV square covered by faces; texel density is texels per
+    world unit along an edge at `resolution`, averaged over the whole surface.
+    """
+    tris = fan_triangles(loop_starts, loop_totals)
+    if not len(tris):
+        return UVStats(island_count, 0.0, 0.0, 0.0, 0.0)
+
+    pos = np.asarray(loop_positions, dtype=np.float64)[tris]
+    uv_area = uv_triangle_areas(loop_uvs, tris).sum()
+    world_area = 0.5 * np.linalg.norm(np.cross(pos[:, 1] - pos[:, 0], pos[:, 2] - pos[:, 0]), axis=1).sum()
+    density = resolution * np.sqrt(uv_area / world_area) if world_area > 0 else 0.0
+    return UVStats(island_count, float(min(uv_area, 1.0)), float(uv_area), float(world_area), float(density))
+
+
+def choose_resolution(density_per_px, target_density, max_res, min_res=MIN_RESOLUTION):
+    """
+    Smallest power-of-two resolution whose texel density (density_per_px * res) reaches
+    target_density, clamped to [min_res, max_res].
+    """
+    if density_per_px <= 0 or target_density <= 0:
+        return max_res
+    needed = target_density / density_per_px
+    res = 1 << max(0, int(np.ceil(np.log2(needed) - 1e-9)))
+    return int(min(max(res, min_res), max_res))
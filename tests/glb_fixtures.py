@@ -0,0 +1,26 @@
+import io
+from PIL import Image
+
+from scripts import glb_io
+
+# Small GLB builders shared by the texture and packing tests
+
+
+def png_bytes(pixels):
+    """PNG encoding of a uint8 (height, width[, channels]) array."""
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def make_glb(path, views, **gltf):
+    """
+    Writes a GLB whose buffer views hold `views` in order (4-byte aligned, as glb_io lays them out).
+    `gltf` adds the other top-level keys (images, accessors, meshes, ...), which refer to the views by index.
+    """
+    gltf = {"asset": {"version": "2.0"}, "buffers": [{"byteLength": 0}], **gltf}
+    binary = b''
+    for data in views:
+        binary, _ = glb_io.append_view(gltf, binary, data)
+    glb_io.write_glb(path, gltf, binary)
+    return gltf
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from scripts import asset_report
+import scripts.main_pipeline as mp
+
+
+class TestAssetReport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.report_path = os.path.join(self.tmp.name, asset_report.REPORT_NAME)
+
+    def test_record_asset_merges_sections(self):
+        asset_report.record_asset(self.report_path, "a.glb", "uv", {"coverage": 0.7})
+        asset_report.record_asset(self.report_path, "a.glb", "textures", {"count": 1})
+        asset_report.record_asset(self.report_path, "b.glb", "uv", {"coverage": 0.5})
+
+        report = asset_report.load_report(self.report_path)
+        self.assertEqual(report["a.glb"], {"uv": {"coverage": 0.7}, "textures": {"count": 1}})
+        self.assertEqual(report["b.glb"]["uv"]["coverage"], 0.5)
+        self.assertFalse(os.path.exists(self.report_path + ".tmp"))
+
+    @patch('builtins.print')
+    def test_corrupt_report_starts_over(self, mock_print):
+        with open(self.report_path, 'w') as f:
+            f.write("{ not json")
+        self.assertEqual(asset_report.load_report(self.report_path), {})
+
+    @patch('builtins.print')
+    def test_record_uv_stats_moves_sidecar_into_report(self, mock_print):
+        temp_out_glb = os.path.join(self.tmp.name, "a_unoptimized.glb")
+        with open(temp_out_glb.replace('.glb', '_uv_stats.json'), 'w') as f:
+            json.dump({"coverage": 0.72, "texel_density": 1180.0}, f)
+
+        stats = mp.record_uv_stats("a.glb", temp_out_glb, self.tmp.name)
+
+        self.assertEqual(stats["coverage"], 0.72)
+        self.assertEqual(asset_report.load_report(self.report_path)["a.glb"]["uv"], stats)
+        self.assertFalse(os.path.exists(temp_out_glb.replace('.glb', '_uv_stats.json')))
+        # No sidecar (e.g. an older Blender script): nothing recorded, no error
+        self.assertIsNone(mp.record_uv_stats("b.glb", os.path.join(self.tmp.name, "b_unoptimized.glb"), self.tmp.name))
+
+    def test_read_bake_resolution(self):
+        """Staged bakes use the res chosen by the unwrap pass, falling back to the profile cap."""
+        temp_out_glb = os.path.join(self.tmp.name, "a_unoptimized.glb")
+        self.assertEqual(mp.read_bake_resolution(temp_out_glb, 1024), 1024)
+
+        with open(temp_out_glb.replace('.glb', '_uv_stats.json'), 'w') as f:
+            json.dump({"res": 512, "max_res": 1024}, f)
+        self.assertEqual(mp.read_bake_resolution(temp_out_glb, 1024), 512)
+
+    @patch('builtins.print')
+    def test_source_texture_cap_and_texture_stats(self, mock_print):
+        """A flat source texture caps the bake; the baked sidecar and source analysis land in the report."""
+        high_tex = os.path.join(self.tmp.name, "a_high_diffuse.png")
+        Image.new('RGB', (512, 512), (200, 150, 90)).save(high_tex)
+
+        self.assertEqual(mp.source_texture_cap(high_tex, 1024, 0), (1024, None))
+        bake_res, source = mp.source_texture_cap(high_tex, 1024, 0.02)
+        self.assertEqual(bake_res, 128)
+        self.assertEqual(source["size"], 512)
+
+        temp_out_glb = os.path.join(self.tmp.name, "a_unoptimized.glb")
+        with open(temp_out_glb.replace('.glb', '_texture_stats.json'), 'w') as f:
+            json.dump({"res": 128, "size": 128, "error": 0.0, "max_error": 0.02}, f)
+        with open(temp_out_glb.replace('.glb', '_channel_stats.json'), 'w') as f:
+            json.dump({"channels_in": 4, "channels_out": 3, "png_bytes_in": 9000, "png_bytes_out": 7000}, f)
+        section = mp.record_texture_stats("a.glb", temp_out_glb, self.tmp.name, source)
+
+        self.assertEqual(asset_report.load_report(self.report_path)["a.glb"]["texture"], section)
+        self.assertEqual(section["baked"]["res"], 128)
+        self.assertEqual(section["channels"]["channels_out"], 3)
+        self.assertFalse(os.path.exists(temp_out_glb.replace('.glb', '_texture_stats.json')))
+
+    @patch('builtins.print')
+    def test_quantize_textures_records_savings(self, mock_print):
+        temp_out_glb = os.path.join(self.tmp.name, "a_unoptimized.glb")
+        self.assertIsNone(mp.quantize_textures("a.glb", temp_out_glb, self.tmp.name, 0))
+
+        stats = {"images": 1, "quantized": 1, "colors": 64, "dither": False, "bytes_before": 4096, "bytes_after": 1024}
+        open(temp_out_glb, 'wb').close()
+        with patch('scripts.main_pipeline.quantize.quantize_glb', return_value=stats) as mock_quantize:
+            self.assertEqual(mp.quantize_textures("a.glb", temp_out_glb, self.tmp.name, 64), stats)
+        mock_quantize.assert_called_once_with(temp_out_glb, 64, False, 6)
+        self.assertEqual(asset_report.load_report(self.report_path)["a.glb"]["quantize"], stats)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+from PIL import Image
+
+from scripts import bake_tiles, cpu_baker
+
+
+class TestBakeTiles(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_assign_faces_to_tiles(self):
+        """Faces go to the grid cell of their UV centroid; unused trailing cells fold into the last tile."""
+        tri_uvs = np.array([
+            [[0.1, 0.1], [0.2, 0.1], [0.1, 0.2]],   # bottom-left
+            [[0.8, 0.1], [0.9, 0.1], [0.8, 0.2]],   # bottom-right
+            [[0.1, 0.8], [0.2, 0.8], [0.1, 0.9]],   # top-left
+            [[0.8, 0.8], [0.9, 0.8], [0.8, 0.9]],   # top-right (no 4th tile when K=3)
+        ])
+        np.testing.assert_array_equal(bake_tiles.assign_faces_to_tiles(tri_uvs, 4), [0, 1, 2, 3])
+        np.testing.assert_array_equal(bake_tiles.assign_faces_to_tiles(tri_uvs, 3), [0, 1, 2, 2])
+        self.assertEqual(len(bake_tiles.tile_grid(3)), 3)
+
+    def test_write_obj_round_trip(self):
+        """Subsets written with write_obj only keep referenced elements and load back identically."""
+        positions = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [5, 5, 5]], dtype=float)
+        uvs = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=float)
+        normals = np.array([[0, 0, 1]], dtype=float)
+        corners = np.array([[[0, 0, 0], [1, 1, 0], [2, 2, 0]], [[0, 0, 0], [2, 2, 0], [3, 3, 0]]])
+
+        bake_tiles.write_obj(self.path('sub.obj'), positions, uvs, normals, corners[1:])
+        p, t, n, c = cpu_baker.load_obj(self.path('sub.obj'))
+
+        self.assertEqual(len(p), 3)
+        np.testing.assert_allclose(p[c[..., 0]], positions[corners[1:, :, 0]])
+        np.testing.assert_allclose(t[c[..., 1]], uvs[corners[1:, :, 1]])
+        np.testing.assert_allclose(n[c[..., 2]], normals[corners[1:, :, 2]])
+
+    def test_high_poly_chunk(self):
+        tri_min = np.array([[0.0, 0.0, 0.0], [2.0, 2.0, 2.0]])
+        tri_max = np.array([[0.5, 0.5, 0.5], [3.0, 3.0, 3.0]])
+        tile_positions = np.array([[[0.6, 0.1, 0.1], [0.7, 0.2, 0.1], [0.6, 0.2, 0.2]]])
+
+        np.testing.assert_array_equal(bake_tiles.high_poly_chunk(tri_min, tri_max, tile_positions, 0.05), [False, False])
+        np.testing.assert_array_equal(bake_tiles.high_poly_chunk(tri_min, tri_max, tile_positions, 0.2), [True, False])
+
+    def test_stitch_tiles_keeps_first_bake_and_fills_margin(self):
+        left = np.zeros((8, 8, 4), dtype=np.uint8)
+        left[:, :3] = (255, 0, 0, 255)
+        right = np.zeros((8, 8, 4), dtype=np.uint8)
+        right[:, 5:] = (0, 0, 255, 255)
+        Image.fromarray(left).save(self.path('t0.png'))
+        Image.fromarray(right).save(self.path('t1.png'))
+
+        coverage = bake_tiles.stitch_tiles([self.path('t0.png'), self.path('t1.png')], self.path('out.png'), margin=1)
+        out = np.asarray(Image.open(self.path('out.png')))
+
+        self.assertAlmostEqual(coverage, 6 / 8)
+        np.testing.assert_array_equal(out[4, 0], (255, 0, 0, 255))
+        np.testing.assert_array_equal(out[4, 7], (0, 0, 255, 255))
+        # Column 3 borders only red, column 4 only blue: one margin pass closes the gap
+        np.testing.assert_array_equal(out[4, 3], (255, 0, 0, 255))
+        np.testing.assert_array_equal(out[4, 4], (0, 0, 255, 255))
+
+    @patch('builtins.print')
+    @patch('scripts.bake_tiles.subprocess.Popen')
+    def test_bake_tiled_launches_one_blender_per_tile(self, mock_popen, mock_print):
+        with open(self.path('low_uv.obj'), 'w') as f:
+            f.write("v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\n")
+            f.write("vt 0.1 0.1\nvt 0.4 0.1\nvt 0.1 0.4\nvt 0.9 0.9\nvt 0.6 0.9\nvt 0.9 0.6\n")
+            f.write("f 1/1 2/2 4/3\nf 2/4 3/5 4/6\n")
+
+        def fake_blender(cmd):
+            # Each tile bakes an opaque block where its faces are
+            tile_png = cmd[-3]
+            img = np.zeros((4, 4, 4), dtype=np.uint8)
+            if tile_png.endswith('_tile0.png'):
+                img[2:, :2] = (10, 20, 30, 255)
+            else:
+                img[:2, 2:] = (40, 50, 60, 255)
+            Image.fromarray(img).save(tile_png)
+            return MagicMock(wait=MagicMock(return_value=0))
+
+        mock_popen.side_effect = fake_blender
+
+        ok = bake_tiles.bake_tiled('blender', 'scripts', 'high.obj', 'tex.png', self.path('low_uv.obj'), self.path('baked.png'), 4, 4, threads=8)
+
+        self.assertTrue(ok)
+        self.assertEqual(mock_popen.call_count, 2)  # only the two non-empty tiles
+        cmd = mock_popen.call_args_list[0].args[0]
+        self.assertEqual(cmd[:4], ['blender', '--background', '-t', '4'])
+        self.assertEqual(cmd[-6], 'high.obj')
+        self.assertTrue(os.path.exists(self.path('baked.png')))
+        # Temporary tile OBJs and PNGs are removed
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['baked.png', 'low_uv.obj'])
+
+if __name__ == '__main__':
+    unittest.main()
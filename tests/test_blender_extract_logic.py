@@ -1,6 +1,10 @@
+import os
 import sys
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
+import numpy as np
+from PIL import Image
 
 # Mock bpy before importing blender_extract
 mock_bpy = MagicMock()
@@ -70,5 +74,97 @@ class TestBlenderExtractLogic(unittest.TestCase):
         # intersecting geometry flipping chunks inside out.
         mock_bpy.ops.mesh.normals_make_consistent.assert_not_called()
 
+    @patch('scripts.blender_extract.cull_hidden_faces')
+    @patch('builtins.print')
+    @patch('os.path.exists')
+    @patch('scripts.blender_extract.validate_gltf_path')
+    def test_cull_mode_argument(self, mock_validate, mock_exists, mock_print, mock_cull):
+        mock_exists.return_value = True
+        mock_validate.return_value = True
+
+        mock_obj = MagicMock()
+        mock_obj.type = 'MESH'
+        mock_obj.data.vertices = [1] * 100
+        mock_bpy.data.objects = [mock_obj]
+        mock_bpy.context.view_layer.objects.active = mock_obj
+
+        base_args = ['blender', '--background', '--python', 'blender_extract.py', '--', 'input.glb', 'output.obj', '0']
+
+        with patch.dict('sys.modules', {'bmesh': MagicMock()}):
+            # Default: no culling
+            with patch.object(sys, 'argv', base_args):
+                be.process()
+            mock_cull.assert_not_called()
+
+            with patch.object(sys, 'argv', base_args + ['underside']):
+                be.process()
+        mock_cull.assert_called_once_with(mock_obj, 'underside')
+
+    @patch('builtins.print')
+    @patch('os.path.exists')
+    @patch('scripts.blender_extract.validate_gltf_path')
+    def test_texture_budget_argument(self, mock_validate, mock_exists, mock_print):
+        """A texture budget scales the high-poly's textures down before the diffuse is extracted."""
+        mock_exists.return_value = True
+        mock_validate.return_value = True
+
+        mock_obj = MagicMock()
+        mock_obj.type = 'MESH'
+        mock_obj.data.vertices = [1] * 100
+        mock_bpy.data.objects = [mock_obj]
+        mock_bpy.context.view_layer.objects.active = mock_obj
+
+        args = ['blender', '--background', '--python', 'blender_extract.py', '--', 'input.glb', 'output.obj', '0', 'none', '2048']
+
+        with patch.dict('sys.modules', {'bmesh': MagicMock()}):
+            import blender_worker
+            with patch.object(blender_worker, 'resize_textures') as mock_resize, \
+                    patch.object(be, 'export_base_color') as mock_export, patch.object(sys, 'argv', args):
+                mock_resize.side_effect = lambda *a: self.assertFalse(mock_export.called)
+                be.process()
+        mock_resize.assert_called_once_with(2048, [mock_obj])
+        mock_export.assert_called_once()
+
+    @patch('builtins.print')
+    def test_materials_packed_into_one_atlas(self, mock_print):
+        """A textured and a flat-colour material share one diffuse; each face's UVs move into its slot."""
+        def principled(image=None, color=None):
+            base = MagicMock(is_linked=image is not None, default_value=color)
+            base.links[0].from_node.type = 'TEX_IMAGE'
+            base.links[0].from_node.image = image
+            bsdf = MagicMock(type='BSDF_PRINCIPLED')
+            bsdf.inputs.get.return_value = base
+            mat = MagicMock(use_nodes=True)
+            mat.node_tree.nodes = [bsdf]
+            return mat
+
+        img = MagicMock(size=(4, 2), channels=4)
+        img.pixels.foreach_get.side_effect = lambda out: out.__setitem__(slice(None), 1.0)
+
+        mesh = MagicMock()
+        mesh.materials = [principled(image=img), principled(color=(0.0, 0.0, 0.0, 1.0))]
+        mesh.loops = [None] * 7
+        mesh.polygons.__len__.return_value = 2
+        poly_data = {'material_index': [0, 1], 'loop_total': [4, 3]}
+        mesh.polygons.foreach_get.side_effect = lambda key, out: out.__setitem__(slice(None), poly_data[key])
+        uvs = [0, 0, 1, 0, 1, 1, 0, 1, 0.2, 0.2, 0.8, 0.2, 0.5, 0.8]
+        mesh.uv_layers.active.data.foreach_get.side_effect = lambda key, out: out.__setitem__(slice(None), uvs)
+        high_obj = MagicMock(data=mesh)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_tex = os.path.join(tmp, "a_high_diffuse.png")
+            self.assertTrue(be.export_base_color(high_obj, output_tex))
+            with Image.open(output_tex) as atlas_img:
+                atlas = np.asarray(atlas_img.convert('RGBA'))[::-1]
+
+        atlas_uvs = mesh.uv_layers.active.data.foreach_set.call_args[0][1].reshape(-1, 2)
+        height, width = atlas.shape[:2]
+        texels = np.floor(atlas_uvs * [width, height]).astype(int)
+        # Quad corners land on the white image, every triangle loop on the black swatch's centre
+        corner = np.minimum(texels[0], [width - 1, height - 1])
+        self.assertTrue((atlas[corner[1], corner[0], :3] == 255).all())
+        self.assertEqual(len({tuple(t) for t in texels[4:]}), 1)
+        self.assertTrue((atlas[texels[4, 1], texels[4, 0], :3] == 0).all())
+
 if __name__ == '__main__':
     unittest.main()
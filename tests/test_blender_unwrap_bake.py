@@ -1,6 +1,9 @@
+import os
 import sys
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
+import numpy as np
 
 # Mock bpy before importing blender_unwrap_bake
 mock_bpy = MagicMock()
@@ -13,10 +16,11 @@ class TestBlenderUnwrapBake(unittest.TestCase):
         mock_bpy.reset_mock()
         mock_bpy.data.objects = []
 
+    @patch('scripts.blender_unwrap_bake.save_image_png')
     @patch('sys.exit')
     @patch('builtins.print')
     @patch('os.path.exists')
-    def test_normals_make_consistent_called(self, mock_exists, mock_print, mock_exit):
+    def test_normals_make_consistent_called(self, mock_exists, mock_print, mock_exit, mock_save_png):
         mock_exists.return_value = True
 
         # Setup mock objects
@@ -66,6 +70,93 @@ class TestBlenderUnwrapBake(unittest.TestCase):
 
         mock_bpy.ops.mesh.normals_make_consistent.assert_called_with(inside=False)
         mock_bpy.ops.mesh.customdata_custom_splitnormals_clear.assert_called()
+        # The Cycles result is written with the threaded PNG encoder at the default level
+        mock_save_png.assert_called_once_with(mock_bpy.data.images.new.return_value, 'out_baked.png', be.DEFAULT_PNG_LEVEL)
+
+    @patch('sys.exit')
+    @patch('builtins.print')
+    @patch('os.path.exists')
+    def test_prepare_stage_exports_without_baking(self, mock_exists, mock_print, mock_exit):
+        """'prepare' unwraps, exports the UV'd low-poly and saves the scene for the external baker."""
+        mock_exists.return_value = True
+
+        mock_high_obj = MagicMock(type='MESH')
+        mock_low_obj = MagicMock(type='MESH')
+
+        class ObjectList(list):
+            def remove(self, obj, do_unlink=False):
+                super().remove(obj)
+
+        mock_bpy.data.objects = ObjectList()
+
+        def mock_obj_import(filepath, **kwargs):
+            mock_bpy.data.objects.append(mock_high_obj if "high" in filepath else mock_low_obj)
+
+        mock_bpy.ops.wm.obj_import = MagicMock(side_effect=mock_obj_import)
+        mock_bpy.context.view_layer.objects.active = mock_low_obj
+
+        test_args = ['blender', '--background', '--python', 'blender_unwrap_bake.py', '--',
+                     'high.obj', 'low.obj', 'tex.png', 'out.glb', '1024', '20000', '1', 'prepare']
+
+        with patch.object(sys, 'argv', test_args):
+            with patch.dict('sys.modules', {'bmesh': MagicMock()}):
+                be.process()
+
+        mock_bpy.ops.wm.obj_export.assert_called_once()
+        self.assertEqual(mock_bpy.ops.wm.obj_export.call_args.kwargs['filepath'], 'out_low_uv.obj')
+        self.assertTrue(mock_bpy.ops.wm.obj_export.call_args.kwargs['export_uv'])
+        self.assertEqual(mock_bpy.data.objects, [mock_low_obj])
+        mock_bpy.ops.wm.save_as_mainfile.assert_called_once_with(filepath='out_prepared.blend')
+        mock_bpy.ops.object.bake.assert_not_called()
+        mock_bpy.ops.export_scene.gltf.assert_not_called()
+
+    @patch('sys.exit')
+    @patch('builtins.print')
+    @patch('os.path.exists')
+    def test_finish_stage_applies_external_texture(self, mock_exists, mock_print, mock_exit):
+        """'finish' reopens the prepared scene and exports with the externally baked PNG."""
+        mock_exists.return_value = True
+
+        mock_low_obj = MagicMock(type='MESH')
+        mock_low_obj.data.vertices = []
+        mock_low_obj.bound_box = [[0.0, 0.0, 0.0]] * 8
+        mock_bpy.data.objects = MagicMock()
+        mock_bpy.data.objects.get.return_value = mock_low_obj
+
+        test_args = ['blender', '--background', '--python', 'blender_unwrap_bake.py', '--',
+                     'high.obj', 'low.obj', 'tex.png', 'out.glb', '1024', '20000', '3', 'finish']
+
+        with patch.object(sys, 'argv', test_args):
+            be.process()
+
+        mock_bpy.ops.wm.open_mainfile.assert_called_once_with(filepath='out_prepared.blend')
+        mock_bpy.ops.wm.obj_import.assert_not_called()
+        mock_bpy.ops.object.bake.assert_not_called()
+        mock_bpy.data.images.load.assert_called_once_with('out_baked.png')
+        mock_bpy.ops.export_scene.gltf.assert_called_once()
+
+    def baked_image(self, alpha):
+        image = MagicMock(size=(4, 2), channels=4)
+        pixels = np.zeros((2, 4, 4), dtype=np.float32)
+        pixels[..., 0] = np.linspace(0, 1, 4)
+        pixels[..., 3] = alpha
+        image.pixels.foreach_get.side_effect = lambda out: out.__setitem__(slice(None), pixels.ravel())
+        mock_bpy.data.images.load.return_value = image
+
+    @patch('builtins.print')
+    def test_reduce_baked_channels_keeps_translucent_alpha(self, mock_print):
+        """Alpha survives only when the bake has pixels that are not fully opaque."""
+        with tempfile.TemporaryDirectory() as tmp:
+            png, stats = os.path.join(tmp, "baked.png"), os.path.join(tmp, "stats.json")
+            with open(png, 'wb') as f:
+                f.write(b'\0' * 4096)
+
+            self.baked_image(np.array([[1.0, 1.0, 0.5, 0.0]] * 2))
+            self.assertTrue(be.reduce_baked_channels(png, stats).alpha)
+            self.baked_image(1.0)
+            report = be.reduce_baked_channels(png, stats)
+            self.assertFalse(report.alpha)
+            self.assertEqual(report.channels_out, 3)
 
 if __name__ == '__main__':
     unittest.main()
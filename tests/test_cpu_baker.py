@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+
+from scripts import cpu_baker
+
+
+def write_plane(path, n, z, uv_min=0.0, uv_max=1.0):
+    """Writes an n x n quad grid over the unit square at height z, with UVs spanning [uv_min, uv_max]."""
+    coords = np.linspace(0, 1, n + 1)
+    uv_coords = np.linspace(uv_min, uv_max, n + 1)
+    with open(path, 'w') as f:
+        for y in coords:
+            for x in coords:
+                f.write(f"v {x} {y} {z}\n")
+        for v in uv_coords:
+            for u in uv_coords:
+                f.write(f"vt {u} {v}\n")
+        f.write("vn 0 0 1\n")
+        for j in range(n):
+            for i in range(n):
+                a = j * (n + 1) + i + 1
+                f.write(f"f {a}/{a}/1 {a + 1}/{a + 1}/1 {a + n + 2}/{a + n + 2}/1 {a + n + 1}/{a + n + 1}/1\n")
+
+
+class TestCpuBaker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_load_obj_triangulates_and_resolves_indices(self):
+        """Quads are fan-triangulated, negative indices resolve from the end, missing components are -1."""
+        with open(self.path('quad.obj'), 'w') as f:
+            f.write("v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nvn 0 0 1\n")
+            f.write("f 1//1 2//1 3//1 4//1\nf -4 -3 -2\n")
+
+        positions, uvs, normals, corners = cpu_baker.load_obj(self.path('quad.obj'))
+
+        self.assertEqual(positions.shape, (4, 3))
+        self.assertEqual(len(uvs), 0)
+        self.assertEqual(corners.shape, (3, 3, 3))
+        np.testing.assert_array_equal(corners[:, :, 0], [[0, 1, 2], [0, 2, 3], [0, 1, 2]])
+        self.assertTrue((corners[..., 1] == -1).all())
+        np.testing.assert_array_equal(corners[:, :, 2], [[0, 0, 0], [0, 0, 0], [-1, -1, -1]])
+
+    def test_rasterize_covers_each_texel_once(self):
+        """Two triangles sharing a diagonal cover the full UV square with no duplicates."""
+        tri_uvs = np.array([[[0, 0], [1, 0], [1, 1]], [[0, 0], [1, 1], [0, 1]]], dtype=float)
+        pixels, tris, barys = cpu_baker.rasterize_uv_triangles(tri_uvs, 16)
+
+        np.testing.assert_array_equal(pixels, np.arange(256))
+        np.testing.assert_allclose(barys.sum(axis=1), 1.0)
+        self.assertTrue((barys >= -1e-9).all())
+
+        tile_pixels, _, _ = cpu_baker.rasterize_uv_triangles(tri_uvs, 16, (4, 8, 8, 16))
+        self.assertEqual(len(tile_pixels), 32)
+        self.assertTrue(((tile_pixels % 16 >= 4) & (tile_pixels % 16 < 8) & (tile_pixels // 16 >= 8)).all())
+
+    def test_dilate_extends_edges(self):
+        image = np.zeros((5, 5, 3), dtype=np.float32)
+        mask = np.zeros((5, 5), dtype=bool)
+        image[2, 2] = (1.0, 0.5, 0.0)
+        mask[2, 2] = True
+
+        out, out_mask = cpu_baker.dilate(image, mask, 1)
+        self.assertTrue(out_mask[1:4, 1:4].all())
+        self.assertFalse(out_mask[0].any())
+        np.testing.assert_allclose(out[1, 1], (1.0, 0.5, 0.0))
+
+    def test_bake_transfers_texture_through_cage(self):
+        """A textured high-poly hovering just above the low-poly bakes onto the low-poly's own UV layout."""
+        write_plane(self.path('high.obj'), 8, 0.002)
+        write_plane(self.path('low.obj'), 1, 0.0, 0.25, 0.75)
+
+        texture = np.zeros((32, 32, 3), dtype=np.uint8)
+        texture[:, :16] = (255, 0, 0)
+        texture[:, 16:] = (0, 0, 255)
+        Image.fromarray(texture).save(self.path('high.png'))
+
+        ok = cpu_baker.bake_texture(
+            self.path('high.obj'), self.path('high.png'), self.path('low.obj'), self.path('baked.png'),
+            resolution=32, margin=2, tile_size=8, workers=1
+        )
+        self.assertTrue(ok)
+
+        baked = np.asarray(Image.open(self.path('baked.png')))
+        self.assertEqual(baked.shape, (32, 32, 4))
+        np.testing.assert_array_equal(baked[16, 11], (255, 0, 0, 255))
+        np.testing.assert_array_equal(baked[16, 20], (0, 0, 255, 255))
+        # Margin pixels are filled, everything further out stays opaque black
+        np.testing.assert_array_equal(baked[16, 7], (255, 0, 0, 255))
+        np.testing.assert_array_equal(baked[0, 0], (0, 0, 0, 255))
+
+    def test_bake_missing_uvs_fails(self):
+        write_plane(self.path('high.obj'), 2, 0.001)
+        with open(self.path('low.obj'), 'w') as f:
+            f.write("v 0 0 0\nv 1 0 0\nv 1 1 0\nf 1 2 3\n")
+
+        self.assertFalse(cpu_baker.bake_texture(self.path('high.obj'), None, self.path('low.obj'), self.path('out.png'), 16))
+
+if __name__ == '__main__':
+    unittest.main()
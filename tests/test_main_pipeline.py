@@ -463,6 +463,95 @@ class TestPipelineInitialization(unittest.TestCase):
         cfg = mp.initialize_pipeline()
         self.assertIsNone(cfg)
 
+    @patch('scripts.cpu_baker.bake_texture')
+    @patch('scripts.main_pipeline.subprocess.run')
+    @patch('builtins.print')
+    def test_unwrap_and_bake_cpu_backend(self, mock_print, mock_run, mock_bake):
+        """The cpu backend runs Blender's prepare and finish stages around the host-side bake."""
+        mock_bake.return_value = True
+
+        result = mp.unwrap_and_bake(
+            'blender', 'scripts', 'a.glb', 'a_high.obj', 'a_low_raw.obj', 'a_high_diffuse.png',
+            'a', 'a_unoptimized.glb', 512, 5000, 'token_production', 'cpu'
+        )
+
+        self.assertTrue(result)
+        stages = [call.args[0][call.args[0].index('--') + 8] for call in mock_run.call_args_list]
+        self.assertEqual(stages, ['prepare', 'finish'])
+        mock_bake.assert_called_once_with('a_high.obj', 'a_high_diffuse.png', 'a_unoptimized_low_uv.obj', 'a_unoptimized_baked.png', 512, png_level=6)
+
+    @patch('scripts.cpu_baker.bake_texture')
+    @patch('scripts.main_pipeline.subprocess.run')
+    @patch('builtins.print')
+    def test_unwrap_and_bake_cpu_backend_bake_failure(self, mock_print, mock_run, mock_bake):
+        mock_bake.return_value = False
+
+        result = mp.unwrap_and_bake(
+            'blender', 'scripts', 'a.glb', 'a_high.obj', 'a_low_raw.obj', 'a_high_diffuse.png',
+            'a', 'a_unoptimized.glb', 512, 5000, 'token_production', 'cpu'
+        )
+
+        self.assertFalse(result)
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch('scripts.bake_tiles.bake_tiled')
+    @patch('scripts.main_pipeline.subprocess.run')
+    @patch('builtins.print')
+    def test_unwrap_and_bake_split_cycles_bake(self, mock_print, mock_run, mock_bake_tiled):
+        """bake_tiles > 1 splits the Cycles bake into tile processes between prepare and finish."""
+        mock_bake_tiled.return_value = True
+
+        result = mp.unwrap_and_bake(
+            'blender', 'scripts', 'a.glb', 'a_high.obj', 'a_low_raw.obj', 'a_high_diffuse.png',
+            'a', 'a_unoptimized.glb', 2048, 20000, 'token_production', 'cycles', 4, True
+        )
+
+        self.assertTrue(result)
+        self.assertEqual([call.args[0][call.args[0].index('--') + 8] for call in mock_run.call_args_list], ['prepare', 'finish'])
+        mock_bake_tiled.assert_called_once_with(
+            'blender', 'scripts', 'a_high.obj', 'a_high_diffuse.png', 'a_unoptimized_low_uv.obj',
+            'a_unoptimized_baked.png', 2048, 4, True, png_level=6
+        )
+
+    @patch('scripts.main_pipeline.process_file')
+    def test_consume_models_until_sentinel(self, mock_process):
+        """Queued model paths are processed from their own folder; a failing model doesn't stop the worker."""
+        import queue
+        pipeline = mp.PipelineConfig(
+            args=None, app_paths=MagicMock(), config={}, blender_exe='blender', meshopt_exe='gltfpack',
+            source_dir='/src', output_dir='/out', temp_dir='/tmp_dir', instant_meshes_exe='im', xnormal_exe='xn',
+            archive_dir='/archive'
+        )
+        models = queue.Queue()
+        for item in ('/exports/a.glb', '/exports/b.glb', None):
+            models.put(item)
+        mock_process.side_effect = [RuntimeError("boom"), None]
+
+        with patch('builtins.print'):
+            processed = mp.consume_models(models, pipeline, 'token_production', {}, 20000, 1024)
+
+        self.assertEqual(processed, 1)
+        self.assertEqual([c.args[:2] for c in mock_process.call_args_list], [('a.glb', '/exports'), ('b.glb', '/exports')])
+        self.assertEqual(mock_process.call_args.args[7], 'gltfpack')
+
+    def test_run_meshy_mode_in_process(self):
+        """--mode meshy hands the loaded config and bound pipeline workers to the feeder instead of a subprocess."""
+        feeder = MagicMock()
+        pipeline = mp.PipelineConfig(None, MagicMock(), {'meshy_api_key': 'k'}, '', '', '', '', '', '', '', '')
+        # `from scripts import meshy_feeder` reads the package attribute once another test imported it
+        import scripts
+        with patch.dict(sys.modules, {'scripts.meshy_feeder': feeder}), \
+                patch.object(scripts, 'meshy_feeder', feeder, create=True), \
+                patch('scripts.main_pipeline.subprocess.run') as mock_run:
+            mp.run_meshy_mode(pipeline, 'token_production', {'target_v': 1}, 20000, 1024)
+
+        feeder.configure.assert_called_once_with({'meshy_api_key': 'k'})
+        workers = feeder.run_meshy.call_args.args[0]
+        self.assertIs(workers.func, mp.consume_models)
+        self.assertEqual(workers.keywords['profile_key'], 'token_production')
+        self.assertIs(workers.keywords['pipeline'], pipeline)
+        mock_run.assert_not_called()
+
     def test_resolve_path(self):
         """Test the resolve_path utility function."""
         root = "/base/dir" if os.name != 'nt' else "C:\\base\\dir"
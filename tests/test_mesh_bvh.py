@@ -0,0 +1,86 @@
+import unittest
+import numpy as np
+
+from scripts import mesh_bvh
+
+
+def make_grid(n, z=0.0):
+    """Returns a flat n x n quad grid (2 triangles per cell) in the unit square at height z."""
+    xs, ys = np.meshgrid(np.linspace(0, 1, n + 1), np.linspace(0, 1, n + 1))
+    verts = np.stack([xs.ravel(), ys.ravel(), np.full(xs.size, z)], axis=1)
+    tris = []
+    for j in range(n):
+        for i in range(n):
+            a = j * (n + 1) + i
+            tris.append((a, a + 1, a + n + 2))
+            tris.append((a, a + n + 2, a + n + 1))
+    return verts, np.array(tris)
+
+
+class TestMeshBVH(unittest.TestCase):
+
+    def test_closest_hit_matches_brute_force(self):
+        """Nearest hits from the BVH match testing every triangle individually."""
+        rng = np.random.default_rng(7)
+        verts = rng.uniform(-1, 1, size=(300, 3))
+        tris = rng.integers(0, 300, size=(100, 3))
+        bvh = mesh_bvh.build_bvh(verts, tris, leaf_size=4)
+
+        origins = rng.uniform(-2, 2, size=(500, 3))
+        dirs = rng.normal(size=(500, 3))
+        dirs /= np.linalg.norm(dirs, axis=1)[:, None]
+        hits = mesh_bvh.intersect_rays(bvh, origins, dirs, workers=1)
+
+        corners = verts[tris].astype(np.float32)
+        ok, t, _, _ = mesh_bvh._intersect_triangles(
+            np.repeat(origins, len(tris), axis=0).astype(np.float32),
+            np.repeat(dirs, len(tris), axis=0).astype(np.float32),
+            np.tile(corners[:, 0], (500, 1)),
+            np.tile(corners[:, 1] - corners[:, 0], (500, 1)),
+            np.tile(corners[:, 2] - corners[:, 0], (500, 1)),
+        )
+        t = np.where(ok & (t >= 1e-6), t, np.inf).reshape(500, -1)
+        expected_t = t.min(axis=1)
+
+        np.testing.assert_array_equal(hits.hit, np.isfinite(expected_t))
+        np.testing.assert_allclose(hits.t[hits.hit], expected_t[hits.hit], rtol=1e-4)
+
+    def test_barycentrics_and_triangle_index(self):
+        """A ray straight down onto a grid reports the triangle under it and valid barycentrics."""
+        verts, tris = make_grid(8)
+        bvh = mesh_bvh.build_bvh(verts, tris)
+
+        hits = mesh_bvh.intersect_rays(bvh, [[0.3, 0.7, 1.0]], [[0, 0, -1]])
+        self.assertTrue(hits.hit[0])
+        self.assertAlmostEqual(hits.t[0], 1.0, places=5)
+
+        tri = tris[hits.tri[0]]
+        u, v = hits.u[0], hits.v[0]
+        point = verts[tri[0]] * (1 - u - v) + verts[tri[1]] * u + verts[tri[2]] * v
+        np.testing.assert_allclose(point, [0.3, 0.7, 0.0], atol=1e-5)
+
+    def test_occluded_respects_t_max_and_skip(self):
+        """Occlusion queries stop at t_max and ignore the per-ray skipped triangle."""
+        lower_v, lower_t = make_grid(2, z=0.0)
+        upper_v, upper_t = make_grid(2, z=1.0)
+        verts = np.vstack([lower_v, upper_v])
+        tris = np.vstack([lower_t, upper_t + len(lower_v)])
+        bvh = mesh_bvh.build_bvh(verts, tris)
+
+        origins = [[0.5, 0.5, 0.5]] * 2
+        dirs = [[0, 0, 1]] * 2
+        self.assertTrue(mesh_bvh.occluded(bvh, origins, dirs).all())
+        self.assertFalse(mesh_bvh.occluded(bvh, origins, dirs, t_max=0.25).any())
+
+        above = mesh_bvh.intersect_rays(bvh, [[0.25, 0.6, 2.0]], [[0, 0, -1]])
+        skipped = mesh_bvh.intersect_rays(bvh, [[0.25, 0.6, 2.0]], [[0, 0, -1]], skip_tri=[above.tri[0]])
+        self.assertAlmostEqual(skipped.t[0], 2.0, places=5)
+
+    def test_empty_mesh(self):
+        """A BVH without triangles never reports hits."""
+        bvh = mesh_bvh.build_bvh(np.zeros((0, 3)), np.zeros((0, 3), dtype=int))
+        hits = mesh_bvh.intersect_rays(bvh, [[0, 0, 0]], [[0, 0, 1]])
+        self.assertFalse(hits.hit[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, ANY
+import json
 import sys
 import os
 
@@ -52,49 +53,53 @@ finally:
 
 class TestMeshyFeeder(unittest.TestCase):
     def setUp(self):
-        # Because we deleted 'requests' from sys.modules after import,
-        # feeder.requests still points to mock_requests.
-        # We can just reset its mock calls for each test.
+        # feeder is cached across test files, so its requests may be another file's mock
+        patcher = patch.object(feeder, 'requests', mock_requests)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         mock_requests.reset_mock()
+        feeder._session = None
+        self.addCleanup(setattr, feeder, '_session', None)
 
     def test_create_meshy_task_success(self):
         """Test the successful creation of a Meshy task."""
         mock_response = MagicMock()
         mock_response.status_code = 202
         mock_response.json.return_value = {'result': 'test_task_123'}
-        mock_requests.post.return_value = mock_response
+        mock_requests.Session.return_value.post.return_value = mock_response
 
-        data_uri = "data:image/png;base64,fake_data"
-        result = feeder.create_meshy_task(data_uri)
+        portrait = feeder.Portrait(b"fake_data", 'image/png', (1, 1), (1, 1), 9)
+        result = feeder.create_meshy_task(portrait)
 
         # Assertions
         self.assertEqual(result, 'test_task_123')
-        mock_requests.post.assert_called_once_with(
+        mock_requests.Session.return_value.post.assert_called_once_with(
             "https://api.meshy.ai/v1/image-to-3d",
-            headers={"Authorization": f"Bearer {feeder.MESHY_API_KEY}"},
-            json={
-                "image_url": data_uri,
-                "enable_pbr": True,
-                "target_polycount": feeder.TARGET_POLYCOUNT,
-                "texture_res": feeder.TEXTURE_RES,
-                "topology": "quad"
-            },
+            headers={"Authorization": f"Bearer {feeder.MESHY_API_KEY}", "Content-Type": "application/json"},
+            data=ANY,
             timeout=feeder.API_TIMEOUT
         )
+        body = mock_requests.Session.return_value.post.call_args.kwargs['data']
+        self.assertEqual(json.loads(body.read()), {
+            "image_url": "data:image/png;base64,ZmFrZV9kYXRh",
+            "enable_pbr": True,
+            "target_polycount": feeder.TARGET_POLYCOUNT,
+            "texture_res": feeder.TEXTURE_RES,
+            "topology": "quad"
+        })
 
     def test_create_meshy_task_failure(self):
         """Test failure handling when creating a Meshy task."""
         mock_response = MagicMock()
         mock_response.status_code = 400
         mock_response.text = "Bad Request"
-        mock_requests.post.return_value = mock_response
+        mock_requests.Session.return_value.post.return_value = mock_response
 
-        data_uri = "data:image/png;base64,fake_data"
-        result = feeder.create_meshy_task(data_uri)
+        result = feeder.create_meshy_task(feeder.Portrait(b"fake_data", 'image/png', (1, 1), (1, 1), 9))
 
         # Assertions
         self.assertIsNone(result)
-        mock_requests.post.assert_called_once()
+        mock_requests.Session.return_value.post.assert_called_once()
 
 if __name__ == '__main__':
     unittest.main()
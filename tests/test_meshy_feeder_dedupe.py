@@ -0,0 +1,129 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+from PIL import Image
+
+# Only requests (not needed here) and the pipeline's config loading are mocked; numpy and Pillow
+# stay real so the perceptual hashes are genuine
+mock_pipeline = MagicMock()
+mock_pipeline.get_app_paths.return_value = MagicMock(base='/fake/base', scripts='/fake/scripts')
+mock_pipeline.resolve_path.return_value = '/fake/export'
+
+_saved_modules = {}
+_modules_to_mock = {'requests': MagicMock(), 'scripts.main_pipeline': mock_pipeline}
+for mod_name, mock_mod in _modules_to_mock.items():
+    if mod_name in sys.modules:
+        _saved_modules[mod_name] = sys.modules[mod_name]
+    sys.modules[mod_name] = mock_mod
+
+try:
+    import scripts.meshy_feeder as feeder
+finally:
+    for mod_name in _modules_to_mock:
+        if mod_name in _saved_modules:
+            sys.modules[mod_name] = _saved_modules[mod_name]
+        else:
+            del sys.modules[mod_name]
+
+from scripts import task_journal, texture_dedupe
+
+
+def portrait(seed, size=300):
+    y, x = np.mgrid[0:size, 0:size] / size
+    rng = np.random.default_rng(seed)
+    fx, fy = rng.uniform(2, 6, 2)
+    rgb = np.stack([np.sin(x * fx * 3) * 0.5 + 0.5, np.cos(y * fy * 3) * 0.5 + 0.5, x * y], axis=-1)
+    return Image.fromarray((rgb * 255).astype(np.uint8))
+
+
+class TestMeshyFeederDedupe(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal = os.path.join(self.temp_dir, task_journal.JOURNAL_NAME)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_resaved_and_identical_portraits_not_submitted(self):
+        hero = os.path.join(self.temp_dir, "hero.png")
+        portrait(1).save(hero)
+        output = os.path.join(self.temp_dir, "hero.glb")
+        open(output, 'wb').close()
+        task_journal.record_task(
+            self.journal, task_journal.hash_image(hero), filename="hero.png", task_id="t1",
+            status=task_journal.SUCCEEDED, output=output,
+            fingerprint=texture_dedupe.fingerprint_to_json(feeder.portrait_fingerprint(hero))
+        )
+        os.remove(hero)
+
+        portrait(1).resize((200, 200)).save(os.path.join(self.temp_dir, "hero_copy.jpg"), quality=85)
+        portrait(2).save(os.path.join(self.temp_dir, "orc.png"))
+        shutil.copy(os.path.join(self.temp_dir, "orc.png"), os.path.join(self.temp_dir, "orc_again.png"))
+
+        with patch.object(feeder, 'INPUT_FOLDER', self.temp_dir), patch('builtins.print'):
+            _, to_submit = feeder.resume_journal(["hero_copy.jpg", "orc.png", "orc_again.png"], self.journal)
+
+        self.assertEqual([item[0] for item in to_submit], ["orc.png"])
+        self.assertIn('fingerprint', to_submit[0][2])
+        copy = next(r for r in task_journal.load_journal(self.journal).values() if r['filename'] == "hero_copy.jpg")
+        self.assertEqual((copy['status'], copy['output'], copy['duplicate_of']), (task_journal.SUCCEEDED, output, "hero.png"))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "hero_copy.jpg")))
+
+    def test_redropped_portrait_with_missing_model_regenerates(self):
+        """A portrait whose journaled model is gone is submitted again rather than matched against itself."""
+        hero = os.path.join(self.temp_dir, "hero.png")
+        portrait(1).save(hero)
+        task_journal.record_task(
+            self.journal, task_journal.hash_image(hero), filename="hero.png", task_id="t1",
+            status=task_journal.SUCCEEDED, output=os.path.join(self.temp_dir, "hero.glb"),
+            fingerprint=texture_dedupe.fingerprint_to_json(feeder.portrait_fingerprint(hero))
+        )
+        portrait(1).resize((200, 200)).save(os.path.join(self.temp_dir, "hero_copy.jpg"), quality=85)
+
+        with patch.object(feeder, 'INPUT_FOLDER', self.temp_dir), patch.object(feeder, 'ARCHIVE_DIR', self.temp_dir), \
+                patch('builtins.print') as mock_print:
+            _, to_submit = feeder.resume_journal(["hero.png", "hero_copy.jpg"], self.journal)
+
+        self.assertEqual([item[0] for item in to_submit], ["hero.png"])
+        mock_print.assert_any_call(f"🔁 Regenerating hero.png: its model {os.path.join(self.temp_dir, 'hero.glb')} no longer exists")
+        mock_print.assert_any_call("⏭️ Skipped hero_copy.jpg: duplicate of hero.png, which is still generating")
+
+    def test_archived_model_counts_as_generated(self):
+        """A model the pipeline moved to the archive still marks its portrait as generated."""
+        hero = os.path.join(self.temp_dir, "hero.png")
+        portrait(1).save(hero)
+        archive_dir = os.path.join(self.temp_dir, "archive")
+        os.makedirs(archive_dir)
+        open(os.path.join(archive_dir, "hero.glb"), 'wb').close()
+        task_journal.record_task(
+            self.journal, task_journal.hash_image(hero), filename="hero.png", task_id="t1",
+            status=task_journal.SUCCEEDED, output=os.path.join(self.temp_dir, "exports", "hero.glb")
+        )
+
+        with patch.object(feeder, 'INPUT_FOLDER', self.temp_dir), patch.object(feeder, 'ARCHIVE_DIR', archive_dir), \
+                patch('builtins.print') as mock_print:
+            _, to_submit = feeder.resume_journal(["hero.png"], self.journal)
+
+        self.assertEqual(to_submit, [])
+        mock_print.assert_any_call(f"⏭️ Skipped hero.png: already generated as {os.path.join(archive_dir, 'hero.glb')}")
+
+    def test_near_duplicate_flagged(self):
+        base = texture_dedupe.Fingerprint((512, 512), 0b1111, np.zeros((4, 4, 3), dtype=np.int16))
+        near = base._replace(dhash=0b1111 ^ 0b11110000)
+        known = [({'filename': "hero.png", 'status': task_journal.SUCCEEDED}, base)]
+
+        with patch('builtins.print'):
+            self.assertTrue(feeder.check_duplicate("hero_edit.png", "h2", near, known, self.journal))
+            with patch.object(feeder, 'SUBMIT_NEAR_DUPLICATES', True):
+                self.assertFalse(feeder.check_duplicate("hero_edit.png", "h2", near, known, self.journal))
+
+        record = task_journal.load_journal(self.journal)["h2"]
+        self.assertEqual((record['status'], record['similar_to']), (task_journal.FLAGGED, "hero.png"))
+
+
+if __name__ == '__main__':
+    unittest.main()
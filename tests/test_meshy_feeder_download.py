@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+# Only requests (not installed here) and the pipeline's config loading are mocked, inside a
+# save/restore block so the real numpy/Pillow modules stay in place for the rest of the suite
+mock_pipeline = MagicMock()
+mock_pipeline.get_app_paths.return_value = MagicMock(base='/fake/base', scripts='/fake/scripts')
+mock_pipeline.load_config.return_value = {'meshy_api_key': 'fake_key'}
+mock_pipeline.resolve_path.return_value = '/fake/export'
+
+_saved_modules = {}
+_modules_to_mock = {'requests': MagicMock(), 'scripts.main_pipeline': mock_pipeline}
+for mod_name, mock_mod in _modules_to_mock.items():
+    if mod_name in sys.modules:
+        _saved_modules[mod_name] = sys.modules[mod_name]
+    sys.modules[mod_name] = mock_mod
+
+try:
+    import scripts.meshy_feeder as feeder
+finally:
+    for mod_name in _modules_to_mock:
+        if mod_name in _saved_modules:
+            sys.modules[mod_name] = _saved_modules[mod_name]
+        else:
+            del sys.modules[mod_name]
+
+
+def make_glb(payload_size=4096):
+    json_chunk = json.dumps({"asset": {"version": "2.0"}}).encode('utf-8')
+    json_chunk += b' ' * (-len(json_chunk) % 4)
+    bin_chunk = bytes(range(256)) * (payload_size // 256)
+    body = struct.pack('<II', len(json_chunk), 0x4E4F534A) + json_chunk + struct.pack('<II', len(bin_chunk), 0x004E4942) + bin_chunk
+    return b'glTF' + struct.pack('<II', 2, 12 + len(body)) + body
+
+
+def streamed(data, status_code=200, fail_after=None):
+    """A streaming response yielding data in 1 KiB chunks, dropping the connection after fail_after bytes."""
+    def chunks(size):
+        for start in range(0, len(data), 1024):
+            if fail_after is not None and start >= fail_after:
+                raise ConnectionResetError("connection reset by peer")
+            yield data[start:start + 1024]
+
+    response = MagicMock()
+    response.status_code = status_code
+    response.iter_content.side_effect = chunks
+    return response
+
+
+class TestMeshyFeederDownload(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.temp_dir, "hero.glb")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @patch('scripts.meshy_feeder.get_session')
+    def test_dropped_download_resumes_with_range(self, mock_session):
+        glb = make_glb()
+        mock_get = mock_session.return_value.get
+        mock_get.side_effect = [streamed(glb, fail_after=2048), streamed(glb[2048:], status_code=206)]
+
+        with patch('builtins.print'):
+            feeder.fetch_model("https://assets.meshy.ai/hero.glb", self.output)
+
+        with open(self.output, 'rb') as f:
+            self.assertEqual(f.read(), glb)
+        self.assertEqual(mock_get.call_args_list[1].kwargs['headers'], {"Range": "bytes=2048-"})
+        self.assertTrue(mock_get.call_args_list[1].kwargs['stream'])
+        self.assertFalse(os.path.exists(self.output + ".part"))
+
+    @patch('scripts.meshy_feeder.get_session')
+    def test_truncated_download_never_reaches_export_dir(self, mock_session):
+        glb = make_glb()
+        mock_session.return_value.get.return_value = streamed(glb[:3000])
+
+        with self.assertRaises(ValueError):
+            feeder.fetch_model("https://assets.meshy.ai/hero.glb", self.output)
+
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_verify_glb(self):
+        path = os.path.join(self.temp_dir, "model.glb")
+        with open(path, 'wb') as f:
+            f.write(make_glb())
+        feeder.glb_io.verify_glb(path)
+
+        with open(path, 'wb') as f:
+            f.write(b'<html>503 Service Unavailable</html>')
+        with self.assertRaises(ValueError):
+            feeder.glb_io.verify_glb(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
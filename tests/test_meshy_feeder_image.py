@@ -1,60 +1,97 @@
-import unittest
-from unittest.mock import patch, MagicMock, mock_open
-import sys
+import base64
+import json
 import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from PIL import Image
 
-# Mock dependencies to allow importing scripts.meshy_feeder without real dependencies
-sys.modules['requests'] = MagicMock()
-sys.modules['trimesh'] = MagicMock()
-sys.modules['xatlas'] = MagicMock()
-sys.modules['numpy'] = MagicMock()
-sys.modules['bpy'] = MagicMock()
-sys.modules['bmesh'] = MagicMock()
-sys.modules['addon_utils'] = MagicMock()
-sys.modules['PIL'] = MagicMock()
-
-# Instead of importing main_pipeline, let's mock it in sys.modules
+# Only requests (not installed here) and the pipeline's config loading are mocked, inside a
+# save/restore block so the real numpy/Pillow modules stay in place for the rest of the suite
 mock_pipeline = MagicMock()
 mock_pipeline.get_app_paths.return_value = MagicMock(base='/fake/base', scripts='/fake/scripts')
 mock_pipeline.load_config.return_value = {'meshy_api_key': 'fake_key'}
 mock_pipeline.resolve_path.return_value = '/fake/export'
-sys.modules['scripts.main_pipeline'] = mock_pipeline
 
-import scripts.meshy_feeder as feeder
+_saved_modules = {}
+_modules_to_mock = {'requests': MagicMock(), 'scripts.main_pipeline': mock_pipeline}
+for mod_name, mock_mod in _modules_to_mock.items():
+    if mod_name in sys.modules:
+        _saved_modules[mod_name] = sys.modules[mod_name]
+    sys.modules[mod_name] = mock_mod
+
+try:
+    import scripts.meshy_feeder as feeder
+finally:
+    for mod_name in _modules_to_mock:
+        if mod_name in _saved_modules:
+            sys.modules[mod_name] = _saved_modules[mod_name]
+        else:
+            del sys.modules[mod_name]
 
 class TestMeshyFeederImage(unittest.TestCase):
-    @patch('os.path.getsize')
-    def test_get_base64_image_png(self, mock_getsize):
-        mock_getsize.return_value = 100
-        m = mock_open(read_data=b"fake_image_data")
-        with patch('builtins.open', m):
-            result = feeder.get_base64_image("test_image.png")
-            # b"fake_image_data" encoded is 'ZmFrZV9pbWFnZV9kYXRh'
-            self.assertEqual(result, "data:image/png;base64,ZmFrZV9pbWFnZV9kYXRh")
-
-    @patch('os.path.getsize')
-    def test_get_base64_image_jpg(self, mock_getsize):
-        mock_getsize.return_value = 100
-        m = mock_open(read_data=b"fake_image_data")
-        with patch('builtins.open', m):
-            result = feeder.get_base64_image("test_image.jpg")
-            self.assertEqual(result, "data:image/jpeg;base64,ZmFrZV9pbWFnZV9kYXRh")
-
-    @patch('os.path.getsize')
-    def test_get_base64_image_jpeg(self, mock_getsize):
-        mock_getsize.return_value = 100
-        m = mock_open(read_data=b"fake_image_data")
-        with patch('builtins.open', m):
-            result = feeder.get_base64_image("test_image.jpeg")
-            self.assertEqual(result, "data:image/jpeg;base64,ZmFrZV9pbWFnZV9kYXRh")
-
-    @patch('os.path.getsize')
-    def test_get_base64_image_case_insensitive(self, mock_getsize):
-        mock_getsize.return_value = 100
-        m = mock_open(read_data=b"fake_image_data")
-        with patch('builtins.open', m):
-            result = feeder.get_base64_image("test_image.PNG")
-            self.assertEqual(result, "data:image/png;base64,ZmFrZV9pbWFnZV9kYXRh")
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def save(self, image, name, **kwargs):
+        path = os.path.join(self.temp_dir, name)
+        image.save(path, **kwargs)
+        return path
+
+    def test_prepare_portrait_downsizes_and_streams(self):
+        """Large portraits are downsized and the streamed body is exactly the JSON a data URI would give."""
+        portrait = feeder.prepare_portrait(self.save(Image.new('RGB', (3000, 1500), (200, 120, 40)), "portrait.png"))
+
+        self.assertEqual(portrait.size, (feeder.MAX_INPUT_SIDE, feeder.MAX_INPUT_SIDE // 2))
+        self.assertEqual(portrait.original_size, (3000, 1500))
+        self.assertEqual(portrait.mime, 'image/jpeg')
+
+        payload = {"enable_pbr": True, "topology": "quad"}
+        body = feeder.TaskBody(payload, portrait)
+        streamed = b''.join(iter(lambda: body.read(1000), b''))
+        self.assertEqual(len(streamed), len(body))
+        decoded = json.loads(streamed)
+        self.assertEqual(decoded["image_url"], "data:image/jpeg;base64," + base64.b64encode(portrait.data).decode('ascii'))
+        self.assertEqual(decoded["topology"], "quad")
+
+    def test_prepare_portrait_keeps_small_original(self):
+        """A portrait already within MAX_INPUT_SIDE is sent as-is when re-encoding wouldn't shrink it."""
+        path = self.save(Image.new('RGB', (64, 64), (10, 20, 30)), "small.jpg", quality=feeder.JPEG_QUALITY, optimize=True)
+        with open(path, 'rb') as f:
+            original = f.read()
+
+        portrait = feeder.prepare_portrait(path)
+
+        self.assertEqual(portrait.data, original)
+        self.assertEqual((portrait.mime, portrait.size, portrait.original_bytes), ('image/jpeg', (64, 64), len(original)))
+
+    def test_prepare_portrait_keeps_transparency(self):
+        """Portraits with alpha are re-encoded as PNG so the cut-out survives."""
+        portrait = feeder.prepare_portrait(self.save(Image.new('RGBA', (3000, 3000), (200, 120, 40, 0)), "cutout.png"))
+
+        self.assertEqual(portrait.mime, 'image/png')
+        self.assertEqual(portrait.size, (feeder.MAX_INPUT_SIDE, feeder.MAX_INPUT_SIDE))
+
+    @patch('os.path.getsize', return_value=feeder.MAX_IMAGE_SIZE + 1)
+    def test_prepare_portrait_rejects_oversized_file(self, mock_getsize):
+        with self.assertRaises(ValueError):
+            feeder.prepare_portrait("huge.png")
+
+    def test_task_body_reads_in_one_call(self):
+        """read() with no size returns the whole body, the way requests reads small bodies."""
+        body = feeder.TaskBody({"topology": "quad"}, feeder.Portrait(b"fake_image_data", 'image/png', (1, 1), (1, 1), 15))
+
+        data = body.read()
+
+        self.assertEqual(len(data), len(body))
+        self.assertEqual(json.loads(data), {"image_url": "data:image/png;base64,ZmFrZV9pbWFnZV9kYXRh", "topology": "quad"})
+        self.assertEqual(body.read(), b'')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -3,66 +3,245 @@ from unittest.mock import patch, MagicMock
 import sys
 import os
 
-# Mock dependencies to allow importing scripts.meshy_feeder without real dependencies
-sys.modules['requests'] = MagicMock()
-sys.modules['trimesh'] = MagicMock()
-sys.modules['xatlas'] = MagicMock()
-sys.modules['numpy'] = MagicMock()
-sys.modules['bpy'] = MagicMock()
-sys.modules['bmesh'] = MagicMock()
-sys.modules['addon_utils'] = MagicMock()
-sys.modules['PIL'] = MagicMock()
-
-# Instead of importing main_pipeline, let's mock it in sys.modules
+# Only requests (not installed here) and the pipeline's config loading are mocked, inside a
+# save/restore block so the real numpy/Pillow modules stay in place for the rest of the suite
 mock_pipeline = MagicMock()
 mock_pipeline.get_app_paths.return_value = MagicMock(base='/fake/base', scripts='/fake/scripts')
 mock_pipeline.load_config.return_value = {'meshy_api_key': 'fake_key'}
 mock_pipeline.resolve_path.return_value = '/fake/export'
-sys.modules['scripts.main_pipeline'] = mock_pipeline
 
-import scripts.meshy_feeder as feeder
+_saved_modules = {}
+_modules_to_mock = {'requests': MagicMock(), 'scripts.main_pipeline': mock_pipeline}
+for mod_name, mock_mod in _modules_to_mock.items():
+    if mod_name in sys.modules:
+        _saved_modules[mod_name] = sys.modules[mod_name]
+    sys.modules[mod_name] = mock_mod
+
+try:
+    import scripts.meshy_feeder as feeder
+finally:
+    for mod_name in _modules_to_mock:
+        if mod_name in _saved_modules:
+            sys.modules[mod_name] = _saved_modules[mod_name]
+        else:
+            del sys.modules[mod_name]
+
+PORTRAIT = feeder.Portrait(b"fake_image_data", 'image/png', (1, 1), (1, 1), 15)
 
 class TestMeshyFeederRetry(unittest.TestCase):
-    @patch('requests.get')
+    @patch('scripts.meshy_feeder.finish_image')
+    @patch('scripts.meshy_feeder.poll_task')
+    @patch('scripts.meshy_feeder.submit_image', return_value="task_123")
+    @patch('scripts.meshy_feeder.time')
+    def test_polling_stops_at_wall_clock_deadline(self, mock_time, mock_submit, mock_poll, mock_finish):
+        """A task stuck near 99% is polled every POLL_MIN_DELAY but only given up after MAX_WAIT_SECONDS."""
+        clock = [1000.0]
+        mock_time.monotonic.side_effect = lambda: clock[0]
+        mock_time.sleep.side_effect = lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+        response = MagicMock()
+        response.headers = {}
+        mock_poll.return_value = ({'status': 'IN_PROGRESS', 'progress': 99}, response)
+
+        with patch('builtins.print') as mock_print:
+            downloaded = feeder.run_tasks(["test.png"])
+
+        self.assertEqual(downloaded, 0, "Nothing is downloaded when the deadline passes")
+        self.assertGreaterEqual(clock[0] - 1000.0, feeder.MAX_WAIT_SECONDS)
+        self.assertLess(clock[0] - 1000.0, feeder.MAX_WAIT_SECONDS + feeder.POLL_MAX_DELAY)
+        self.assertGreater(mock_poll.call_count, 40)
+        mock_finish.assert_not_called()
+        mock_print.assert_any_call(f"❌ Timed out waiting for test.png after 10 minutes ({mock_poll.call_count} polls).")
+
+    @patch('scripts.meshy_feeder.finish_image')
+    @patch('scripts.meshy_feeder.poll_task')
+    @patch('scripts.meshy_feeder.submit_image', return_value="task_123")
     @patch('time.sleep', return_value=None)
-    def test_download_model_retry_limit(self, mock_sleep, mock_get):
-        """Test that download_model eventually stops polling after a certain number of retries."""
-        # Mock API to always return IN_PROGRESS
-        mock_response = MagicMock()
-        mock_response.json.return_value = {'status': 'IN_PROGRESS'}
-        mock_get.return_value = mock_response
-
-        # Set a reasonable limit for the test
-        MAX_RETRIES_TEST = 40
-        if not hasattr(feeder, 'MAX_RETRIES'):
-            # If not yet implemented, this test will fail by looping
-            # until side_effect is exhausted
-            pass
-        else:
-            MAX_RETRIES_TEST = feeder.MAX_RETRIES
+    def test_failed_status(self, mock_sleep, mock_submit, mock_poll, mock_finish):
+        """Test that the scheduler drops a task once Meshy reports FAILED."""
+        response = MagicMock()
+        response.headers = {}
+        mock_poll.return_value = ({'status': 'FAILED'}, response)
+
+        with patch('builtins.print'):
+            downloaded = feeder.run_tasks(["test.png"])
+
+        self.assertEqual(downloaded, 0)
+        self.assertEqual(mock_poll.call_count, 1, "Should only poll once if FAILED")
+        mock_finish.assert_not_called()
+
+    def test_poll_delay_backs_off_to_cap(self):
+        """Polls start fast and back off geometrically up to POLL_MAX_DELAY."""
+        delays = [feeder.next_poll_delay(attempt) for attempt in range(12)]
+        self.assertEqual(delays[0], feeder.POLL_MIN_DELAY)
+        self.assertEqual(delays, sorted(delays))
+        self.assertEqual(delays[-1], feeder.POLL_MAX_DELAY)
+
+    def test_poll_delay_uses_progress_and_retry_after(self):
+        """Progress shortens the wait to the estimated time left; Retry-After is always honoured."""
+        # 90% done after 90s: about 10s left, so no 15s wait
+        self.assertEqual(feeder.next_poll_delay(10, progress=90, elapsed=90.0), 10.0)
+        self.assertEqual(feeder.next_poll_delay(10, progress=99, elapsed=90.0), feeder.POLL_MIN_DELAY)
+        self.assertEqual(feeder.next_poll_delay(0, retry_after=30.0), 30.0)
+
+        response = MagicMock()
+        response.headers = {'Retry-After': '7'}
+        self.assertEqual(feeder.parse_retry_after(response), 7.0)
+        response.headers = {}
+        self.assertIsNone(feeder.parse_retry_after(response))
+
+    @patch('scripts.meshy_feeder.requests')
+    def test_session_is_shared(self, mock_requests):
+        """Every caller gets the same pooled session."""
+        feeder._session = None
+        try:
+            self.assertIs(feeder.get_session(), feeder.get_session())
+            mock_requests.Session.assert_called_once()
+        finally:
+            feeder._session = None
+
+    @patch('scripts.meshy_feeder.finish_image', return_value=True)
+    @patch('scripts.meshy_feeder.poll_task')
+    @patch('scripts.meshy_feeder.submit_image')
+    @patch('time.sleep', return_value=None)
+    def test_scheduler_limits_tasks_in_flight(self, mock_sleep, mock_submit, mock_poll, mock_finish):
+        """One loop polls every pending task, never exceeding max_in_flight, and downloads each result."""
+        in_flight = set()
+        peak = []
+        polls = {}
+
+        def submit(filename):
+            in_flight.add(f"task_{filename}")
+            peak.append(len(in_flight))
+            return f"task_{filename}"
+
+        def poll(task_id):
+            polls[task_id] = polls.get(task_id, 0) + 1
+            response = MagicMock()
+            response.headers = {}
+            if polls[task_id] < 3:
+                return {'status': 'IN_PROGRESS'}, response
+            in_flight.discard(task_id)
+            return {'status': 'SUCCEEDED', 'model_urls': {'glb': 'https://assets.meshy.ai/m.glb'}}, response
+
+        mock_submit.side_effect = submit
+        mock_poll.side_effect = poll
 
-        # Provide enough responses to cover the expected limit, plus one to see if it continues
-        mock_get.side_effect = [mock_response] * (MAX_RETRIES_TEST + 5)
+        files = [f"portrait_{i}.png" for i in range(12)]
+        downloaded = feeder.run_tasks(files, max_in_flight=5)
 
-        result = feeder.download_model("task_123", "test.png")
+        self.assertEqual(downloaded, 12)
+        self.assertEqual(max(peak), 5)
+        self.assertEqual(sorted(call.args[1] for call in mock_finish.call_args_list), sorted(files))
+        self.assertEqual(mock_poll.call_count, 36)
 
-        # We expect it to return False when it hits the limit
-        self.assertFalse(result, "Should return False when retry limit is reached")
+    @patch('scripts.meshy_feeder.portrait_fingerprint', return_value=None)
+    @patch('scripts.meshy_feeder.save_model', return_value=True)
+    @patch('scripts.meshy_feeder.poll_task')
+    @patch('scripts.meshy_feeder.submit_image', return_value="task_new")
+    @patch('time.sleep', return_value=None)
+    def test_restart_resumes_journaled_task(self, mock_sleep, mock_submit, mock_poll, mock_save, mock_fingerprint):
+        """A task journaled by an interrupted run is polled again instead of re-submitting its portrait."""
+        import shutil
+        import tempfile
+        from scripts import task_journal
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for name, data in (("old.png", b"old portrait"), ("new.png", b"new portrait")):
+                with open(os.path.join(temp_dir, name), 'wb') as f:
+                    f.write(data)
+            journal = os.path.join(temp_dir, task_journal.JOURNAL_NAME)
+            old_hash = task_journal.hash_image(os.path.join(temp_dir, "old.png"))
+            task_journal.record_task(journal, old_hash, filename="old.png", task_id="task_old", status=task_journal.PENDING)
+
+            response = MagicMock()
+            response.headers = {}
+            mock_poll.return_value = ({'status': 'SUCCEEDED', 'model_urls': {'glb': 'https://assets.meshy.ai/m.glb'}}, response)
+
+            with patch.object(feeder, 'INPUT_FOLDER', temp_dir):
+                downloaded = feeder.run_tasks(["new.png", "old.png"], journal_path=journal)
+
+            self.assertEqual(downloaded, 2)
+            mock_submit.assert_called_once_with("new.png")
+            self.assertEqual(sorted(call.args[0] for call in mock_poll.call_args_list), ["task_new", "task_old"])
+            records = task_journal.load_journal(journal)
+            self.assertEqual({r['status'] for r in records.values()}, {task_journal.SUCCEEDED})
+            self.assertEqual(sorted(os.listdir(temp_dir)), [task_journal.JOURNAL_NAME])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    @patch('scripts.meshy_feeder.save_model', return_value=True)
+    @patch('scripts.meshy_feeder.poll_task')
+    @patch('scripts.meshy_feeder.submit_image', side_effect=lambda filename: f"task_{filename}")
+    @patch('time.sleep', return_value=None)
+    def test_models_processed_while_others_generate(self, mock_sleep, mock_submit, mock_poll, mock_save):
+        """The first finished model reaches the pipeline workers before the slow generation completes."""
+        import threading
+        fast_processed = threading.Event()
+        processed = []
+
+        def poll(task_id):
+            response = MagicMock()
+            response.headers = {}
+            if task_id == "task_slow.png" and not fast_processed.wait(timeout=0.05):
+                return {'status': 'IN_PROGRESS'}, response
+            return {'status': 'SUCCEEDED', 'model_urls': {'glb': 'https://assets.meshy.ai/m.glb'}}, response
+
+        def process_models(model_queue):
+            count = 0
+            while True:
+                path = model_queue.get()
+                if path is None:
+                    return count
+                processed.append(os.path.basename(path))
+                fast_processed.set()
+                count += 1
 
-        # It should have called the API exactly MAX_RETRIES times
-        self.assertEqual(mock_get.call_count, MAX_RETRIES_TEST)
+        mock_poll.side_effect = poll
+        downloaded, done = feeder.generate_and_process(["fast.png", "slow.png"], process_models)
 
-    @patch('requests.get')
-    def test_download_model_failed_status(self, mock_get):
-        """Test that download_model correctly handles a FAILED status."""
-        mock_response = MagicMock()
-        mock_response.json.return_value = {'status': 'FAILED'}
-        mock_get.return_value = mock_response
+        self.assertEqual((downloaded, done), (2, 2))
+        self.assertEqual(processed, ["fast.glb", "slow.glb"])
+
+    @patch('time.sleep', return_value=None)
+    def test_token_bucket_allows_burst_then_paces(self, mock_sleep):
+        """The first `burst` calls go straight through; later ones wait 1/rate each."""
+        bucket = feeder.TokenBucket(rate=2, burst=3)
+        waits = [bucket.acquire() for _ in range(5)]
+
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.5, places=2)
+        self.assertAlmostEqual(waits[4], 1.0, places=2)
+
+    @patch('scripts.meshy_feeder.get_session')
+    @patch('time.sleep', return_value=None)
+    def test_429_retried_after_retry_after(self, mock_sleep, mock_session):
+        """A rate-limited submission is retried (honouring Retry-After) instead of skipping the portrait."""
+        limited = MagicMock(status_code=429, headers={'Retry-After': '3'})
+        accepted = MagicMock(status_code=202, headers={})
+        accepted.json.return_value = {'result': 'task_1'}
+        mock_session.return_value.post.side_effect = [limited, limited, accepted]
+
+        with patch.object(feeder, 'RETRY_BUDGET', feeder.RetryBudget()), patch('builtins.print'):
+            self.assertEqual(feeder.create_meshy_task(PORTRAIT), 'task_1')
+
+        self.assertEqual(mock_session.return_value.post.call_count, 3)
+        # Each attempt streams a fresh body; a read-once body can't be sent twice
+        bodies = [c.kwargs['data'] for c in mock_session.return_value.post.call_args_list]
+        self.assertEqual(len({id(body) for body in bodies}), 3)
+        retry_sleeps = [c.args[0] for c in mock_sleep.call_args_list if c.args[0] >= 3]
+        self.assertEqual(len(retry_sleeps), 2)
+
+    @patch('scripts.meshy_feeder.get_session')
+    @patch('time.sleep', return_value=None)
+    def test_retry_budget_stops_retry_storm(self, mock_sleep, mock_session):
+        """Once the shared budget is spent, 5xx responses are returned instead of retried."""
+        mock_session.return_value.post.return_value = MagicMock(status_code=503, headers={}, text="Service Unavailable")
 
-        result = feeder.download_model("task_123", "test.png")
+        with patch.object(feeder, 'RETRY_BUDGET', feeder.RetryBudget(tokens=2)), patch('builtins.print'):
+            self.assertIsNone(feeder.create_meshy_task(PORTRAIT))
 
-        self.assertFalse(result, "Should return False when status is FAILED")
-        self.assertEqual(mock_get.call_count, 1, "Should only call the API once if FAILED")
+        self.assertEqual(mock_session.return_value.post.call_count, 3)
 
 if __name__ == '__main__':
     unittest.main()
@@ -3,45 +3,53 @@ from unittest.mock import patch, MagicMock
 import sys
 import os
 
-# Mock dependencies to allow importing scripts.meshy_feeder without real dependencies
-sys.modules['requests'] = MagicMock()
-sys.modules['trimesh'] = MagicMock()
-sys.modules['xatlas'] = MagicMock()
-sys.modules['numpy'] = MagicMock()
-sys.modules['bpy'] = MagicMock()
-sys.modules['bmesh'] = MagicMock()
-sys.modules['addon_utils'] = MagicMock()
-sys.modules['PIL'] = MagicMock()
-
-# Instead of importing main_pipeline, let's mock it in sys.modules
+# Only requests (not installed here) and the pipeline's config loading are mocked, inside a
+# save/restore block so the real numpy/Pillow modules stay in place for the rest of the suite
 mock_pipeline = MagicMock()
 mock_pipeline.get_app_paths.return_value = MagicMock(base='/fake/base', scripts='/fake/scripts')
 mock_pipeline.load_config.return_value = {'meshy_api_key': 'fake_key'}
 mock_pipeline.resolve_path.return_value = '/fake/export'
-sys.modules['scripts.main_pipeline'] = mock_pipeline
 
-import scripts.meshy_feeder as feeder
+_saved_modules = {}
+_modules_to_mock = {'requests': MagicMock(), 'scripts.main_pipeline': mock_pipeline}
+for mod_name, mock_mod in _modules_to_mock.items():
+    if mod_name in sys.modules:
+        _saved_modules[mod_name] = sys.modules[mod_name]
+    sys.modules[mod_name] = mock_mod
+
+try:
+    import scripts.meshy_feeder as feeder
+finally:
+    for mod_name in _modules_to_mock:
+        if mod_name in _saved_modules:
+            sys.modules[mod_name] = _saved_modules[mod_name]
+        else:
+            del sys.modules[mod_name]
+
+PORTRAIT = feeder.Portrait(b"fake_image_data", 'image/png', (1, 1), (1, 1), 15)
 
 class TestMeshyFeederSecurity(unittest.TestCase):
-    @patch('requests.post')
-    def test_create_meshy_task_error(self, mock_post):
+    @patch('scripts.meshy_feeder.get_session')
+    def test_create_meshy_task_error(self, mock_session):
         """Test that create_meshy_task handles API errors gracefully and returns None."""
+        mock_post = mock_session.return_value.post
         mock_post.return_value.status_code = 400
         mock_post.return_value.text = "Bad Request: Invalid image format"
 
         with patch('builtins.print') as mock_print:
-            result = feeder.create_meshy_task("data:image/png;base64,abc")
+            result = feeder.create_meshy_task(PORTRAIT)
 
         self.assertIsNone(result)
         mock_print.assert_called_with("❌ Error creating task: Bad Request: Invalid image format")
 
-    @patch('requests.post')
-    def test_create_meshy_task_timeout(self, mock_post):
-        """Test that create_meshy_task passes the API_TIMEOUT to requests.post."""
+    @patch('scripts.meshy_feeder.get_session')
+    def test_create_meshy_task_timeout(self, mock_session):
+        """Test that create_meshy_task passes the API_TIMEOUT to the session POST."""
+        mock_post = mock_session.return_value.post
         mock_post.return_value.status_code = 202
         mock_post.return_value.json.return_value = {'result': 'task_123'}
 
-        feeder.create_meshy_task("data:image/png;base64,abc")
+        feeder.create_meshy_task(PORTRAIT)
 
         mock_post.assert_called_once()
         _, kwargs = mock_post.call_args
@@ -49,27 +57,29 @@ class TestMeshyFeederSecurity(unittest.TestCase):
         self.assertEqual(kwargs['timeout'], feeder.API_TIMEOUT)
         self.assertEqual(feeder.API_TIMEOUT, 30)
 
-    @patch('requests.get')
-    @patch('time.sleep', return_value=None)
-    def test_download_model_timeouts(self, mock_sleep, mock_get):
-        """Test that download_model passes correct timeouts to both status check and download calls."""
-        # Mocking the two sequential GET calls:
-        # 1. Status check -> SUCCEEDED
-        # 2. Model download -> binary content
+    @patch('os.replace')
+    @patch('scripts.meshy_feeder.glb_io.verify_glb')
+    @patch('scripts.meshy_feeder.get_session')
+    def test_poll_and_download_timeouts(self, mock_session, mock_verify, mock_replace):
+        """Test that the status check and the model download pass their own timeouts."""
+        mock_get = mock_session.return_value.get
         mock_response_status = MagicMock()
+        mock_response_status.status_code = 200
         mock_response_status.json.return_value = {
             'status': 'SUCCEEDED',
             'model_urls': {'glb': 'https://assets.meshy.ai/model.glb'}
         }
 
         mock_response_download = MagicMock()
-        mock_response_download.content = b"fake_model_binary_data"
+        mock_response_download.status_code = 200
+        mock_response_download.iter_content.return_value = [b"fake_model_binary_data"]
 
         mock_get.side_effect = [mock_response_status, mock_response_download]
 
-        with patch('builtins.open', unittest.mock.mock_open()):
+        with patch('builtins.open', unittest.mock.mock_open()), patch('builtins.print'):
             # We don't care about the actual file writing, just the requests calls
-            feeder.download_model("task_123", "test.png")
+            task, _ = feeder.poll_task("task_123")
+            feeder.save_model(task, "test.png")
 
         self.assertEqual(mock_get.call_count, 2)
 
@@ -82,77 +92,63 @@ class TestMeshyFeederSecurity(unittest.TestCase):
         self.assertEqual(kwargs1['timeout'], feeder.DOWNLOAD_TIMEOUT)
         self.assertEqual(feeder.DOWNLOAD_TIMEOUT, 120)
 
-    @patch('requests.get')
-    def test_download_model_api_timeout_exception(self, mock_get):
-        """Test that download_model (correctly) lets timeout exceptions bubble up or handle them."""
-        # Create a mock exception class since requests is not installed
+    @patch('scripts.meshy_feeder.get_session')
+    def test_download_timeout_exception(self, mock_session):
+        """Test that save_model lets a download timeout bubble up to finish_image."""
+        mock_get = mock_session.return_value.get
+        # Stand-in for requests.exceptions.Timeout, since requests is not installed
         class MockTimeout(Exception):
             pass
 
-        # Inject the mock exception into the mocked requests module
-        import requests
-        requests.exceptions = MagicMock()
-        requests.exceptions.Timeout = MockTimeout
-
         mock_get.side_effect = MockTimeout("Connection timed out")
 
         with self.assertRaises(MockTimeout):
-            feeder.download_model("task_123", "test.png")
+            feeder.save_model({'model_urls': {'glb': 'https://assets.meshy.ai/model.glb'}}, "test.png")
 
-    @patch('requests.get')
-    @patch('time.sleep', return_value=None)
-    def test_ssrf_https_scheme_enforcement(self, mock_sleep, mock_get):
-        """Test that download_model rejects URLs without an https scheme."""
-        mock_response_status = MagicMock()
-        mock_response_status.json.return_value = {
-            'status': 'SUCCEEDED',
-            'model_urls': {'glb': 'http://assets.meshy.ai/model.glb'}
-        }
-        mock_get.return_value = mock_response_status
+    @patch('scripts.meshy_feeder.get_session')
+    def test_ssrf_https_scheme_enforcement(self, mock_session):
+        """Test that save_model rejects URLs without an https scheme."""
+        mock_get = mock_session.return_value.get
 
-        result = feeder.download_model("task_123", "test.png")
+        with patch('builtins.print'):
+            result = feeder.save_model({'model_urls': {'glb': 'http://assets.meshy.ai/model.glb'}}, "test.png")
 
         self.assertFalse(result)
-        # Should only be called once (for the status check), not for the download
-        self.assertEqual(mock_get.call_count, 1)
+        mock_get.assert_not_called()
 
-    @patch('requests.get')
-    @patch('time.sleep', return_value=None)
-    def test_ssrf_host_enforcement(self, mock_sleep, mock_get):
-        """Test that download_model rejects URLs from unexpected hosts."""
-        mock_response_status = MagicMock()
-        mock_response_status.json.return_value = {
-            'status': 'SUCCEEDED',
-            'model_urls': {'glb': 'https://malicious.com/model.glb'}
-        }
-        mock_get.return_value = mock_response_status
+    @patch('scripts.meshy_feeder.get_session')
+    def test_ssrf_host_enforcement(self, mock_session):
+        """Test that save_model rejects URLs from unexpected hosts."""
+        mock_get = mock_session.return_value.get
 
-        result = feeder.download_model("task_123", "test.png")
+        with patch('builtins.print'):
+            result = feeder.save_model({'model_urls': {'glb': 'https://malicious.com/model.glb'}}, "test.png")
 
         self.assertFalse(result)
-        # Should only be called once (for the status check), not for the download
-        self.assertEqual(mock_get.call_count, 1)
+        mock_get.assert_not_called()
 
-    @patch('requests.get')
-    @patch('time.sleep', return_value=None)
-    def test_ssrf_valid_url(self, mock_sleep, mock_get):
-        """Test that download_model accepts valid URLs."""
-        mock_response_status = MagicMock()
-        mock_response_status.json.return_value = {
-            'status': 'SUCCEEDED',
-            'model_urls': {'glb': 'https://assets.meshy.ai/model.glb'}
-        }
-
-        mock_response_download = MagicMock()
-        mock_response_download.content = b"fake_data"
-
-        mock_get.side_effect = [mock_response_status, mock_response_download]
+    @patch('os.replace')
+    @patch('scripts.meshy_feeder.glb_io.verify_glb')
+    @patch('scripts.meshy_feeder.get_session')
+    def test_ssrf_valid_url(self, mock_session, mock_verify, mock_replace):
+        """Test that save_model accepts valid URLs."""
+        mock_get = mock_session.return_value.get
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.iter_content.return_value = [b"fake_data"]
 
-        with patch('builtins.open', unittest.mock.mock_open()):
-            result = feeder.download_model("task_123", "test.png")
+        with patch('builtins.open', unittest.mock.mock_open()), patch('builtins.print'):
+            result = feeder.save_model({'model_urls': {'glb': 'https://assets.meshy.ai/model.glb'}}, "test.png")
 
         self.assertTrue(result)
-        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('scripts.meshy_feeder.fetch_model')
+    def test_model_url_trusted_only_from_configured_api_origin(self, mock_fetch):
+        """A configured local stand-in may serve models over http, but only from its own origin."""
+        with patch.object(feeder, 'API_BASE', 'http://127.0.0.1:8765/v1'), patch('builtins.print'):
+            self.assertTrue(feeder.save_model({'model_urls': {'glb': 'http://127.0.0.1:8765/models/a.glb'}}, "a.png"))
+            self.assertFalse(feeder.save_model({'model_urls': {'glb': 'http://127.0.0.1:9999/models/a.glb'}}, "a.png"))
+        self.assertEqual(mock_fetch.call_count, 1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,71 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+from scripts import glb_io
+from mock_meshy_server import start_server
+
+
+def call(url, data=None, headers=None):
+    request = urllib.request.Request(url, data=data, headers=headers or {})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, response.read()
+
+
+class TestMockMeshyServer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_task_lifecycle_and_ranged_download(self):
+        server, api_base = start_server(delay=0.2, jitter=0, glb_size=200 * 1024)
+        try:
+            status, body = call(f"{api_base}/image-to-3d", json.dumps({"image_url": "data:,"}).encode(), {"Content-Type": "application/json"})
+            self.assertEqual(status, 202)
+            task_id = json.loads(body)['result']
+
+            task = json.loads(call(f"{api_base}/image-to-3d/{task_id}")[1])
+            self.assertEqual(task['status'], 'IN_PROGRESS')
+            time.sleep(0.25)
+            task = json.loads(call(f"{api_base}/image-to-3d/{task_id}")[1])
+            self.assertEqual(task['status'], 'SUCCEEDED')
+
+            model_url = task['model_urls']['glb']
+            _, first = call(model_url)
+            status, rest = call(model_url, headers={"Range": "bytes=1000-"})
+            self.assertEqual(status, 206)
+            self.assertEqual(rest, first[1000:])
+
+            path = os.path.join(self.temp_dir, "model.glb")
+            with open(path, 'wb') as f:
+                f.write(first)
+            glb_io.verify_glb(path)
+            self.assertEqual(server.mock.requests['download'], 2)
+            self.assertEqual(len(server.mock.added_latency()), 1)
+        finally:
+            server.shutdown()
+
+    def test_rate_limit_returns_429(self):
+        server, api_base = start_server(rate_limit=2)
+        try:
+            codes = []
+            for _ in range(4):
+                try:
+                    codes.append(call(f"{api_base}/image-to-3d", b"{}")[0])
+                except urllib.error.HTTPError as e:
+                    codes.append(e.code)
+                    self.assertEqual(e.headers['Retry-After'], '1')
+            self.assertEqual(codes, [202, 202, 429, 429])
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+
+from scripts import occlusion_cull
+
+
+def make_box(center, size, subdivisions=1):
+    """Returns a closed axis-aligned box as (verts, tris), with each side split into a subdivisions grid."""
+    center = np.asarray(center, dtype=float)
+    half = size / 2.0
+    verts, tris = [], []
+    lin = np.linspace(-half, half, subdivisions + 1)
+    for axis in range(3):
+        for sign in (-1.0, 1.0):
+            u_axis, v_axis = [a for a in range(3) if a != axis]
+            base = len(verts)
+            for j in range(subdivisions + 1):
+                for i in range(subdivisions + 1):
+                    p = np.zeros(3)
+                    p[axis] = sign * half
+                    p[u_axis] = lin[i]
+                    p[v_axis] = lin[j]
+                    verts.append(center + p)
+            for j in range(subdivisions):
+                for i in range(subdivisions):
+                    a = base + j * (subdivisions + 1) + i
+                    tris.append((a, a + 1, a + subdivisions + 2))
+                    tris.append((a, a + subdivisions + 2, a + subdivisions + 1))
+    return np.array(verts), np.array(tris)
+
+
+class TestOcclusionCull(unittest.TestCase):
+
+    def setUp(self):
+        outer_v, outer_t = make_box((0, 0, 0), 1.0, subdivisions=3)
+        inner_v, inner_t = make_box((0.1, 0, 0), 0.4)
+        self.outer_count = len(outer_t)
+        self.verts = np.vstack([outer_v, inner_v])
+        self.tris = np.vstack([outer_t, inner_t + len(outer_v)])
+
+    def test_sphere_directions_are_unit_and_respect_cap(self):
+        dirs = occlusion_cull.sphere_directions(32, min_z=0.25)
+        np.testing.assert_allclose(np.linalg.norm(dirs, axis=1), 1.0, atol=1e-6)
+        self.assertTrue((dirs[:, 2] >= 0.25 - 1e-9).all())
+
+    def test_interior_faces_are_hidden(self):
+        """Faces enclosed by another shell are culled, the outer shell is kept."""
+        visible = occlusion_cull.find_visible_triangles(self.verts, self.tris, direction_count=32)
+        self.assertTrue(visible[:self.outer_count].all())
+        self.assertFalse(visible[self.outer_count:].any())
+
+    def test_underside_faces_hidden_from_upper_hemisphere(self):
+        """With upward-only directions the bottom of a lone box is culled but its sides stay."""
+        verts, tris = make_box((0, 0, 0.5), 1.0, subdivisions=2)
+        visible = occlusion_cull.find_visible_triangles(
+            verts, tris, direction_count=32, min_direction_z=occlusion_cull.UNDERSIDE_MIN_Z
+        )
+        normals_z = np.cross(verts[tris[:, 1]] - verts[tris[:, 0]], verts[tris[:, 2]] - verts[tris[:, 0]])[:, 2]
+        bottom = np.isclose(verts[tris].mean(axis=1)[:, 2], 0.0) & ~np.isclose(normals_z, 0.0)
+        self.assertFalse(visible[bottom].any())
+        self.assertTrue(visible[~bottom].all())
+
+    def test_find_hidden_polygons_groups_triangles(self):
+        """A polygon survives when any of its triangles is visible."""
+        # Pair triangles back into quads: polygon i owns triangles 2i and 2i+1
+        tri_polys = np.arange(len(self.tris)) // 2
+        hidden = occlusion_cull.find_hidden_polygons(
+            self.verts, self.tris, tri_polys, len(self.tris) // 2, mode="interior", direction_count=32
+        )
+        np.testing.assert_array_equal(hidden, np.arange(self.outer_count // 2, len(self.tris) // 2))
+
+    def test_none_mode_and_invalid_mode(self):
+        self.assertEqual(len(occlusion_cull.find_hidden_polygons(self.verts, self.tris, np.arange(len(self.tris)), len(self.tris), mode="none")), 0)
+        with self.assertRaises(ValueError):
+            occlusion_cull.find_hidden_polygons(self.verts, self.tris, np.arange(len(self.tris)), len(self.tris), mode="bogus")
+
+if __name__ == '__main__':
+    unittest.main()
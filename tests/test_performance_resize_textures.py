@@ -48,5 +48,36 @@ class TestPerformanceResizeTextures(unittest.TestCase):
             # Assert that it's only called once for the shared material
             self.assertEqual(call_count, 1)
 
+    def test_shared_group_images_resized_once(self):
+        """Two materials sharing a node group: the group is walked once and each image scaled once."""
+        big = MagicMock()
+        big.name = "big"
+        big.size = [4096, 2048]
+        small = MagicMock()
+        small.name = "small"
+        small.size = [512, 512]
+
+        group_tree = MagicMock()
+        group_tree.nodes = [MagicMock(type='TEX_IMAGE', image=big)]
+
+        materials = []
+        for _ in range(2):
+            mat = MagicMock()
+            mat.use_nodes = True
+            mat.node_tree.nodes = [
+                MagicMock(type='GROUP', node_tree=group_tree),
+                MagicMock(type='TEX_IMAGE', image=small),
+            ]
+            materials.append(mat)
+
+        objects = [MagicMock(material_slots=[MagicMock(material=mat)]) for mat in materials * 3]
+
+        with patch('builtins.print'):
+            resized = worker.resize_textures(1024, objects=objects)
+
+        self.assertEqual(resized, [big])
+        big.scale.assert_called_once_with(1024, 512)
+        small.scale.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,82 @@
+import io
+import os
+import tempfile
+import unittest
+import zlib
+import numpy as np
+from PIL import Image
+
+from scripts import png_writer
+
+
+class TestPngWriter(unittest.TestCase):
+
+    def decode(self, data):
+        return np.asarray(Image.open(io.BytesIO(data)))
+
+    def test_round_trip_all_channel_counts(self):
+        rng = np.random.default_rng(0)
+        for shape in ((1, 1, 3), (5, 7, 1), (70, 33, 2), (130, 20, 3), (65, 64, 4)):
+            pixels = rng.integers(0, 256, shape, dtype=np.uint8)
+            decoded = self.decode(png_writer.encode_png(pixels, workers=3))
+            np.testing.assert_array_equal(decoded.reshape(shape), pixels)
+
+    def test_float_input_and_smooth_image_compresses(self):
+        y, x = np.mgrid[0:256, 0:256]
+        image = np.stack([x / 255.0, y / 255.0, np.full(x.shape, 0.5)], axis=-1)
+        data = png_writer.encode_png(image)
+        np.testing.assert_array_equal(self.decode(data), png_writer.to_uint8(image))
+        # Gradients filter to near-constant residuals
+        self.assertLess(len(data), image.size // 20)
+
+    def test_blocks_join_into_one_zlib_stream(self):
+        """Full-flush blocks primed with the previous window decompress as a single stream at every level."""
+        data = bytes(np.random.default_rng(1).integers(0, 8, 300000, dtype=np.uint8))
+        for level in (0, 1, 6, 9):
+            stream = png_writer.compress_parallel(data, level, workers=4, block_size=40000)
+            self.assertEqual(zlib.decompress(stream), data)
+
+    def test_write_png(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.png")
+            size = png_writer.write_png(path, np.zeros((8, 8, 4), dtype=np.uint8))
+            self.assertEqual(os.path.getsize(path), size)
+            with Image.open(path) as img:
+                self.assertEqual((img.mode, img.size), ('RGBA', (8, 8)))
+
+    def test_indexed_png_with_transparency(self):
+        rng = np.random.default_rng(2)
+        palette = np.array([[255, 0, 0, 255], [0, 255, 0, 128], [0, 0, 255, 255]], dtype=np.uint8)
+        indices = rng.integers(0, 3, (40, 23), dtype=np.uint8)
+        with Image.open(io.BytesIO(png_writer.encode_indexed_png(indices, palette, workers=2))) as img:
+            self.assertEqual(img.mode, 'P')
+            np.testing.assert_array_equal(np.asarray(img), indices)
+            np.testing.assert_array_equal(np.asarray(img.convert('RGBA')), palette[indices])
+
+    def test_save_image_png_flips_blender_rows(self):
+        # Stand-in for a bpy image: float RGBA pixels stored bottom row first
+        rows = np.array([[[1.0, 0.0, 0.0, 1.0]] * 3, [[0.0, 0.0, 1.0, 1.0]] * 3], dtype=np.float32)
+
+        class FakePixels:
+            def foreach_get(self, out):
+                out[:] = rows.ravel()
+
+        class FakeImage:
+            size = (3, 2)
+            channels = 4
+            pixels = FakePixels()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baked.png")
+            png_writer.save_image_png(FakeImage(), path)
+            with Image.open(path) as img:
+                self.assertEqual(img.getpixel((0, 0)), (0, 0, 255, 255))
+                self.assertEqual(img.getpixel((0, 1)), (255, 0, 0, 255))
+
+    def test_rejects_unsupported_channels(self):
+        with self.assertRaises(ValueError):
+            png_writer.encode_png(np.zeros((2, 2, 5), dtype=np.uint8))
+
+
+if __name__ == '__main__':
+    unittest.main()
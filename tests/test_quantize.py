@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+
+from scripts import glb_io, quantize
+from tests.glb_fixtures import make_glb, png_bytes
+
+
+def make_tile_glb(path, png):
+    """GLB with one position accessor and one embedded PNG, the image view after the geometry."""
+    positions = np.zeros((3, 3), dtype=np.float32).tobytes()
+    make_glb(path, [positions, png], images=[{"bufferView": 1, "mimeType": "image/png"}])
+    return positions
+
+
+class TestQuantize(unittest.TestCase):
+
+    def test_few_colours_are_kept_exactly(self):
+        colours = np.array([[10, 20, 30], [200, 100, 0], [0, 0, 0]], dtype=np.uint8)
+        image = colours[np.random.default_rng(0).integers(0, 3, (16, 16))]
+        indices, palette = quantize.quantize(image, 8)
+        np.testing.assert_array_equal(palette[indices], image)
+
+    def test_median_cut_and_kmeans_stay_close(self):
+        y, x = np.mgrid[0:64, 0:64]
+        image = np.stack([x * 4, y * 4, (x + y) * 2], axis=-1).astype(np.uint8)
+        indices, palette = quantize.quantize(image, 32)
+        self.assertLessEqual(len(palette), 32)
+        self.assertLess(np.abs(palette[indices].astype(int) - image).mean(), 12)
+
+    def test_dither_preserves_local_average(self):
+        """Ordered dithering trades per-texel error for a closer 8x8 block average."""
+        y, x = np.mgrid[0:64, 0:64]
+        image = np.stack([x * 4, y * 4, (x + y) * 2], axis=-1).astype(np.uint8)
+
+        def block_error(dither):
+            indices, palette = quantize.quantize(image, 32, dither=dither)
+            blocks = (palette[indices].astype(float) - image).reshape(8, 8, 8, 8, 3).mean(axis=(1, 3))
+            return np.abs(blocks).mean()
+
+        self.assertLess(block_error(True), block_error(False))
+
+    def test_alpha_channel_is_quantized(self):
+        image = np.zeros((8, 8, 4), dtype=np.uint8)
+        image[..., 3] = np.repeat(np.arange(8) * 32, 8).reshape(8, 8)
+        indices, palette = quantize.quantize(image, 4)
+        self.assertEqual(palette.shape[1], 4)
+        self.assertLessEqual(len(np.unique(palette[indices][..., 3])), 4)
+
+
+class TestQuantizeGlb(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tile.glb")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_glb_round_trip(self):
+        positions = make_tile_glb(self.path, b'\x89PNG')
+        gltf, binary = glb_io.read_glb(self.path)
+        self.assertEqual(glb_io.embedded_images(gltf, binary), [(0, b'\x89PNG', 'image/png')])
+        self.assertEqual(glb_io.view_bytes(gltf, binary, 0), positions)
+
+    def test_quantize_glb_replaces_smaller_image(self):
+        rng = np.random.default_rng(3)
+        colours = rng.integers(0, 256, (12, 3), dtype=np.uint8)
+        image = colours[rng.integers(0, 12, (96, 96))]
+        positions = make_tile_glb(self.path, png_bytes(image))
+
+        stats = quantize.quantize_glb(self.path, 16)
+
+        self.assertEqual((stats["images"], stats["quantized"]), (1, 1))
+        self.assertLess(stats["bytes_after"], stats["bytes_before"])
+        gltf, binary = glb_io.read_glb(self.path)
+        self.assertEqual(glb_io.view_bytes(gltf, binary, 0), positions)
+        self.assertEqual(gltf["buffers"][0]["byteLength"], len(binary))
+        _, data, _ = glb_io.embedded_images(gltf, binary)[0]
+        with Image.open(io.BytesIO(data)) as img:
+            self.assertEqual(img.mode, 'P')
+            np.testing.assert_array_equal(np.asarray(img.convert('RGB')), image)
+
+
+if __name__ == '__main__':
+    unittest.main()
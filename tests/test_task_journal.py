@@ -0,0 +1,48 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from scripts import task_journal
+
+
+class TestTaskJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal = os.path.join(self.temp_dir, task_journal.JOURNAL_NAME)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_later_lines_override_and_torn_lines_are_skipped(self):
+        task_journal.record_task(self.journal, "abc", filename="hero.png", task_id="t1", status=task_journal.PENDING)
+        task_journal.record_task(self.journal, "def", filename="orc.png", task_id="t2", status=task_journal.PENDING)
+        task_journal.record_task(self.journal, "abc", status=task_journal.SUCCEEDED, output="/out/hero.glb")
+        with open(self.journal, 'a') as f:
+            f.write('{"hash": "def", "status": "SUCC')  # Crash mid-write
+
+        records = task_journal.load_journal(self.journal)
+        self.assertEqual(records["abc"]["status"], task_journal.SUCCEEDED)
+        self.assertEqual(records["abc"]["task_id"], "t1")
+        self.assertEqual(records["abc"]["output"], "/out/hero.glb")
+        self.assertEqual([r["task_id"] for r in task_journal.unfinished(records)], ["t2"])
+
+    def test_compact_keeps_one_line_per_image(self):
+        for status in (task_journal.PENDING, task_journal.FAILED, task_journal.PENDING):
+            task_journal.record_task(self.journal, "abc", filename="hero.png", task_id="t1", status=status)
+
+        records = task_journal.compact_journal(self.journal)
+        with open(self.journal) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(task_journal.load_journal(self.journal), records)
+
+    def test_hash_image(self):
+        path = os.path.join(self.temp_dir, "a.png")
+        with open(path, 'wb') as f:
+            f.write(b"portrait")
+        self.assertEqual(task_journal.hash_image(path), hashlib.sha256(b"portrait").hexdigest())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+
+from scripts import texture_analysis
+
+
+class TestTextureAnalysis(unittest.TestCase):
+
+    def test_box_downsample_and_upsample_shapes(self):
+        image = np.arange(6 * 5 * 3, dtype=np.float32).reshape(6, 5, 3)
+        small = texture_analysis.box_downsample(image, 2)
+        self.assertEqual(small.shape, (3, 3, 3))
+        # Top-left block average
+        self.assertAlmostEqual(small[0, 0, 0], image[:2, :2, 0].mean())
+        self.assertEqual(texture_analysis.upsample_linear(small, (6, 5)).shape, (6, 5, 3))
+
+    def test_flat_texture_shrinks_to_minimum(self):
+        """Two flat colour regions carry almost no detail and drop to MIN_RESOLUTION."""
+        image = np.zeros((1024, 1024, 3), dtype=np.float32)
+        image[:512] = (0.6, 0.2, 0.1)
+        image[512:] = (0.1, 0.3, 0.7)
+        analysis = texture_analysis.useful_resolution(image)
+        self.assertEqual(analysis.size, 1024)
+        self.assertEqual(analysis.res, texture_analysis.MIN_RESOLUTION)
+        self.assertLessEqual(analysis.error, texture_analysis.DEFAULT_MAX_ERROR)
+
+    def test_fine_detail_keeps_full_resolution(self):
+        """A 1px checkerboard does not survive any downscale."""
+        y, x = np.mgrid[0:512, 0:512]
+        image = ((x + y) % 2).astype(np.float32)
+        analysis = texture_analysis.useful_resolution(image)
+        self.assertEqual((analysis.res, analysis.error), (512, 0.0))
+
+    def test_smooth_detail_stops_at_its_frequency(self):
+        """A sine with a 24px period survives a 2x downscale but not 8x."""
+        x = np.arange(1024)
+        image = np.tile(0.5 + 0.4 * np.sin(2 * np.pi * x / 24.0), (1024, 1)).astype(np.float32)
+        analysis = texture_analysis.useful_resolution(image)
+        self.assertIn(analysis.res, (256, 512))
+
+    def test_analyze_png(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "flat.png")
+            Image.new('RGB', (256, 256), (120, 80, 40)).save(path)
+            analysis = texture_analysis.analyze_png(path)
+        self.assertEqual((analysis.res, analysis.size), (128, 256))
+
+
+if __name__ == '__main__':
+    unittest.main()
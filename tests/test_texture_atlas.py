@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+
+from scripts import texture_atlas
+
+
+class TestTextureAtlas(unittest.TestCase):
+
+    def test_slots_do_not_overlap(self):
+        sizes = [(64, 32), (16, 16), (100, 20), (4, 4), (30, 60)]
+        slots, (height, width) = texture_atlas.pack_atlas(sizes, padding=2)
+        mask = np.zeros((height, width), dtype=int)
+        for slot, (w, h) in zip(slots, sizes):
+            self.assertEqual((slot.width, slot.height), (w, h))
+            mask[slot.y - 2:slot.y + h + 2, slot.x - 2:slot.x + w + 2] += 1
+        self.assertEqual(mask.max(), 1)
+
+    def test_build_atlas_copies_images_with_edge_border(self):
+        rng = np.random.default_rng(0)
+        rgb = rng.integers(0, 256, (12, 20, 3), dtype=np.uint8)
+        colour = texture_atlas.swatch((1.0, 0.0, 0.5))
+        atlas, slots = texture_atlas.build_atlas([rgb, colour], padding=3)
+
+        a, b = slots
+        np.testing.assert_array_equal(atlas[a.y:a.y + 12, a.x:a.x + 20, :3], rgb)
+        self.assertTrue((atlas[a.y:a.y + 12, a.x:a.x + 20, 3] == 255).all())
+        # The border repeats the image's edge texels
+        np.testing.assert_array_equal(atlas[a.y - 3, a.x:a.x + 20, :3], rgb[0])
+        np.testing.assert_array_equal(atlas[b.y + 1, b.x + 1], [255, 0, 128, 255])
+
+    def test_oversized_atlas_is_built_from_halved_images(self):
+        images = [np.zeros((64, 64, 3), dtype=np.uint8)] * 4
+        atlas, slots = texture_atlas.build_atlas(images, padding=1, max_side=100)
+        self.assertLessEqual(max(atlas.shape[:2]), 100)
+        self.assertEqual((slots[0].width, slots[0].height), (32, 32))
+
+    def test_uvs_wrap_per_face_and_remap_into_slot(self):
+        # A quad one tile to the right and a triangle straddling u = 0 keep their own tile
+        loop_uvs = np.array([[1.1, 0.1], [1.9, 0.1], [1.9, 0.9], [1.1, 0.9], [-0.1, 0.5], [0.3, 0.5], [0.3, 0.9]])
+        wrapped = texture_atlas.wrap_face_uvs(loop_uvs, [4, 3])
+        np.testing.assert_allclose(wrapped[:4], loop_uvs[:4] - [1, 0])
+        np.testing.assert_allclose(wrapped[4], [0.0, 0.5])
+
+        slots = [texture_atlas.AtlasSlot(10, 20, 40, 30)]
+        atlas_uvs = texture_atlas.remap_uvs([[0, 0], [1, 1]], np.zeros(2, dtype=int), slots, (100, 200))
+        np.testing.assert_allclose(atlas_uvs, [[10 / 200, 20 / 100], [50 / 200, 50 / 100]])
+
+
+if __name__ == '__main__':
+    unittest.main()
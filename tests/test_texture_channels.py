@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+
+from scripts import texture_channels
+
+
+class TestTextureChannels(unittest.TestCase):
+
+    def setUp(self):
+        self.rgb = np.random.default_rng(0).integers(0, 256, (16, 12, 3), dtype=np.uint8)
+
+    def test_opaque_alpha_is_dropped(self):
+        """The bake target's constant alpha carries nothing: RGBA becomes RGB, pixel for pixel."""
+        rgba = np.concatenate([self.rgb, np.full((16, 12, 1), 255, dtype=np.uint8)], axis=-1)
+        reduced, report = texture_channels.reduce_channels(rgba)
+        np.testing.assert_array_equal(reduced, self.rgb)
+        self.assertEqual((report.channels_in, report.channels_out, report.alpha), (4, 3, False))
+        self.assertEqual(report.constant_alpha, 1.0)
+        self.assertEqual(report.raw_bytes_out * 4, report.raw_bytes_in * 3)
+
+    def test_constant_translucent_alpha_is_kept(self):
+        """Only a fully opaque alpha is redundant; a uniformly translucent one still changes the look."""
+        rgba = np.concatenate([self.rgb, np.full((16, 12, 1), 128, dtype=np.uint8)], axis=-1)
+        reduced, report = texture_channels.reduce_channels(rgba)
+        np.testing.assert_array_equal(reduced, rgba)
+        self.assertTrue(report.alpha)
+
+    def test_varying_alpha_kept_unless_unused(self):
+        rgba = np.concatenate([self.rgb, self.rgb[..., :1]], axis=-1)
+        self.assertEqual(texture_channels.reduce_channels(rgba)[0].shape[2], 4)
+        reduced, report = texture_channels.reduce_channels(rgba, keep_alpha=False)
+        np.testing.assert_array_equal(reduced, self.rgb)
+        self.assertIsNone(report.constant_alpha)
+
+    def test_grayscale_collapses_to_one_channel(self):
+        gray = np.repeat(self.rgb[..., :1], 3, axis=-1)
+        rgba = np.concatenate([gray, self.rgb[..., 1:2]], axis=-1)
+        reduced, report = texture_channels.reduce_channels(rgba)
+        self.assertTrue(report.grayscale)
+        np.testing.assert_array_equal(reduced, rgba[..., [0, 3]])
+        # Float input from Blender is compared after 8-bit conversion
+        reduced, report = texture_channels.reduce_channels(gray / 255.0)
+        self.assertEqual(report.channels_out, 1)
+        np.testing.assert_array_equal(reduced[..., 0], self.rgb[..., 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
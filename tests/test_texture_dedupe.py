@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+
+from scripts import asset_report, glb_io, texture_dedupe
+from tests.glb_fixtures import make_glb, png_bytes
+
+
+def make_asset(path, image_data, positions):
+    """Image view first and an accessor view after it, so dropping the image renumbers the accessor."""
+    make_glb(
+        path, [image_data, positions],
+        accessors=[{"bufferView": 1, "componentType": 5126, "count": len(positions) // 12, "type": "VEC3"}],
+        images=[{"bufferView": 0, "mimeType": "image/png"}],
+    )
+
+
+class TestTextureDedupe(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        rng = np.random.default_rng(0)
+        self.base = rng.integers(0, 256, (32, 32, 3), dtype=np.uint8)
+        self.positions = np.arange(9, dtype=np.float32).tobytes()
+
+    def glb(self, name, pixels):
+        make_asset(os.path.join(self.tmp, name), png_bytes(pixels), self.positions)
+
+    @patch('builtins.print')
+    def test_exact_duplicates_become_one_shared_file(self, mock_print):
+        self.glb("a_optimized.glb", self.base)
+        self.glb("b_optimized.glb", self.base)
+        self.glb("c_optimized.glb", 255 - self.base)
+
+        summary = texture_dedupe.dedupe_library(self.tmp)
+
+        shared = os.listdir(os.path.join(self.tmp, texture_dedupe.SHARED_DIR))
+        self.assertEqual(len(shared), 1)
+        self.assertEqual((summary["shared_groups"], summary["assets_rewritten"]), (1, 2))
+        self.assertEqual(summary["bytes_saved"], len(png_bytes(self.base)))
+        for name in ("a_optimized.glb", "b_optimized.glb"):
+            gltf, binary = glb_io.read_glb(os.path.join(self.tmp, name))
+            self.assertEqual(gltf["images"], [{"mimeType": "image/png", "uri": f"textures/{shared[0]}"}])
+            self.assertEqual(gltf["accessors"][0]["bufferView"], 0)
+            self.assertEqual(glb_io.view_bytes(gltf, binary, 0), self.positions)
+        gltf, _ = glb_io.read_glb(os.path.join(self.tmp, "c_optimized.glb"))
+        self.assertIn("bufferView", gltf["images"][0])
+
+        report = asset_report.load_report(os.path.join(self.tmp, asset_report.REPORT_NAME))
+        self.assertEqual(report["a.glb"]["dedupe"]["shared"], [f"textures/{shared[0]}"])
+
+        # A later batch links to the existing file instead of writing another
+        self.glb("d_optimized.glb", self.base)
+        summary = texture_dedupe.dedupe_library(self.tmp)
+        self.assertEqual((summary["files_written"], summary["assets_rewritten"]), (0, 1))
+        gltf, _ = glb_io.read_glb(os.path.join(self.tmp, "d_optimized.glb"))
+        self.assertEqual(gltf["images"][0]["uri"], f"textures/{shared[0]}")
+
+    @patch('builtins.print')
+    def test_perceptual_matches_near_duplicates_but_not_recolours(self, mock_print):
+        smooth = np.repeat(np.repeat(self.base[:8, :8], 4, axis=0), 4, axis=1)
+        tweaked = smooth.copy()
+        tweaked[0, 0] ^= 1
+        recolour = smooth[..., ::-1].copy()
+        self.glb("a_optimized.glb", smooth)
+        self.glb("b_optimized.glb", tweaked)
+        self.glb("c_optimized.glb", recolour)
+
+        self.assertEqual(texture_dedupe.dedupe_library(self.tmp)["shared_groups"], 0)
+        summary = texture_dedupe.dedupe_library(self.tmp, perceptual=True)
+        self.assertEqual((summary["shared_groups"], summary["assets_rewritten"]), (1, 2))
+        gltf, _ = glb_io.read_glb(os.path.join(self.tmp, "c_optimized.glb"))
+        self.assertIn("bufferView", gltf["images"][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from PIL import Image
+
+from scripts import texture_resize
+import scripts.main_pipeline as mp
+
+
+class TestTextureResize(unittest.TestCase):
+
+    def test_weights_are_normalized(self):
+        for filter in texture_resize.FILTERS:
+            for src, dst in ((2048, 1024), (1000, 300), (256, 512), (7, 7)):
+                idx, weights = texture_resize.resample_weights(src, dst, filter)
+                self.assertEqual(idx.shape, weights.shape)
+                np.testing.assert_allclose(weights.sum(axis=1), 1.0, rtol=1e-5)
+                self.assertTrue(((idx >= 0) & (idx < src)).all())
+        with self.assertRaises(ValueError):
+            texture_resize.resample_weights(4, 2, "nearest")
+
+    def test_box_halving_is_block_average(self):
+        image = np.random.default_rng(0).random((32, 24, 3)).astype(np.float32)
+        out = texture_resize.resize(image, (16, 12), filter="box", srgb=False, workers=2)
+        np.testing.assert_allclose(out, image.reshape(16, 2, 12, 2, 3).mean(axis=(1, 3)), atol=1e-6)
+
+    def test_averages_in_linear_light(self):
+        """A black/white checker averages to 50% linear grey (~0.735 sRGB), not 0.5."""
+        y, x = np.mgrid[0:64, 0:64]
+        checker = np.repeat(((x + y) % 2).astype(np.float32)[..., None], 3, axis=2)
+        for filter in texture_resize.FILTERS:
+            out = texture_resize.resize(checker, (16, 16), filter=filter)
+            self.assertAlmostEqual(float(out.mean()), 0.7354, places=3)
+
+    def test_alpha_is_not_gamma_converted(self):
+        image = np.zeros((8, 8, 4), dtype=np.float32)
+        image[..., 3] = np.tile([0.0, 1.0], 4)
+        out = texture_resize.resize(image, (4, 4), filter="box")
+        np.testing.assert_allclose(out[..., 3], 0.5, atol=1e-6)
+
+    def test_build_pyramid_keeps_aspect(self):
+        image = np.full((600, 1200, 3), 0.25, dtype=np.float32)
+        pyramid = texture_resize.build_pyramid(image, sizes=(2048, 512, 256))
+        self.assertEqual({size: level.shape for size, level in pyramid.items()},
+                         {2048: (600, 1200, 3), 512: (256, 512, 3), 256: (128, 256, 3)})
+        np.testing.assert_allclose(pyramid[256], 0.25, atol=1e-5)
+
+    @patch('builtins.print')
+    def test_fit_source_texture(self, mock_print):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "a_high_diffuse.png")
+            Image.new('RGB', (1024, 512), (90, 140, 200)).save(path)
+
+            self.assertIsNone(mp.fit_source_texture(path, 2048))
+            self.assertEqual(mp.fit_source_texture(path, 256), (128, 256))
+            with Image.open(path) as img:
+                self.assertEqual(img.size, (256, 128))
+                self.assertEqual(img.getpixel((10, 10)), (90, 140, 200))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from PIL import Image
+
+from scripts import asset_report, glb_io, texture_variants
+import scripts.main_pipeline as mp
+from scripts.texture_variants import TextureVariant
+from tests.glb_fixtures import make_glb, png_bytes
+
+
+def make_baked_glb(path, size=256):
+    """A GLB with one embedded noisy PNG, standing in for a bake at `size`."""
+    rng = np.random.default_rng(0)
+    png = png_bytes(rng.integers(0, 256, (size, size, 3), dtype=np.uint8))
+    make_glb(path, [png], images=[{"bufferView": 0, "mimeType": "image/png"}])
+
+
+def image_size(path):
+    gltf, binary = glb_io.read_glb(path)
+    (_, data, _), = glb_io.embedded_images(gltf, binary)
+    with Image.open(io.BytesIO(data)) as img:
+        return img.size, len(data)
+
+
+def image_mode(path):
+    gltf, binary = glb_io.read_glb(path)
+    (_, data, _), = glb_io.embedded_images(gltf, binary)
+    with Image.open(io.BytesIO(data)) as img:
+        return img.mode
+
+
+class TestTextureVariants(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.temp_dir, "bake.glb")
+        make_baked_glb(self.src)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_variants_from_one_bake(self):
+        before = image_size(self.src)
+        outputs = texture_variants.write_variants(self.src, [TextureVariant("64px", 64, 6), TextureVariant("big", 512, 6)])
+
+        self.assertEqual(outputs["64px"], os.path.join(self.temp_dir, "bake_64px.glb"))
+        (size, nbytes) = image_size(outputs["64px"])
+        self.assertEqual(size, (64, 64))
+        self.assertLess(nbytes, before[1])
+
+        # Already within res: original bytes kept, source untouched
+        self.assertEqual(image_size(outputs["big"]), before)
+        self.assertEqual(image_size(self.src), before)
+
+    def test_primary_rewritten_in_place(self):
+        outputs = texture_variants.write_variants(self.src, [TextureVariant(None, 128, 6), TextureVariant("64px", 64, 6)])
+
+        self.assertEqual(outputs[None], self.src)
+        self.assertEqual(image_size(self.src)[0], (128, 128))
+        self.assertEqual(image_size(outputs["64px"])[0], (64, 64))
+
+    @patch('builtins.print')
+    def test_every_variant_is_quantized(self, mock_print):
+        """A profile with quantize_colors palettes the variant tiers as well as its own output."""
+        profile = {"res": 128, "quantize_colors": 16}
+        outputs = mp.finish_textures("bake.glb", self.src, self.temp_dir, profile, 128, 6, [TextureVariant("64px", 64, 6)])
+
+        self.assertEqual(set(outputs), {None, "64px"})
+        self.assertEqual(image_mode(outputs[None]), 'P')
+        self.assertEqual(image_mode(outputs["64px"]), 'P')
+        report = asset_report.load_report(os.path.join(self.temp_dir, asset_report.REPORT_NAME))["bake.glb"]
+        self.assertEqual(set(report), {"quantize", "quantize_64px"})
+
+
+if __name__ == '__main__':
+    unittest.main()
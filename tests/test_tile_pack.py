@@ -0,0 +1,111 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from PIL import Image
+
+from scripts import glb_io, tile_pack
+from tests.glb_fixtures import make_glb, png_bytes
+
+
+def make_tile(path, color, size=64, material=None):
+    """One textured triangle; UVs stored as normalized uint16 like a quantized export."""
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 0, 1]], dtype=np.float32)
+    uvs = np.array([[0, 0], [65535, 0], [0, 65535]], dtype=np.uint16)
+    make_glb(
+        path, [positions.tobytes(), uvs.tobytes(), png_bytes(np.full((size, size, 3), color, dtype=np.uint8))],
+        scene=0, scenes=[{"nodes": [0]}],
+        nodes=[{"mesh": 0}],
+        meshes=[{"primitives": [{"attributes": {"POSITION": 0, "TEXCOORD_0": 1}, "material": 0}]}],
+        materials=[material or {"pbrMetallicRoughness": {"baseColorTexture": {"index": 0}}}],
+        textures=[{"source": 0}],
+        images=[{"bufferView": 2, "mimeType": "image/png"}],
+        accessors=[
+            {"bufferView": 0, "componentType": 5126, "count": 3, "type": "VEC3", "min": [0, 0, 0], "max": [1, 0, 1]},
+            {"bufferView": 1, "componentType": 5123, "normalized": True, "count": 3, "type": "VEC2"},
+        ],
+    )
+
+
+def sample(atlas, uv):
+    height, width = atlas.shape[:2]
+    return tuple(atlas[min(int(uv[1] * height), height - 1), min(int(uv[0] * width), width - 1), :3])
+
+
+class TestTilePack(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.colors = {"a_optimized.glb": (255, 0, 0), "b_optimized.glb": (0, 255, 0), "c_optimized.glb": (0, 0, 255)}
+        self.paths = []
+        for name, color in self.colors.items():
+            self.paths.append(os.path.join(self.tmp, name))
+            make_tile(self.paths[-1], color)
+
+    def triangle_centre(self, gltf, binary, accessor):
+        return glb_io.read_accessor(gltf, binary, accessor).mean(axis=0)
+
+    @patch('builtins.print')
+    def test_separate_tiles_share_one_page(self, mock_print):
+        summary = tile_pack.pack_tiles(self.paths, self.tmp, "dungeon", "separate")
+        self.assertEqual((summary["tiles"], summary["pages"]), (3, 1))
+
+        with Image.open(os.path.join(self.tmp, "atlases", "dungeon_0.png")) as img:
+            atlas = np.asarray(img.convert('RGBA'))
+        for name, color in self.colors.items():
+            gltf, binary = glb_io.read_glb(os.path.join(self.tmp, name))
+            self.assertEqual(gltf["images"], [{"uri": "atlases/dungeon_0.png", "mimeType": "image/png"}])
+            self.assertEqual(gltf["samplers"][gltf["textures"][0]["sampler"]]["wrapS"], tile_pack.CLAMP_TO_EDGE)
+            self.assertEqual(sample(atlas, self.triangle_centre(gltf, binary, 1)), color)
+            # The old image and UV views are gone; positions are untouched
+            self.assertEqual(len(gltf["bufferViews"]), 2)
+            np.testing.assert_array_equal(glb_io.read_accessor(gltf, binary, 0)[1], [1, 0, 0])
+
+    @patch('builtins.print')
+    def test_small_pages_split_and_combined_scene(self, mock_print):
+        summary = tile_pack.pack_tiles(self.paths, self.tmp, "dungeon", "combined", page_size=100)
+        self.assertEqual(summary["pages"], 3)
+
+        gltf, binary = glb_io.read_glb(os.path.join(self.tmp, "dungeon.glb"))
+        self.assertEqual(len(gltf["images"]), 3)
+        self.assertEqual(len(gltf["scenes"][0]["nodes"]), 3)
+        self.assertEqual(len(gltf["meshes"]), 3)
+        pages = [np.asarray(Image.open(io.BytesIO(glb_io.view_bytes(gltf, binary, image["bufferView"]))).convert('RGBA'))
+                 for image in gltf["images"]]
+        for mesh, color in zip(gltf["meshes"], self.colors.values()):
+            primitive = mesh["primitives"][0]
+            texture = gltf["textures"][gltf["materials"][primitive["material"]]["pbrMetallicRoughness"]["baseColorTexture"]["index"]]
+            centre = self.triangle_centre(gltf, binary, primitive["attributes"]["TEXCOORD_0"])
+            self.assertEqual(sample(pages[texture["source"]], centre), color)
+        # Individual outputs are left alone in combined mode
+        gltf, _ = glb_io.read_glb(self.paths[0])
+        self.assertIn("bufferView", gltf["images"][0])
+
+    @patch('builtins.print')
+    def test_combined_keeps_untextured_and_reports_skipped(self, mock_print):
+        """Untextured tiles join the combined scene as they are; tiles that can't be atlased are named."""
+        plain = os.path.join(self.tmp, "plain_optimized.glb")
+        make_glb(
+            plain, [np.array([[0, 0, 0], [1, 0, 0], [0, 0, 1]], dtype=np.float32).tobytes()],
+            scene=0, scenes=[{"nodes": [0]}], nodes=[{"mesh": 0}],
+            meshes=[{"primitives": [{"attributes": {"POSITION": 0}, "material": 0}]}],
+            materials=[{"pbrMetallicRoughness": {"baseColorFactor": [0.5, 0.5, 0.5, 1.0]}}],
+            accessors=[{"bufferView": 0, "componentType": 5126, "count": 3, "type": "VEC3", "min": [0, 0, 0], "max": [1, 0, 1]}],
+        )
+        bumpy = os.path.join(self.tmp, "bumpy_optimized.glb")
+        make_tile(bumpy, (9, 9, 9), material={"pbrMetallicRoughness": {"baseColorTexture": {"index": 0}}, "normalTexture": {"index": 0}})
+
+        summary = tile_pack.pack_tiles(self.paths + [plain, bumpy], self.tmp, "dungeon", "combined")
+
+        self.assertEqual((summary["tiles"], summary["skipped"]), (4, ["bumpy_optimized.glb"]))
+        gltf, _ = glb_io.read_glb(os.path.join(self.tmp, "dungeon.glb"))
+        self.assertIn("plain_optimized", [node.get("name") for node in gltf["nodes"]])
+        mock_print.assert_any_call("⚠️ 1 tile(s) missing from the combined pack: bumpy_optimized.glb")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+
+from scripts import uv_packer
+
+
+def make_islands(rects, seed=0):
+    """Builds quad-grid islands (3x3 verts, 4 quads) from (w, h) sizes, randomly rotated and scattered."""
+    rng = np.random.default_rng(seed)
+    verts, uvs, totals = [], [], []
+    for i, (w, h) in enumerate(rects):
+        angle = rng.uniform(0, np.pi)
+        rot = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        grid = np.array([[x * w / 2, y * h / 2] for y in range(3) for x in range(3)]) @ rot.T + rng.uniform(0, 1, 2)
+        for qy in range(2):
+            for qx in range(2):
+                ids = [qy * 3 + qx, qy * 3 + qx + 1, qy * 3 + qx + 4, qy * 3 + qx + 3]
+                verts += [i * 9 + k for k in ids]
+                uvs += [grid[k] for k in ids]
+                totals.append(4)
+    totals = np.array(totals)
+    return np.array(verts), np.array(uvs), totals, np.r_[0, np.cumsum(totals)[:-1]]
+
+
+class TestUVPacker(unittest.TestCase):
+
+    def test_find_islands_splits_on_uv_seams(self):
+        """Faces sharing a vertex at different UVs (a seam) belong to different islands."""
+        # Two quads sharing mesh vertices 1 and 4; the second copy of the shared edge is offset in UV
+        verts = np.array([0, 1, 4, 3, 1, 2, 5, 4, 3, 4, 7, 6])
+        uvs = np.array([[0, 0], [1, 0], [1, 1], [0, 1],
+                        [5, 0], [6, 0], [6, 1], [5, 1],
+                        [0, 1], [1, 1], [1, 2], [0, 2]], dtype=float)
+        islands, count = uv_packer.find_islands(verts, uvs, np.array([4, 4, 4]))
+
+        self.assertEqual(count, 2)
+        self.assertEqual(islands[0], islands[2])
+        self.assertNotEqual(islands[0], islands[1])
+
+    def test_skyline_pack_has_no_overlaps(self):
+        rng = np.random.default_rng(3)
+        sizes = rng.uniform(0.05, 0.3, size=(40, 2))
+        positions, rotated, height = uv_packer.skyline_pack(sizes, 1.0, bins=256)
+
+        placed = np.where(rotated[:, None], sizes[:, ::-1], sizes)
+        lo, hi = positions, positions + placed
+        overlap = (np.minimum(hi[:, None], hi[None]) - np.maximum(lo[:, None], lo[None])).clip(0).prod(axis=2)
+        np.fill_diagonal(overlap, 0)
+
+        self.assertEqual(overlap.max(), 0.0)
+        self.assertTrue((hi[:, 0] <= 1.0 + 1e-9).all())
+        self.assertAlmostEqual(height, hi[:, 1].max())
+
+    def test_pack_islands_fills_unit_square_and_keeps_gaps(self):
+        """Packing beats the scattered input, stays in 0-1, keeps margins and relative island scale."""
+        rng = np.random.default_rng(1)
+        verts, uvs, totals, starts = make_islands(rng.uniform(0.01, 0.05, size=(150, 2)))
+        packed, count = uv_packer.pack_islands(verts, uvs, totals, margin=0.004)
+
+        self.assertEqual(count, 150)
+        self.assertTrue((packed >= 0).all() and (packed <= 1).all())
+
+        positions = np.zeros((len(uvs), 3))
+        positions[:, :2] = uvs
+        before = uv_packer.uv_stats(uvs, positions, starts, totals, 1024)
+        after = uv_packer.uv_stats(packed, positions, starts, totals, 1024, count)
+        self.assertGreater(after.coverage, 0.6)
+        # Uniform scaling: every island grows by the same factor
+        islands, _ = uv_packer.find_islands(verts, packed, totals)
+        tris = uv_packer.fan_triangles(starts, totals)
+        ratio = uv_packer.uv_triangle_areas(packed, tris) / uv_packer.uv_triangle_areas(uvs, tris)
+        np.testing.assert_allclose(ratio, ratio[0], rtol=1e-6)
+        self.assertAlmostEqual(after.texel_density / before.texel_density, np.sqrt(ratio[0]), places=5)
+
+        loop_islands = islands[uv_packer.loop_faces(totals)]
+        lo, hi = uv_packer._island_bounds(packed, loop_islands, count)
+        gap = np.maximum(np.maximum(lo[:, None] - hi[None], lo[None] - hi[:, None]).max(axis=2), 0)
+        np.fill_diagonal(gap, 1)
+        self.assertGreaterEqual(gap.min(), 0.0039)
+
+    def test_uv_stats_texel_density(self):
+        """A 2x2 world quad mapped onto the whole UV square gets res / 2 texels per unit."""
+        uvs = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=float)
+        positions = np.array([[0, 0, 0], [2, 0, 0], [2, 2, 0], [0, 2, 0]], dtype=float)
+        stats = uv_packer.uv_stats(uvs, positions, np.array([0]), np.array([4]), 1024, 1)
+
+        self.assertAlmostEqual(stats.coverage, 1.0)
+        self.assertAlmostEqual(stats.world_area, 4.0)
+        self.assertAlmostEqual(stats.texel_density, 512.0)
+
+    def test_choose_resolution(self):
+        """Smallest power of two meeting the target, clamped between the minimum and the profile cap."""
+        # 0.5 px/unit per texture pixel: 300 px/unit needs 600px -> 1024
+        self.assertEqual(uv_packer.choose_resolution(0.5, 300, 2048), 1024)
+        self.assertEqual(uv_packer.choose_resolution(0.5, 256, 2048), 512)
+        self.assertEqual(uv_packer.choose_resolution(0.5, 5000, 2048), 2048)
+        self.assertEqual(uv_packer.choose_resolution(0.5, 10, 2048), uv_packer.MIN_RESOLUTION)
+        # No target or no measurable density: keep the profile resolution
+        self.assertEqual(uv_packer.choose_resolution(0.5, 0, 1024), 1024)
+        self.assertEqual(uv_packer.choose_resolution(0.0, 300, 1024), 1024)
+
+if __name__ == '__main__':
+    unittest.main()